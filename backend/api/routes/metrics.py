@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from backend.utils.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    In-process metrics: ingestion stage stats, cache hit rates, retrieval stats.
+    """
+    return metrics.snapshot()
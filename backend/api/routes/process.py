@@ -1,5 +1,4 @@
 import json
-from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 
 from backend.utils.logger import logger
@@ -7,76 +6,124 @@ from backend.utils.config import PROCESSED_DIR
 from backend.utils.file_manager import session_exists
 
 # ✅ Core pipeline imports
-from backend.core.doc_processing_unit.text_extractor import extract_all_files
-from backend.core.doc_processing_unit.text_cleaner import clean_all_raw_files
-from backend.core.doc_processing_unit.chunking import chunk_session_documents
-from backend.core.doc_processing_unit.embedding_engine import embed_chunks
+from backend.core.doc_processing_unit.ingest_pipeline import run_ingestion_pipeline
+from backend.core.doc_processing_unit.job_manager import job_manager, ProcessingJob
+from backend.core.rag.retrieval_cache import bump_index_generation
 
 router = APIRouter()
 
 
-@router.post("/process/{session_id}")
-async def process_documents(request: Request, session_id: str):
+def _run_processing(job: ProcessingJob, embedding_model) -> dict:
     """
-    Full document processing pipeline:
-    1️⃣ Extract text
-    2️⃣ Clean text
-    3️⃣ Chunk documents
-    4️⃣ Embed chunks & upsert into Qdrant
-    5️⃣ Update file_index.json
+    Body of a background processing job (runs on the job manager's thread pool):
+    0️⃣ Plan: skip unchanged files (content hash), drop removed/replaced ones
+    1️⃣ Extract text     ┐
+    2️⃣ Clean text       ├ per file, in a process pool
+    3️⃣ Chunk documents  ┘
+    4️⃣ Embed chunks     → batching encoder
+    5️⃣ Upsert to Qdrant → bulk writer
+    6️⃣ Update file_index.json
     """
+    session_id = job.session_id
+    logger.info(f"🚀 Starting processing pipeline for session: {session_id}")
 
+    # 1️⃣ … 5️⃣ Extract → clean → chunk → embed → upsert (concurrent stages)
+    job.set_stage("processing")
     try:
-        logger.info(f"🚀 Starting processing pipeline for session: {session_id}")
+        result = run_ingestion_pipeline(
+            session_id,
+            model=embedding_model,
+            progress=job.advance,
+            cancel_event=job.cancel_event,
+        )
+    finally:
+        # Index changed (even partially on failure / cancel) → cached retrievals are stale
+        bump_index_generation(session_id)
+
+    processed_files = result["files"]
+    chunk_summary = result["chunks_per_doc"]
+    total_chunks = sum(chunk_summary.values())
+    total_embeddings = result["total_embeddings"]
+    upsert_summary = result["upsert"]
+
+    logger.info(
+        f"📄 Extracted, cleaned & chunked files: {result['ingested_files']} "
+        f"(unchanged: {result['unchanged_files']}, removed: {result['removed_files']})"
+    )
+    logger.info(f"✅ Total chunks created: {total_chunks}")
+    logger.info(
+        f"🧠 Total embeddings generated & stored: {total_embeddings} "
+        f"({upsert_summary['batches']} batches, {upsert_summary['points_per_sec']} points/sec)"
+    )
 
-        # ✅ Check session existence
-        if not session_exists(session_id):
-            raise HTTPException(status_code=404, detail=f"Session {session_id} not found.")
+    # 6️⃣ Update metadata (mark processed)
+    job.set_stage("finalizing")
+    meta_file = PROCESSED_DIR / session_id / "file_index.json"
+    if meta_file.exists():
+        meta_data = json.loads(meta_file.read_text())
+        for doc in meta_data:
+            doc["processed"] = True
+        meta_file.write_text(json.dumps(meta_data, indent=2), encoding="utf-8")
+        logger.info("📁 Updated file_index.json: marked all docs as processed ✅")
 
-        # 1️⃣ Extract text
-        extracted_files = extract_all_files(session_id)
-        logger.info(f"📄 Extracted files: {len(extracted_files)}")
+    return {
+        "session_id": session_id,
+        "total_files": len(processed_files),
+        "extracted_files": result["ingested_files"],
+        "cleaned_files": result["ingested_files"],
+        "unchanged_files": result["unchanged_files"],
+        "removed_files": result["removed_files"],
+        "chunks_per_doc": chunk_summary,
+        "total_chunks": total_chunks,
+        "total_embeddings": total_embeddings,
+        "upsert_batches": upsert_summary["batches"],
+        "upsert_points_per_sec": upsert_summary["points_per_sec"],
+        "stages": result["stages"],
+        "bottleneck_stage": result["bottleneck"],
+        "vector_store": result["vector_store"],
+        "status": "✅ Processing complete"
+    }
 
-        # 2️⃣ Clean text
-        cleaned_files = clean_all_raw_files(session_id)
-        logger.info(f"🧽 Cleaned files: {len(cleaned_files)}")
 
-        # 3️⃣ Chunk documents
-        chunk_list = chunk_session_documents(session_id)
-        chunk_summary = {}
-        for meta in chunk_list:
-            doc = meta["source_doc_folder"]
-            chunk_summary[doc] = chunk_summary.get(doc, 0) + 1
+@router.post("/process/{session_id}", status_code=202)
+async def process_documents(request: Request, session_id: str):
+    """
+    Start document processing as a background job and return immediately.
+    Poll GET /process/jobs/{job_id} for progress; DELETE it to cancel.
+    If the session already has a running job, that job is returned instead.
+    """
 
-        total_chunks = sum(chunk_summary.values())
-        logger.info(f"✅ Total chunks created: {total_chunks}")
+    # ✅ Check session existence
+    if not session_exists(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found.")
 
-        # 4️⃣ Embed chunks + upsert to Qdrant
+    job = job_manager.active_job_for_session(session_id)
+    if job is None:
         embedding_model = request.app.state.embedding_model
-        embeddings = embed_chunks(session_id, model=embedding_model)
-        logger.info(f"🧠 Total embeddings generated & stored: {len(embeddings)}")
-
-        # 5️⃣ Update metadata (mark processed)
-        meta_file = PROCESSED_DIR / session_id / "file_index.json"
-        if meta_file.exists():
-            meta_data = json.loads(meta_file.read_text())
-            for doc in meta_data:
-                doc["processed"] = True
-            meta_file.write_text(json.dumps(meta_data, indent=2), encoding="utf-8")
-            logger.info("📁 Updated file_index.json: marked all docs as processed ✅")
-
-        return {
-            "session_id": session_id,
-            "extracted_files": len(extracted_files),
-            "cleaned_files": len(cleaned_files),
-            "chunks_per_doc": chunk_summary,
-            "total_chunks": total_chunks,
-            "total_embeddings": len(embeddings),
-            "status": "✅ Processing complete"
-        }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.exception(f"❌ Error during processing for session {session_id}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        job = job_manager.submit(session_id, lambda j: _run_processing(j, embedding_model))
+    else:
+        logger.info(f"🔁 Session {session_id} already has processing job {job.job_id}")
+
+    return {
+        "job_id": job.job_id,
+        "session_id": session_id,
+        "status": job.status,
+    }
+
+
+@router.get("/process/jobs/{job_id}")
+async def get_process_job(job_id: str):
+    """Status, stage, progress counters and (when completed) the result of a processing job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job.to_dict()
+
+
+@router.delete("/process/jobs/{job_id}")
+async def cancel_process_job(job_id: str):
+    """Request cancellation; the pipeline stops at its next queue hand-off."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job.to_dict()
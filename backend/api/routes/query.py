@@ -1,20 +1,44 @@
+import json
+from typing import Any, AsyncIterator, Dict, List
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from backend.models.schemas import QueryRequest, QueryResponse
 
 from backend.utils.logger import logger
 from backend.utils.file_manager import list_files
 from backend.core.rag.agent.graph_builder import agentic_rag_graph
+from backend.core.rag.answer_cache import shared_answer_store
+from backend.core.rag.session_memory import add_to_session_memory, get_session_memory
 
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 
 router = APIRouter()
 
 
+def _initial_state(session_id: str, query_text: str) -> Dict[str, Any]:
+    """Agent state for a new query: session, its uploaded documents, the user message."""
+    try:
+        docs = list_files(session_id)  # returns list of filenames
+    except Exception:
+        docs = []
+
+    logger.info(f"📄 Session {session_id} has documents: {docs}")
+
+    return {
+        "session_id": session_id,
+        "docs": docs,                          # NOW CORRECT
+        "messages": [HumanMessage(content=query_text)],
+    }
+
+
 @router.post("/query", response_model=QueryResponse)
 async def handle_user_query(query_data: QueryRequest):
     """
     Agentic RAG Query Endpoint
 
+    0. Serve the answer from the shared answer store when another session
+       with the same document set already answered this question.
     1. Automatically load uploaded documents for the session.
     2. Build initial AgentState:
           - session_id
@@ -31,23 +55,20 @@ async def handle_user_query(query_data: QueryRequest):
         logger.info(f"💬 New agentic RAG query for session={session_id}: '{query_text}'")
 
         # -----------------------------------------------------------------
-        # 1️⃣ Load uploaded document names (REAL source of truth)
+        # 0️⃣ Same corpus + same question answered before → no graph run
+        #    (shared answers carry no history → only for a fresh conversation)
         # -----------------------------------------------------------------
-        try:
-            docs = list_files(session_id)  # returns list of filenames
-        except Exception:
-            docs = []
-
-        logger.info(f"📄 Session {session_id} has documents: {docs}")
+        shared = None if get_session_memory(session_id) else shared_answer_store.lookup(session_id, query_text)
+        if shared is not None:
+            add_to_session_memory(session_id, "user", query_text)
+            add_to_session_memory(session_id, "assistant", shared["response"])
+            return QueryResponse(**shared)
 
         # -----------------------------------------------------------------
-        # 2️⃣ Build initial agent state for the graph
+        # 1️⃣ + 2️⃣ Load uploaded document names (REAL source of truth)
+        #          and build the initial agent state for the graph
         # -----------------------------------------------------------------
-        initial_state = {
-            "session_id": session_id,
-            "docs": docs,                          # NOW CORRECT
-            "messages": [HumanMessage(content=query_text)],
-        }
+        initial_state = _initial_state(session_id, query_text)
 
         # -----------------------------------------------------------------
         # 3️⃣ Invoke the agentic graph (async)
@@ -62,6 +83,9 @@ async def handle_user_query(query_data: QueryRequest):
         if not final_output:
             raise RuntimeError("❌ finalize_node did not produce final_output")
 
+        # Share document-grounded answers with sessions holding the same files
+        shared_answer_store.store(session_id, query_text, final_output)
+
         # -----------------------------------------------------------------
         # 5️⃣ Build the API response (Pydantic model)
         # -----------------------------------------------------------------
@@ -72,6 +96,7 @@ async def handle_user_query(query_data: QueryRequest):
             used_chunks=final_output["used_chunks"],
             citations=final_output["citations"],
             formatted_citations=final_output["formatted_citations"],
+            cached=final_output.get("cached", False),
         )
 
         logger.info(f"✅ Agentic RAG query resolved successfully for session {session_id}")
@@ -80,4 +105,99 @@ async def handle_user_query(query_data: QueryRequest):
 
     except Exception as e:
         logger.exception(f"❌ Error processing agentic RAG query: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# =====================================================================
+# 🌊 Streaming variant (Server-Sent Events)
+# =====================================================================
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _tool_citations(update: Dict[str, Any]) -> List[Dict]:
+    """Citations from rag_tool's ToolMessage (same payload finalize_node reads)."""
+    for message in update.get("messages", []):
+        if isinstance(message, ToolMessage):
+            try:
+                payload = json.loads(message.content) if isinstance(message.content, str) else message.content
+            except ValueError:
+                return []
+            return payload.get("citations", []) if isinstance(payload, dict) else []
+    return []
+
+
+async def _query_events(query_data: QueryRequest) -> AsyncIterator[str]:
+    """
+    route     → {"route": "rag" | "general" | "cache"}
+    citations → raw citation list, as soon as rag_tool returns (or with a cached answer)
+    token     → answer text delta (streamed by finalize_node)
+    done      → the full QueryResponse
+    error     → {"detail": ...}
+    """
+    session_id = query_data.session_id
+    query_text = query_data.query
+
+    try:
+        logger.info(f"🌊 New streaming RAG query for session={session_id}: '{query_text}'")
+
+        shared = None if get_session_memory(session_id) else shared_answer_store.lookup(session_id, query_text)
+        if shared is not None:
+            add_to_session_memory(session_id, "user", query_text)
+            add_to_session_memory(session_id, "assistant", shared["response"])
+            yield _sse("route", {"route": "cache"})
+            yield _sse("citations", shared["citations"])
+            yield _sse("token", shared["response"])
+            yield _sse("done", QueryResponse(**shared).model_dump())
+            return
+
+        initial_state = {**_initial_state(session_id, query_text), "stream": True}
+        final_output = None
+
+        # updates → node results (route / citations / final_output), custom → answer tokens
+        async for mode, chunk in agentic_rag_graph.astream(initial_state, stream_mode=["updates", "custom"]):
+            if mode == "custom":
+                yield _sse(chunk["event"], chunk["data"])
+                continue
+
+            for node, update in chunk.items():
+                update = update or {}
+                if node == "answer_cache" and update.get("final_output"):
+                    final_output = update["final_output"]
+                    yield _sse("route", {"route": "cache"})
+                    yield _sse("citations", final_output["citations"])
+                    yield _sse("token", final_output["response"])
+                elif node == "assistant":
+                    decision = update["messages"][-1]
+                    yield _sse("route", {"route": "rag" if getattr(decision, "tool_calls", None) else "general"})
+                elif node == "tool":
+                    yield _sse("citations", _tool_citations(update))
+                elif node == "finalize":
+                    final_output = update.get("final_output")
+
+        if not final_output:
+            raise RuntimeError("❌ finalize_node did not produce final_output")
+
+        shared_answer_store.store(session_id, query_text, final_output)
+        yield _sse("done", QueryResponse(**final_output).model_dump())
+
+        logger.info(f"✅ Streaming RAG query resolved successfully for session {session_id}")
+
+    except Exception as e:
+        logger.exception(f"❌ Error processing streaming RAG query: {e}")
+        yield _sse("error", {"detail": str(e)})
+
+
+@router.post("/query/stream")
+async def stream_user_query(query_data: QueryRequest):
+    """
+    Same agentic workflow as /query, streamed as Server-Sent Events so the
+    first answer tokens reach the client while the LLM is still generating.
+    Session memory is written by finalize_node when the answer completes.
+    """
+    return StreamingResponse(
+        _query_events(query_data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
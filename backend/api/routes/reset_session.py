@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Query
 from backend.utils.logger import logger
 from backend.utils.file_manager import clear_session_data, session_exists
 from backend.core.rag.session_memory import clear_session_memory
+from backend.core.rag.retrieval_cache import bump_index_generation
+from backend.core.rag.answer_cache import answer_cache, shared_answer_store
 
 router = APIRouter()
 
@@ -30,6 +32,11 @@ async def reset_session(session_id: str = Query(..., description="Session ID to
         # ✅ Remove local files + Qdrant collection
         result = clear_session_data(session_id)
 
+        # ✅ Invalidate cached retrievals + answers
+        bump_index_generation(session_id)
+        answer_cache.clear_session(session_id)
+        shared_answer_store.forget_session(session_id)
+
         logger.info(f"✅ Session {session_id} reset complete.")
         
         return {
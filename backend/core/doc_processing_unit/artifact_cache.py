@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+from backend.utils.config import (
+    ARTIFACT_CACHE_DIR,
+    ARTIFACT_CACHE_ENABLED,
+    ARTIFACT_CACHE_MAX_BYTES,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    CHUNK_WINDOW_CHARS,
+    EMBEDDING_MODEL,
+    EMBEDDING_STORE_DTYPE,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.text_extractor import EXTRACTOR_VERSION
+from backend.core.doc_processing_unit.text_cleaner import CLEANER_VERSION, cleaned_file_name
+from backend.core.doc_processing_unit.chunking import write_document_chunks
+from backend.core.doc_processing_unit.chunk_store import (
+    EMBEDDING_MATRIX_FILE,
+    iter_chunk_table,
+    write_chunk_table,
+)
+
+
+# ============================================================
+# 🗃️ Content-addressed ingestion artifact cache
+#
+#   <ARTIFACT_CACHE_DIR>/<key>/
+#       raw.txt          → extracted text
+#       clean.txt        → cleaned text
+#       chunks.jsonl     → {"chunk_index", "text"} rows (no session metadata)
+#       embeddings.npy   → embedding matrix, row i ↔ chunk i
+#       meta.json        → key inputs + entry size
+#
+#   key = sha256(file content hash + extractor/cleaner versions
+#                + chunk config + embedding model + store dtype)
+#
+# Entries are immutable once published (tmp dir → rename). The entry dir's
+# mtime is the LRU clock; the least recently used entries are evicted when
+# the cache grows above ARTIFACT_CACHE_MAX_BYTES.
+# ============================================================
+
+RAW_FILE = "raw.txt"
+CLEAN_FILE = "clean.txt"
+META_FILE = "meta.json"
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """
+    Hard-link when possible, else copy. Only for files that are always replaced
+    atomically (embeddings.npy), never rewritten in place.
+    """
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+class ArtifactCache:
+    """Extracted text, chunk boundaries and embeddings shared across sessions."""
+
+    def __init__(self, root: Path = ARTIFACT_CACHE_DIR, max_bytes: int = ARTIFACT_CACHE_MAX_BYTES,
+                 enabled: bool = ARTIFACT_CACHE_ENABLED):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # 🔑 Keys
+    # --------------------------------------------------------
+
+    def key_for(self, content_hash: str) -> str:
+        parts = [
+            content_hash,
+            f"extractor={EXTRACTOR_VERSION}",
+            f"cleaner={CLEANER_VERSION}",
+            f"chunk={CHUNK_SIZE}/{CHUNK_OVERLAP}/{CHUNK_WINDOW_CHARS}",
+            f"model={EMBEDDING_MODEL}",
+            f"dtype={EMBEDDING_STORE_DTYPE}",
+        ]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key
+
+    # --------------------------------------------------------
+    # 📥 Restore (cache hit → session doc folder)
+    # --------------------------------------------------------
+
+    def restore(self, session_id: str, doc_dir: Path, entry: Dict) -> Optional[int]:
+        """
+        Materialise cached artifacts for `entry` into `doc_dir`:
+        raw + cleaned text, a chunk table with this session's metadata, and the
+        embedding matrix. Returns the chunk count, or None on a miss.
+        """
+        if not self.enabled or not entry.get("content_hash"):
+            return None
+
+        src = self._entry_dir(self.key_for(entry["content_hash"]))
+        if not (src / META_FILE).exists():
+            metrics.incr("artifact_cache.misses")
+            return None
+
+        try:
+            doc_dir.mkdir(parents=True, exist_ok=True)
+            entry["cleaned_file"] = cleaned_file_name(entry)
+
+            shutil.copyfile(src / RAW_FILE, doc_dir / entry["stored_raw_file"])
+            shutil.copyfile(src / CLEAN_FILE, doc_dir / entry["cleaned_file"])
+            total = write_document_chunks(
+                session_id, doc_dir, entry, (row["text"] for row in iter_chunk_table(src))
+            )
+            _link_or_copy(src / EMBEDDING_MATRIX_FILE, doc_dir / EMBEDDING_MATRIX_FILE)
+            os.utime(src)  # LRU touch
+        except OSError as e:
+            # Evicted concurrently or unreadable → treat as a miss
+            logger.warning(f"⚠️ Artifact cache restore failed for {entry['original_name']}: {e}")
+            metrics.incr("artifact_cache.misses")
+            return None
+
+        metrics.incr("artifact_cache.hits")
+        logger.info(f"🗃️ Artifact cache hit: {entry['original_name']} ({total} chunks)")
+        return total
+
+    # --------------------------------------------------------
+    # 📤 Store (freshly processed doc folder → cache)
+    # --------------------------------------------------------
+
+    def store(self, doc_dir: Path, entry: Dict):
+        """Publish a processed document's artifacts. No-op if the key already exists."""
+        if not self.enabled or not entry.get("content_hash"):
+            return
+
+        key = self.key_for(entry["content_hash"])
+        final_dir = self._entry_dir(key)
+        if final_dir.exists():
+            return
+
+        tmp_dir = self.root / f".tmp-{key}-{uuid.uuid4().hex}"
+        try:
+            tmp_dir.mkdir(parents=True)
+            shutil.copyfile(doc_dir / entry["stored_raw_file"], tmp_dir / RAW_FILE)
+            shutil.copyfile(doc_dir / entry["cleaned_file"], tmp_dir / CLEAN_FILE)
+            write_chunk_table(tmp_dir, (
+                {"chunk_index": row["chunk_index"], "text": row["text"]}
+                for row in iter_chunk_table(doc_dir)
+            ))
+            _link_or_copy(doc_dir / EMBEDDING_MATRIX_FILE, tmp_dir / EMBEDDING_MATRIX_FILE)
+
+            meta = {
+                "content_hash": entry["content_hash"],
+                "original_name": entry["original_name"],
+                "model": EMBEDDING_MODEL,
+                "created_at": time.time(),
+                "size_bytes": _dir_size(tmp_dir),
+            }
+            (tmp_dir / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+            os.rename(tmp_dir, final_dir)
+        except OSError as e:
+            # Another session published the same key first, or the disk is full
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not final_dir.exists():
+                logger.warning(f"⚠️ Artifact cache store failed for {entry['original_name']}: {e}")
+            return
+
+        metrics.incr("artifact_cache.stores")
+        logger.info(f"🗃️ Cached artifacts for {entry['original_name']} → {key[:12]}")
+        self.evict()
+
+    # --------------------------------------------------------
+    # 🧹 LRU eviction
+    # --------------------------------------------------------
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            entries = []
+            for path in self.root.iterdir():
+                if not path.is_dir() or path.name.startswith("."):
+                    continue
+                try:
+                    size = json.loads((path / META_FILE).read_text(encoding="utf-8"))["size_bytes"]
+                    entries.append((path.stat().st_mtime, size, path))
+                except (OSError, ValueError, KeyError):
+                    continue
+
+            total = sum(size for _, size, _ in entries)
+            metrics.set("artifact_cache.bytes", total)
+            if total <= self.max_bytes:
+                return
+
+            for _, size, path in sorted(entries):
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                metrics.incr("artifact_cache.evictions")
+                logger.info(f"🧹 Evicted artifact cache entry {path.name[:12]}")
+                if total <= self.max_bytes:
+                    break
+
+            metrics.set("artifact_cache.bytes", total)
+
+
+# Singleton instance
+artifact_cache = ArtifactCache()
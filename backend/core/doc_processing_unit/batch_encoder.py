@@ -0,0 +1,94 @@
+import time
+from typing import List
+
+import numpy as np
+
+from backend.utils.config import (
+    EMBED_BATCH_TOKEN_BUDGET,
+    EMBED_MAX_BATCH_SIZE,
+    EMBED_BUCKET_WIDTH,
+)
+from backend.utils.logger import logger
+
+
+def _token_lengths(model, texts: List[str]) -> List[int]:
+    """
+    Token length of each text (capped at the model's max sequence length).
+    Falls back to a ~4 chars/token estimate if the model exposes no tokenizer.
+    """
+    max_len = getattr(model, "max_seq_length", None) or 512
+    tokenizer = getattr(model, "tokenizer", None)
+
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_len)
+            return [len(ids) for ids in encoded["input_ids"]]
+        except Exception as e:
+            logger.warning(f"⚠️ Tokenizer length estimation failed, using char estimate: {e}")
+
+    return [min(max_len, len(t) // 4 + 2) for t in texts]
+
+
+def encode_texts_bucketed(
+    model,
+    texts: List[str],
+    token_budget: int = EMBED_BATCH_TOKEN_BUDGET,
+    max_batch_size: int = EMBED_MAX_BATCH_SIZE,
+    bucket_width: int = EMBED_BUCKET_WIDTH,
+) -> np.ndarray:
+    """
+    Encode many texts with length-bucketed, adaptive batches.
+
+    - Texts are sorted by token length and grouped into buckets of `bucket_width` tokens,
+      so each batch pads to roughly the same length.
+    - Each bucket is encoded in batches of `token_budget // longest_in_bucket` texts
+      (capped at `max_batch_size`), keeping activation memory bounded.
+
+    Returns a float32 matrix whose rows follow the order of `texts`.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    start = time.perf_counter()
+    lengths = _token_lengths(model, texts)
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+    # 🪣 Group sorted indices into length buckets
+    buckets: List[List[int]] = []
+    current_bucket = None
+    for i in order:
+        bucket_id = lengths[i] // max(1, bucket_width)
+        if current_bucket != bucket_id:
+            buckets.append([])
+            current_bucket = bucket_id
+        buckets[-1].append(i)
+
+    vectors = None
+    batches = 0
+
+    for bucket in buckets:
+        longest = max(lengths[i] for i in bucket)
+        batch_size = max(1, min(max_batch_size, token_budget // max(1, longest)))
+
+        for offset in range(0, len(bucket), batch_size):
+            idx = bucket[offset:offset + batch_size]
+            encoded = model.encode(
+                [texts[i] for i in idx],
+                batch_size=len(idx),
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+            encoded = np.asarray(encoded, dtype=np.float32)
+
+            if vectors is None:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            vectors[idx] = encoded
+            batches += 1
+
+    seconds = time.perf_counter() - start
+    rate = len(texts) / seconds if seconds > 0 else 0.0
+    logger.info(
+        f"🧠 Encoded {len(texts)} chunks in {batches} batches across {len(buckets)} length buckets "
+        f"({rate:.1f} chunks/sec)"
+    )
+    return vectors
@@ -0,0 +1,163 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from backend.utils.config import PROCESSED_DIR, EMBEDDING_STORE_DTYPE
+from backend.utils.logger import logger
+
+
+# ============================================================
+# 🗄️ Per-document artifact layout
+#
+#   <doc_folder>/
+#       chunks.jsonl     → one JSON row per chunk (metadata + "text")
+#       embeddings.npy   → contiguous (n_chunks × dim) matrix, row i ↔ line i
+# ============================================================
+
+CHUNK_TABLE_FILE = "chunks.jsonl"
+EMBEDDING_MATRIX_FILE = "embeddings.npy"
+
+
+# ============================================================
+# 📑 Chunk table
+# ============================================================
+
+def write_chunk_table(doc_dir: Path, rows: Iterable[Dict]) -> int:
+    """Write the chunk table for a document. Returns number of rows written."""
+    doc_dir.mkdir(parents=True, exist_ok=True)
+    final_path = doc_dir / CHUNK_TABLE_FILE
+    tmp_path = final_path.with_suffix(".jsonl.tmp")
+
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            count += 1
+
+    os.replace(tmp_path, final_path)
+    return count
+
+
+def iter_chunk_table(doc_dir: Path) -> Iterator[Dict]:
+    """Stream chunk rows of a document in order."""
+    table = doc_dir / CHUNK_TABLE_FILE
+    with open(table, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_chunk_windows(doc_dir: Path, size: int) -> Iterator[List[Dict]]:
+    """Stream chunk rows of a document in lists of at most `size` rows."""
+    window = []
+    for row in iter_chunk_table(doc_dir):
+        window.append(row)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def read_chunk_table(doc_dir: Path) -> List[Dict]:
+    """Load all chunk rows of a document."""
+    return list(iter_chunk_table(doc_dir))
+
+
+def count_chunk_rows(doc_dir: Path) -> int:
+    with open(doc_dir / CHUNK_TABLE_FILE, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def has_chunk_table(doc_dir: Path) -> bool:
+    return (doc_dir / CHUNK_TABLE_FILE).exists()
+
+
+@lru_cache(maxsize=256)
+def _row_offsets(table: str, mtime_ns: int, size: int) -> np.ndarray:
+    """Byte offset of every row of a chunk table (cached per file version)."""
+    offsets = []
+    position = 0
+    with open(table, "rb") as f:
+        for line in f:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def read_chunk_rows(doc_dir: Path, positions: Iterable[int]) -> Dict[int, Dict]:
+    """
+    Random access into a chunk table: {position: row} for 0-based row positions.
+    Seeks straight to each row instead of parsing the whole file.
+    """
+    table = doc_dir / CHUNK_TABLE_FILE
+    stat = table.stat()
+    offsets = _row_offsets(str(table), stat.st_mtime_ns, stat.st_size)
+
+    rows = {}
+    with open(table, "rb") as f:
+        for position in sorted(set(positions)):
+            if 0 <= position < len(offsets):
+                f.seek(int(offsets[position]))
+                rows[position] = json.loads(f.readline())
+    return rows
+
+
+# ============================================================
+# 🧮 Embedding matrix
+# ============================================================
+
+def write_embedding_matrix(doc_dir: Path, vectors: np.ndarray, dtype: str = EMBEDDING_STORE_DTYPE) -> Path:
+    """Persist a document's embeddings as one contiguous .npy matrix."""
+    final_path = doc_dir / EMBEDDING_MATRIX_FILE
+    tmp_path = doc_dir / (EMBEDDING_MATRIX_FILE + ".tmp")
+
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(vectors, dtype=np.dtype(dtype)))
+
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def create_embedding_matrix(doc_dir: Path, shape: Tuple[int, int], dtype: str = EMBEDDING_STORE_DTYPE) -> np.memmap:
+    """
+    Create a writable memory-mapped embedding matrix (filled window by window).
+    Call `commit_embedding_matrix` once all rows are written.
+    """
+    tmp_path = doc_dir / (EMBEDDING_MATRIX_FILE + ".tmp")
+    return np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.dtype(dtype), shape=shape)
+
+
+def commit_embedding_matrix(doc_dir: Path, matrix: np.memmap) -> Path:
+    """Flush a matrix from `create_embedding_matrix` and move it into place."""
+    matrix.flush()
+    final_path = doc_dir / EMBEDDING_MATRIX_FILE
+    os.replace(doc_dir / (EMBEDDING_MATRIX_FILE + ".tmp"), final_path)
+    return final_path
+
+
+def open_embedding_matrix(doc_dir: Path) -> np.ndarray:
+    """Open a document's embedding matrix read-only with memory mapping."""
+    return np.load(doc_dir / EMBEDDING_MATRIX_FILE, mmap_mode="r")
+
+
+def has_embedding_matrix(doc_dir: Path) -> bool:
+    return (doc_dir / EMBEDDING_MATRIX_FILE).exists()
+
+
+# ============================================================
+# 📂 Session helpers
+# ============================================================
+
+def list_session_doc_dirs(session_id: str) -> List[Path]:
+    """Document folders of a session that have a chunk table."""
+    session_dir = PROCESSED_DIR / session_id
+    if not session_dir.exists():
+        logger.warning(f"⚠️ No processed folder for session: {session_id}")
+        return []
+    return sorted(d for d in session_dir.iterdir() if d.is_dir() and has_chunk_table(d))
@@ -1,17 +1,97 @@
 from pathlib import Path
 import json
+from typing import Iterable, Iterator
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from backend.utils.config import PROCESSED_DIR, CHUNK_SIZE, CHUNK_OVERLAP
+from backend.utils.config import PROCESSED_DIR, CHUNK_SIZE, CHUNK_OVERLAP, CHUNK_WINDOW_CHARS
 from backend.utils.logger import logger
+from backend.core.doc_processing_unit.chunk_store import write_chunk_table, iter_chunk_table
+from backend.core.doc_processing_unit.text_extractor import iter_txt_blocks
 
 
-def chunk_text(text):
-    splitter = RecursiveCharacterTextSplitter(
+def _get_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
         chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", " ", ""]
+        separators=["\n\n", "\n", " ", ""],
+        add_start_index=True,
     )
-    return splitter.split_text(text)
+
+
+def chunk_text(text):
+    return _get_splitter().split_text(text)
+
+
+def iter_chunks(pieces: Iterable[str], window_chars: int = CHUNK_WINDOW_CHARS) -> Iterator[str]:
+    """
+    Chunk streamed text with bounded memory.
+
+    Text is buffered up to `window_chars`; every chunk except the last is emitted,
+    and the buffer restarts at the last chunk's start so boundaries carry across
+    page / block breaks (and the usual overlap is preserved).
+    """
+    splitter = _get_splitter()
+    window_chars = max(window_chars, 4 * CHUNK_SIZE)
+    buffer = ""
+
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) < window_chars:
+            continue
+
+        docs = splitter.create_documents([buffer])
+        if len(docs) < 2:
+            continue
+
+        for doc in docs[:-1]:
+            yield doc.page_content
+        buffer = buffer[docs[-1].metadata["start_index"]:]
+
+    if buffer:
+        for chunk in splitter.split_text(buffer):
+            yield chunk
+
+
+def _chunk_row(session_id: str, entry: dict, i: int, total: int, text: str) -> dict:
+    return {
+        "chunk_id": f"{session_id}_{entry['doc_folder']}_chunk_{i}",
+        "session_id": session_id,
+        "doc_id": entry.get("doc_id"),
+        "source_doc_folder": entry["doc_folder"],
+        "original_file_name": entry["original_name"],
+        "original_file_path": entry["original_file_path"],
+        "chunk_index": i,
+        "total_chunks_in_file": total,
+        "file_order": entry["index"],
+        "doc_type": entry["file_type"],
+        "text": text
+    }
+
+
+def write_document_chunks(session_id: str, folder: Path, entry: dict, texts: Iterable[str]) -> int:
+    """Write chunk texts into the document's chunk table (with session metadata). Returns the count."""
+    # Texts are buffered per document so `total_chunks_in_file` is known before the single write
+    texts = list(texts)
+    total = len(texts)
+    rows = (_chunk_row(session_id, entry, i, total, text) for i, text in enumerate(texts, start=1))
+
+    # ✅ One chunk table per document, written once
+    return write_chunk_table(folder, rows)
+
+
+def chunk_document(session_id: str, folder: Path, entry: dict, pieces: Iterable[str] = None) -> int:
+    """
+    Chunk one cleaned document and stream its chunk table to disk. Returns the chunk count.
+    `pieces` lets callers feed cleaned text straight from the pipeline instead of re-reading
+    the cleaned file.
+    """
+    cleaned_file = folder / entry["cleaned_file"]
+
+    logger.info(f"✂ Chunking → {cleaned_file.name}")
+
+    if pieces is None:
+        pieces = iter_txt_blocks(cleaned_file)
+
+    return write_document_chunks(session_id, folder, entry, iter_chunks(pieces))
 
 
 def chunk_session_documents(session_id: str):
@@ -26,37 +106,11 @@ def chunk_session_documents(session_id: str):
 
     for entry in meta:
         folder = session_dir / entry["doc_folder"]
-        cleaned_file = folder / entry["cleaned_file"]
-
-        logger.info(f"✂ Chunking → {cleaned_file.name}")
-
-        text = cleaned_file.read_text(encoding="utf-8")
-        chunks = chunk_text(text)
-
-        chunk_root = folder / f"chunks_{entry['doc_folder']}"
-        chunk_root.mkdir(exist_ok=True)
-
-        for i, ch in enumerate(chunks, start=1):
-            cdir = chunk_root / f"chunk_{i}"
-            cdir.mkdir(exist_ok=True)
-
-            (cdir / "text.txt").write_text(ch, encoding="utf-8")
-
-            meta_json = {
-                "chunk_id": f"{session_id}_{entry['doc_folder']}_chunk_{i}",
-                "session_id": session_id,
-                "doc_id": entry.get("doc_id"),
-                "source_doc_folder": entry["doc_folder"],
-                "original_file_name": entry["original_name"],
-                "original_file_path": entry["original_file_path"],
-                "chunk_index": i,
-                "total_chunks_in_file": len(chunks),
-                "file_order": entry["index"],
-                "doc_type": entry["file_type"]
-            }
-
-            (cdir / "meta.json").write_text(json.dumps(meta_json, indent=2))
-            all_chunks.append(meta_json)
+        chunk_document(session_id, folder, entry)
+        all_chunks.extend(
+            {k: v for k, v in row.items() if k != "text"}
+            for row in iter_chunk_table(folder)
+        )
 
     logger.info(f"✅ Total chunks = {len(all_chunks)}")
     return all_chunks
\ No newline at end of file
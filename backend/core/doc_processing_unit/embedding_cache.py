@@ -0,0 +1,194 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from backend.utils.config import (
+    EMBEDDING_MODEL,
+    EMBED_CACHE_ENABLED,
+    EMBED_CACHE_PATH,
+    EMBED_CACHE_MAX_ENTRIES,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.batch_encoder import encode_texts_bucketed
+
+
+# ============================================================
+# 🧊 Persistent per-text embedding cache
+#
+#   key    = sha256(model name + whitespace-normalized text)
+#   vector = float16 bytes
+#
+# Backed by one SQLite table (WAL mode). Lookups and fills are batched;
+# `last_used` drives LRU eviction once the table outgrows `max_entries`.
+# ============================================================
+
+_SQL_BATCH = 500                 # max bound parameters per IN (...) lookup
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class EmbeddingCache:
+    """Text → embedding vector store shared by ingestion and retrieval."""
+
+    def __init__(
+        self,
+        path: Path = EMBED_CACHE_PATH,
+        model_name: str = EMBEDDING_MODEL,
+        max_entries: int = EMBED_CACHE_MAX_ENTRIES,
+        enabled: bool = EMBED_CACHE_ENABLED,
+    ):
+        self.path = Path(path)
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entries = 0
+
+    # --------------------------------------------------------
+    # 🔌 Connection (opened lazily, shared across threads)
+    # --------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+            self._entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._conn = conn
+            logger.info(f"🧊 Embedding cache opened: {self.path} ({self._entries} vectors)")
+        return self._conn
+
+    def key_for(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{normalize_text(text)}".encode()).hexdigest()
+
+    # --------------------------------------------------------
+    # 🔍 Batched lookup / fill
+    # --------------------------------------------------------
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return {key: float32 vector} for every cached key."""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(unique), _SQL_BATCH):
+                batch = unique[start:start + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                if rows:
+                    conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now, *(key for key, _ in rows)],
+                    )
+            conn.commit()
+
+        return found
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """Store vectors (as float16) for `keys`; evicts LRU entries when over capacity."""
+        if not keys:
+            return
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype=np.float16).tobytes(), now)
+            for key, vector in zip(keys, vectors)
+        ]
+
+        with self._lock:
+            conn = self._connect()
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows)
+            self._entries += conn.total_changes - before
+
+            # Evict in slices (10% headroom) instead of on every insert
+            if self._entries > self.max_entries:
+                target = int(self.max_entries * 0.9)
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (self._entries - target,),
+                )
+                metrics.incr("embedding_cache.evictions", self._entries - target)
+                self._entries = target
+            conn.commit()
+
+        metrics.set("embedding_cache.entries", self._entries)
+
+    # --------------------------------------------------------
+    # 🧠 Encode through the cache
+    # --------------------------------------------------------
+
+    def encode(
+        self,
+        model,
+        texts: List[str],
+        encode_fn: Callable = encode_texts_bucketed,
+        scope: str = "ingest",
+    ) -> np.ndarray:
+        """
+        Embed `texts`, encoding only those not cached (identical texts in the same
+        call are encoded once). Returns a float32 matrix in the order of `texts`.
+        `scope` labels the hit-rate metrics ("ingest" or "query").
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self.enabled:
+            return np.asarray(encode_fn(model, texts), dtype=np.float32)
+
+        keys = [self.key_for(t) for t in texts]
+        cached = self.get_many(keys)
+
+        # Unique misses, first occurrence wins
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            fresh = np.asarray(encode_fn(model, list(missing.values())), dtype=np.float32)
+            self.put_many(list(missing), fresh)
+            cached.update(zip(missing, fresh))
+
+        hits = len(texts) - len(missing)
+        metrics.incr(f"embedding_cache.{scope}.hits", hits)
+        metrics.incr(f"embedding_cache.{scope}.misses", len(missing))
+        total = metrics.get(f"embedding_cache.{scope}.hits", 0) + metrics.get(f"embedding_cache.{scope}.misses", 0)
+        metrics.set(f"embedding_cache.{scope}.hit_rate", round(metrics.get(f"embedding_cache.{scope}.hits", 0) / total, 4))
+
+        if hits:
+            logger.info(f"🧊 Embedding cache: {hits}/{len(texts)} {scope} texts served from cache")
+
+        return np.stack([cached[key] for key in keys])
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Singleton instance
+embedding_cache = EmbeddingCache()
@@ -1,75 +1,87 @@
-import json
-from pathlib import Path
-from typing import List, Dict
+from typing import Dict
 
 from backend.utils.logger import logger
-from backend.utils.config import PROCESSED_DIR
+from backend.utils.config import EMBED_WINDOW_CHUNKS
 from backend.core.doc_processing_unit.model_manager import get_embedding_model
-from backend.core.doc_processing_unit.qdrant_manager import upsert_embedding
-
-def embed_chunks(session_id: str, model=None) -> List[Dict]:
+from backend.core.doc_processing_unit.qdrant_manager import upsert_embeddings_bulk
+from backend.core.doc_processing_unit.embedding_cache import embedding_cache
+from backend.core.doc_processing_unit.chunk_store import (
+    list_session_doc_dirs,
+    count_chunk_rows,
+    iter_chunk_windows,
+    create_embedding_matrix,
+    commit_embedding_matrix,
+)
+
+def embed_chunks(session_id: str, model=None, window_chunks: int = EMBED_WINDOW_CHUNKS) -> Dict:
     """
     Generate embeddings for all chunks in a session and upsert them into Qdrant.
     ✅ Uses the preloaded model from FastAPI's app.state if passed.
+
+    Chunks are streamed from each document's chunk table in windows of
+    `window_chunks`: each window is encoded (embedding cache → length-bucketed
+    batches for the misses), written
+    into the memory-mapped embedding matrix and handed to the bulk upserter.
+    Memory stays bounded by the window, not by the document size.
+
+    Returns:
+        {
+            "total_embeddings": int,
+            "upsert": {...}        # bulk upsert summary (points, batches, throughput)
+        }
     """
 
     # ✅ Use preloaded model (from FastAPI app.state) if available
     if model is None:
         model = get_embedding_model()
 
-    session_dir = PROCESSED_DIR / session_id
-    doc_folders = [d for d in session_dir.iterdir() if d.is_dir() and d.name != "embeddings"]
+    doc_folders = list_session_doc_dirs(session_id)
 
     if not doc_folders:
         raise FileNotFoundError("❌ No document folders found. Run extraction + cleaning + chunking first.")
 
     logger.info(f"🧠 Generating embeddings for session: {session_id}")
 
-    total_embeddings = []
-
-    for doc_folder in doc_folders:
-        chunk_root = doc_folder / f"chunks_{doc_folder.name}"
-        if not chunk_root.exists():
-            logger.warning(f"⚠️ No chunks for {doc_folder.name}, skipping.")
-            continue
-
-        embed_dir = doc_folder / "embeddings"
-        embed_dir.mkdir(exist_ok=True)
-
-        chunk_folders = sorted(chunk_root.glob("chunk_*"))
-
-        for chunk_folder in chunk_folders:
-            text_file = chunk_folder / "text.txt"
-            meta_file = chunk_folder / "meta.json"
+    counts = {"total": 0}
 
-            if not text_file.exists() or not meta_file.exists():
-                logger.warning(f"⚠️ Missing files in {chunk_folder}, skipping.")
+    def _records():
+        for doc_folder in doc_folders:
+            n_rows = count_chunk_rows(doc_folder)
+            if n_rows == 0:
+                logger.warning(f"⚠️ No chunks for {doc_folder.name}, skipping.")
                 continue
 
-            text = text_file.read_text(encoding="utf-8")
-            meta = json.loads(meta_file.read_text(encoding="utf-8"))
-
-            # ✅ Generate embedding
-            vector = model.encode(text).tolist()
-
-            embed_record = {
-                "chunk_id": meta["chunk_id"],
-                "session_id": meta["session_id"],
-                "text": text,
-                "vector": vector,
-                "metadata": meta
-            }
-
-            # ✅ Save locally
-            chunk_id = meta["chunk_index"]
-            embed_file = embed_dir / f"chunk_{chunk_id}.json"
-            embed_file.write_text(json.dumps(embed_record, indent=2), encoding="utf-8")
-
-            # ✅ Upsert into Qdrant (uses global client from qdrant_manager)
-            upsert_embedding(embed_record)
-
-            total_embeddings.append(embed_record)
-            logger.info(f"✅ Saved & upserted embedding for {embed_file}")
-
-    logger.info(f"🎯 Total embeddings created & stored: {len(total_embeddings)}")
-    return total_embeddings
\ No newline at end of file
+            matrix = None
+            offset = 0
+
+            for window in iter_chunk_windows(doc_folder, window_chunks):
+                vectors = embedding_cache.encode(model, [row["text"] for row in window])
+
+                # ✅ Save locally (row i of embeddings.npy ↔ line i of chunks.jsonl)
+                if matrix is None:
+                    matrix = create_embedding_matrix(doc_folder, (n_rows, vectors.shape[1]))
+                matrix[offset:offset + len(window)] = vectors
+                offset += len(window)
+
+                for row, vector in zip(window, vectors):
+                    text = row.pop("text")
+                    yield {
+                        "chunk_id": row["chunk_id"],
+                        "session_id": row["session_id"],
+                        "text": text,
+                        "vector": vector.tolist(),
+                        "metadata": row
+                    }
+
+            commit_embedding_matrix(doc_folder, matrix)
+            counts["total"] += offset
+            logger.info(f"✅ Saved {offset} embeddings for {doc_folder.name}")
+
+    # ✅ Upsert into Qdrant in batches (uses global client from qdrant_manager)
+    upsert_summary = upsert_embeddings_bulk(_records())
+
+    logger.info(f"🎯 Total embeddings created & stored: {counts['total']}")
+    return {
+        "total_embeddings": counts["total"],
+        "upsert": upsert_summary
+    }
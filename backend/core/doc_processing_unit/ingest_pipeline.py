@@ -0,0 +1,378 @@
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from backend.utils.config import (
+    PROCESSED_DIR,
+    EMBED_WINDOW_CHUNKS,
+    PIPELINE_CHUNK_QUEUE_SIZE,
+    PIPELINE_POINT_QUEUE_SIZE,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.model_manager import get_embedding_model
+from backend.core.doc_processing_unit.parallel_ingest import (
+    iter_ingested_documents,
+    plan_session_ingest,
+    write_file_index,
+)
+from backend.core.doc_processing_unit.embedding_cache import embedding_cache
+from backend.core.doc_processing_unit.qdrant_manager import upsert_embeddings_bulk, delete_document_points
+from backend.core.doc_processing_unit.job_manager import JobCancelled
+from backend.core.doc_processing_unit.artifact_cache import artifact_cache
+from backend.core.doc_processing_unit.vector_store import refresh_session_vector_store
+from backend.core.doc_processing_unit.chunk_store import (
+    iter_chunk_windows,
+    create_embedding_matrix,
+    commit_embedding_matrix,
+    open_embedding_matrix,
+)
+
+
+# ============================================================
+# 🏗️ Overlapped staged ingestion
+#
+#   extract (process pool) ──chunk_q──▶ embed (batching encoder) ──point_q──▶ upsert (Qdrant writer)
+#
+# Each arrow is a bounded queue: a slow stage blocks its producer (backpressure),
+# so memory stays flat while all stages work at the same time.
+# ============================================================
+
+_DONE = object()
+
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class StageStats:
+    """Busy / idle accounting for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.started = None
+        self.finished = None
+        self.wait_seconds = 0.0      # blocked waiting for input
+        self.blocked_seconds = 0.0   # blocked on a full output queue
+        self.max_queue_depth = 0     # deepest input queue seen
+        self._depth_sum = 0
+        self._depth_samples = 0
+
+    def sample_depth(self, depth: int):
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_sum += depth
+        self._depth_samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        busy = max(0.0, elapsed - self.wait_seconds - self.blocked_seconds)
+        return {
+            "items": self.items,
+            "elapsed_seconds": round(elapsed, 3),
+            "busy_seconds": round(busy, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "utilization": round(busy / elapsed, 3) if elapsed > 0 else 0.0,
+            "max_queue_depth": self.max_queue_depth,
+            "avg_queue_depth": round(self._depth_sum / self._depth_samples, 2) if self._depth_samples else 0.0,
+        }
+
+
+class IngestionPipeline:
+    """
+    Runs extract → embed → upsert for one session as three concurrent stages.
+    Embedding starts on the first document's chunks while later files are still
+    being parsed, and upserts overlap with encoding.
+
+    Processing is incremental: only new or changed files (by content hash) go
+    through the stages; points of removed or replaced files are deleted by `doc_id`.
+    Files seen before in any session are restored from the artifact cache and skip
+    extraction and encoding (their stored vectors go straight to the upserter).
+
+    - `progress(counter, amount)` receives files_total / files_extracted / chunks_total /
+      chunks_embedded / points_upserted increments.
+    - Setting `cancel_event` stops all stages; `run` then raises JobCancelled.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        model=None,
+        window_chunks: int = EMBED_WINDOW_CHUNKS,
+        chunk_queue_size: int = PIPELINE_CHUNK_QUEUE_SIZE,
+        point_queue_size: int = PIPELINE_POINT_QUEUE_SIZE,
+        progress: Optional[Callable[[str, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ):
+        self.session_id = session_id
+        self.model = model or get_embedding_model()
+        self.window_chunks = window_chunks
+
+        self.chunk_q: queue.Queue = queue.Queue(maxsize=max(1, chunk_queue_size))
+        self.point_q: queue.Queue = queue.Queue(maxsize=max(1, point_queue_size))
+
+        self.stats = {name: StageStats(name) for name in ("extract", "embed", "upsert")}
+        self._errors: List[BaseException] = []
+        self._abort = threading.Event()
+        self._progress = progress or (lambda counter, amount: None)
+        self.cancel_event = cancel_event or threading.Event()
+
+        self.files: List[Dict] = []
+        self.unchanged_files = 0
+        self.removed_files = 0
+        self.chunks_per_doc: Dict[str, int] = {}
+        self.total_embeddings = 0
+        self.upsert_summary: Dict = {}
+
+    # --------------------------------------------------------
+    # 🔁 Queue helpers (timed, abort-aware)
+    # --------------------------------------------------------
+
+    def _check_abort(self):
+        if self._abort.is_set() or self.cancel_event.is_set():
+            raise PipelineAborted()
+
+    def _put(self, q: queue.Queue, item, stats: StageStats):
+        start = time.perf_counter()
+        while True:
+            self._check_abort()
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.blocked_seconds += time.perf_counter() - start
+
+    def _get(self, q: queue.Queue, stats: StageStats):
+        start = time.perf_counter()
+        stats.sample_depth(q.qsize())
+        while True:
+            self._check_abort()
+            try:
+                item = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        stats.wait_seconds += time.perf_counter() - start
+        return item
+
+    def _publish_depths(self):
+        metrics.set("ingest.chunk_queue_depth", self.chunk_q.qsize())
+        metrics.set("ingest.point_queue_depth", self.point_q.qsize())
+
+    # --------------------------------------------------------
+    # 1️⃣ Extract stage: documents → chunk windows
+    # --------------------------------------------------------
+
+    def _remove_documents(self, removed: List[Dict], kept: List[Dict]):
+        """Drop points and local artifacts of removed / replaced documents."""
+        delete_document_points(self.session_id, [entry["doc_id"] for entry in removed])
+
+        kept_folders = {entry["doc_folder"] for entry in kept}
+        for entry in removed:
+            if entry["doc_folder"] not in kept_folders:
+                shutil.rmtree(PROCESSED_DIR / self.session_id / entry["doc_folder"], ignore_errors=True)
+            logger.info(f"🗑️ Removed stale document: {entry['original_name']}")
+
+    def _send_document(self, entry: Dict, total_chunks: int, cached: bool):
+        """Queue a chunked document's rows, window by window, for the embed stage."""
+        stats = self.stats["extract"]
+        self.chunks_per_doc[entry["doc_folder"]] = total_chunks
+        stats.items += 1
+        self._progress("files_extracted", 1)
+        self._progress("chunks_total", total_chunks)
+
+        doc_dir = PROCESSED_DIR / self.session_id / entry["doc_folder"]
+
+        sent = 0
+        for window in iter_chunk_windows(doc_dir, self.window_chunks):
+            sent += len(window)
+            self._put(self.chunk_q, (entry, doc_dir, total_chunks, window, sent == total_chunks, cached), stats)
+            self._publish_depths()
+
+    def _extract_stage(self):
+        plan = plan_session_ingest(self.session_id)
+        kept = plan["keep"]
+        self.unchanged_files = len(kept)
+        self.removed_files = len(plan["remove"])
+        self._remove_documents(plan["remove"], kept)
+        self._progress("files_total", len(plan["ingest"]))
+
+        # Record pending entries up front (processed=False): if this run is interrupted,
+        # the next one deletes their partial points and ingests them again.
+        write_file_index(self.session_id, kept + [entry for entry, _ in plan["ingest"]])
+
+        # Cache hits are restored first; misses go to the process pool right away
+        hits, misses = [], []
+        for entry, file in plan["ingest"]:
+            doc_dir = PROCESSED_DIR / self.session_id / entry["doc_folder"]
+            total_chunks = artifact_cache.restore(self.session_id, doc_dir, entry)
+            if total_chunks is None:
+                misses.append((entry, file))
+            else:
+                hits.append((entry, total_chunks))
+
+        pooled = iter_ingested_documents(self.session_id, cancel_event=self.cancel_event, work=misses)
+
+        entries = []
+        for entry, total_chunks in hits:
+            entries.append(entry)
+            self._send_document(entry, total_chunks, cached=True)
+        for entry, total_chunks in pooled:
+            entries.append(entry)
+            self._send_document(entry, total_chunks, cached=False)
+
+        self._check_abort()
+        self.files = write_file_index(self.session_id, kept + entries)
+
+    # --------------------------------------------------------
+    # 2️⃣ Embed stage: chunk windows → point batches
+    # --------------------------------------------------------
+
+    def _embed_stage(self):
+        stats = self.stats["embed"]
+        matrices = {}
+        offsets = {}
+
+        while True:
+            item = self._get(self.chunk_q, stats)
+            if item is _DONE:
+                break
+
+            entry, doc_dir, total_chunks, window, is_last, cached = item
+            offset = offsets.get(doc_dir, 0)
+            offsets[doc_dir] = offset + len(window)
+
+            if cached:
+                # ✅ Restored from the artifact cache: vectors already on disk
+                vectors = np.asarray(open_embedding_matrix(doc_dir)[offset:offset + len(window)])
+            else:
+                vectors = embedding_cache.encode(self.model, [row["text"] for row in window])
+
+                # ✅ Save locally (row i of embeddings.npy ↔ line i of chunks.jsonl)
+                if doc_dir not in matrices:
+                    matrices[doc_dir] = create_embedding_matrix(doc_dir, (total_chunks, vectors.shape[1]))
+                matrices[doc_dir][offset:offset + len(window)] = vectors
+
+                if is_last:
+                    commit_embedding_matrix(doc_dir, matrices.pop(doc_dir))
+                    logger.info(f"✅ Saved {offsets[doc_dir]} embeddings for {doc_dir.name}")
+                    artifact_cache.store(doc_dir, entry)
+
+            records = []
+            for row, vector in zip(window, vectors):
+                text = row.pop("text")
+                records.append({
+                    "chunk_id": row["chunk_id"],
+                    "session_id": row["session_id"],
+                    "text": text,
+                    "vector": vector.tolist(),
+                    "metadata": row
+                })
+
+            stats.items += len(records)
+            self.total_embeddings += len(records)
+            self._progress("chunks_embedded", len(records))
+            self._put(self.point_q, records, stats)
+            self._publish_depths()
+
+    # --------------------------------------------------------
+    # 3️⃣ Upsert stage: point batches → Qdrant (bounded in-flight requests)
+    # --------------------------------------------------------
+
+    def _upsert_stage(self):
+        stats = self.stats["upsert"]
+
+        def _records() -> Iterator[Dict]:
+            while True:
+                batch = self._get(self.point_q, stats)
+                if batch is _DONE:
+                    return
+                stats.items += len(batch)
+                yield from batch
+
+        self.upsert_summary = upsert_embeddings_bulk(
+            _records(),
+            on_batch_done=lambda n_points: self._progress("points_upserted", n_points),
+        )
+
+    # --------------------------------------------------------
+    # 🚦 Orchestration
+    # --------------------------------------------------------
+
+    def _run_stage(self, name: str, fn, downstream: queue.Queue = None):
+        stats = self.stats[name]
+        stats.started = time.perf_counter()
+        try:
+            fn()
+            if downstream is not None:
+                self._put(downstream, _DONE, stats)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            logger.exception(f"❌ Ingestion stage '{name}' failed for session {self.session_id}")
+            self._errors.append(e)
+            self._abort.set()
+        finally:
+            stats.finished = time.perf_counter()
+
+    def run(self) -> Dict:
+        logger.info(f"🏗️ Starting staged ingestion pipeline for session: {self.session_id}")
+        start = time.perf_counter()
+
+        threads = [
+            threading.Thread(target=self._run_stage, args=("extract", self._extract_stage, self.chunk_q), daemon=True),
+            threading.Thread(target=self._run_stage, args=("embed", self._embed_stage, self.point_q), daemon=True),
+            threading.Thread(target=self._run_stage, args=("upsert", self._upsert_stage), daemon=True),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if self._errors:
+            raise self._errors[0]
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Ingestion cancelled for session {self.session_id}")
+
+        # 🧭 Session size decides the search backend (local NumPy index vs. Qdrant)
+        vector_store = refresh_session_vector_store(self.session_id, [e["doc_folder"] for e in self.files])
+
+        stage_stats = {name: s.to_dict() for name, s in self.stats.items()}
+        bottleneck = max(stage_stats, key=lambda name: stage_stats[name]["busy_seconds"])
+        metrics.set("ingest.last_run", {"session_id": self.session_id, "stages": stage_stats, "bottleneck": bottleneck})
+
+        seconds = time.perf_counter() - start
+        logger.info(
+            f"🎯 Ingestion finished in {seconds:.2f}s — {self.total_embeddings} embeddings, "
+            f"bottleneck stage: {bottleneck}"
+        )
+
+        return {
+            "files": self.files,
+            "ingested_files": len(self.chunks_per_doc),
+            "unchanged_files": self.unchanged_files,
+            "removed_files": self.removed_files,
+            "chunks_per_doc": self.chunks_per_doc,
+            "total_embeddings": self.total_embeddings,
+            "upsert": self.upsert_summary,
+            "stages": stage_stats,
+            "bottleneck": bottleneck,
+            "vector_store": vector_store["backend"],
+            "seconds": round(seconds, 3),
+        }
+
+
+def run_ingestion_pipeline(
+    session_id: str,
+    model=None,
+    progress: Optional[Callable[[str, int], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Dict:
+    """Convenience wrapper: build and run an `IngestionPipeline` for a session."""
+    return IngestionPipeline(session_id, model=model, progress=progress, cancel_event=cancel_event).run()
@@ -0,0 +1,144 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from backend.utils.config import PROCESS_JOB_WORKERS, PROCESS_JOB_HISTORY
+from backend.utils.logger import logger
+
+
+class JobCancelled(Exception):
+    """Raised by job code when cancellation was requested."""
+
+
+class ProcessingJob:
+    """
+    State of one background /process run.
+    Progress counters are updated from pipeline threads via `advance`.
+    """
+
+    def __init__(self, session_id: str):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.status = "queued"          # queued → running → completed | failed | cancelled
+        self.stage = "queued"
+        self.progress: Dict[str, int] = {
+            "files_total": 0,
+            "files_extracted": 0,
+            "chunks_total": 0,
+            "chunks_embedded": 0,
+            "points_upserted": 0,
+        }
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    def advance(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.progress[counter] = self.progress.get(counter, 0) + amount
+
+    def set_stage(self, stage: str):
+        self.stage = stage
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            progress = dict(self.progress)
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs processing jobs on a dedicated thread pool so the event loop
+    (and /health, /query, ...) never waits on ingestion.
+    """
+
+    def __init__(self, max_workers: int = PROCESS_JOB_WORKERS, history: int = PROCESS_JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="process-job")
+        self._jobs: Dict[str, ProcessingJob] = {}
+        self._history = history
+        self._lock = threading.Lock()
+
+    def submit(self, session_id: str, fn: Callable[[ProcessingJob], Dict[str, Any]]) -> ProcessingJob:
+        """Queue `fn(job)` for a session; returns the job immediately."""
+        job = ProcessingJob(session_id)
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict_finished()
+
+        self._executor.submit(self._run, job, fn)
+        logger.info(f"🧵 Queued processing job {job.job_id} for session {session_id}")
+        return job
+
+    def _run(self, job: ProcessingJob, fn: Callable[[ProcessingJob], Dict[str, Any]]):
+        if job.cancel_event.is_set():
+            job.status = job.stage = "cancelled"
+            job.finished_at = datetime.now().isoformat()
+            return
+
+        job.status = "running"
+        job.started_at = datetime.now().isoformat()
+        try:
+            job.result = fn(job)
+            job.status = job.stage = "completed"
+            logger.info(f"✅ Processing job {job.job_id} completed")
+        except JobCancelled:
+            job.status = job.stage = "cancelled"
+            logger.warning(f"🛑 Processing job {job.job_id} cancelled")
+        except Exception as e:
+            job.status = job.stage = "failed"
+            job.error = str(e)
+            logger.exception(f"❌ Processing job {job.job_id} failed")
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def get(self, job_id: str) -> Optional[ProcessingJob]:
+        return self._jobs.get(job_id)
+
+    def active_job_for_session(self, session_id: str) -> Optional[ProcessingJob]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.session_id == session_id and not job.finished:
+                    return job
+        return None
+
+    def cancel(self, job_id: str) -> Optional[ProcessingJob]:
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel_event.set()
+            logger.info(f"🛑 Cancellation requested for job {job_id}")
+        return job
+
+    def _evict_finished(self):
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in finished[:max(0, len(finished) - self._history)]:
+            del self._jobs[job.job_id]
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+job_manager = JobManager()
@@ -0,0 +1,320 @@
+import json
+import multiprocessing
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from backend.utils.config import PROCESSED_DIR, INGEST_WORKERS, PDF_PAGES_PER_TASK
+from backend.utils.logger import logger
+from backend.core.doc_processing_unit.text_extractor import (
+    build_file_entry,
+    count_pdf_pages,
+    file_content_hash,
+    iter_file_text,
+    iter_pdf_pages,
+    list_uploaded_files,
+    load_upload_metadata,
+    tee_text_stream,
+    write_text_stream,
+)
+from backend.core.doc_processing_unit.text_cleaner import clean_raw_file, cleaned_file_name, iter_clean_text
+from backend.core.doc_processing_unit.chunking import chunk_document
+from backend.core.doc_processing_unit.chunk_store import count_chunk_rows, has_chunk_table, has_embedding_matrix
+
+
+# ============================================================
+# 🏭 Shared process pool
+#   "spawn" keeps workers independent of the threads/torch state
+#   of the API process. The pool is reused across /process calls.
+# ============================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers: int = 0
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+
+    if _pool is None or _pool_workers != max_workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _pool_workers = max_workers
+        logger.info(f"🏭 Started ingestion process pool with {max_workers} workers")
+
+    return _pool
+
+
+def shutdown_ingest_pool():
+    """Stop the ingestion worker processes (called on app shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# ============================================================
+# 🧩 Worker tasks (run inside pool processes)
+# ============================================================
+
+def _ingest_file_task(session_id: str, entry: Dict, file_path: str) -> Tuple[Dict, int]:
+    """
+    Stream one whole file: pages → raw file → cleaning → clean file → chunk table.
+    Only a window of text is in memory at any time.
+    """
+    folder = PROCESSED_DIR / session_id / entry["doc_folder"]
+    entry["cleaned_file"] = cleaned_file_name(entry)
+
+    raw_pages = tee_text_stream(iter_file_text(Path(file_path)), folder / entry["stored_raw_file"])
+    cleaned = tee_text_stream(iter_clean_text(raw_pages), folder / entry["cleaned_file"])
+    total_chunks = chunk_document(session_id, folder, entry, pieces=cleaned)
+
+    return entry, total_chunks
+
+
+def _extract_range_task(file_path: str, start_page: int, end_page: int, part_path: str) -> str:
+    """Stream a PDF page range into a part file."""
+    write_text_stream(iter_pdf_pages(file_path, start_page, end_page), Path(part_path))
+    return part_path
+
+
+def _clean_and_chunk_task(session_id: str, entry: Dict) -> Tuple[Dict, int]:
+    folder = PROCESSED_DIR / session_id / entry["doc_folder"]
+    clean_raw_file(folder, entry)
+    total_chunks = chunk_document(session_id, folder, entry)
+    return entry, total_chunks
+
+
+def _plan_page_ranges(file: Path, pages_per_task: int) -> List[Tuple[Optional[int], Optional[int]]]:
+    """Split large PDFs into page ranges; every other file is a single task."""
+    if file.suffix.lower() != ".pdf":
+        return [(None, None)]
+
+    total_pages = count_pdf_pages(str(file))
+    if total_pages <= pages_per_task:
+        return [(None, None)]
+
+    return [
+        (start, min(start + pages_per_task, total_pages))
+        for start in range(0, total_pages, pages_per_task)
+    ]
+
+
+# ============================================================
+# 🔍 Incremental planning (content hash vs. file_index.json)
+# ============================================================
+
+def load_file_index(session_id: str) -> List[Dict]:
+    index_file = PROCESSED_DIR / session_id / "file_index.json"
+    if index_file.exists():
+        return json.loads(index_file.read_text(encoding="utf-8"))
+    return []
+
+
+def _is_unchanged(session_id: str, entry: Dict, file: Path) -> bool:
+    """A processed entry still matches its upload (size + mtime shortcut, then sha256)."""
+    if not entry.get("processed") or not entry.get("content_hash"):
+        return False
+
+    doc_dir = PROCESSED_DIR / session_id / entry["doc_folder"]
+    if not has_chunk_table(doc_dir):
+        return False
+    # A document with no chunks never gets embeddings.npy → its empty chunk table is enough
+    if not has_embedding_matrix(doc_dir) and count_chunk_rows(doc_dir) > 0:
+        return False
+
+    stat = file.stat()
+    if entry.get("file_size") == stat.st_size and entry.get("file_mtime_ns") == stat.st_mtime_ns:
+        return True
+
+    if file_content_hash(file) != entry["content_hash"]:
+        return False
+
+    # Same bytes, only touched → refresh the shortcut fields
+    entry["file_size"] = stat.st_size
+    entry["file_mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def plan_session_ingest(session_id: str) -> Dict[str, List]:
+    """
+    Compare the session's uploads with its file_index.json.
+
+    Returns:
+        {
+            "keep":   [entries already processed with identical content],
+            "ingest": [(new entry, upload path) for new or changed files],
+            "remove": [entries whose file was deleted or replaced]
+        }
+
+    New entries get fresh, never reused indexes (after the highest existing one).
+    Entries left unprocessed by an interrupted run are re-ingested.
+    """
+    upload_meta = load_upload_metadata(session_id)
+    uploaded_files = list_uploaded_files(session_id, upload_meta)
+
+    previous = {entry["original_name"]: entry for entry in load_file_index(session_id)}
+    next_idx = max((entry["index"] for entry in previous.values()), default=0) + 1
+
+    plan = {"keep": [], "ingest": [], "remove": []}
+    for file in uploaded_files:
+        old = previous.pop(file.name, None)
+        if old is not None and _is_unchanged(session_id, old, file):
+            plan["keep"].append(old)
+            continue
+
+        if old is not None:
+            plan["remove"].append(old)
+        plan["ingest"].append((build_file_entry(next_idx, file, upload_meta), file))
+        next_idx += 1
+
+    plan["remove"].extend(previous.values())
+
+    logger.info(
+        f"🔍 Incremental plan for {session_id}: {len(plan['keep'])} unchanged, "
+        f"{len(plan['ingest'])} to ingest, {len(plan['remove'])} to remove"
+    )
+    return plan
+
+
+def _full_session_work(session_id: str) -> List[Tuple[Dict, Path]]:
+    """Fresh entries for every uploaded file (non-incremental ingest)."""
+    upload_meta = load_upload_metadata(session_id)
+    return [
+        (build_file_entry(idx, file, upload_meta), file)
+        for idx, file in enumerate(list_uploaded_files(session_id, upload_meta), start=1)
+    ]
+
+
+# ============================================================
+# 🚀 Session ingestion (extract → clean → chunk)
+# ============================================================
+
+def iter_ingested_documents(
+    session_id: str,
+    max_workers: int = INGEST_WORKERS,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+    cancel_event: Optional[threading.Event] = None,
+    work: Optional[List[Tuple[Dict, Path]]] = None,
+) -> Iterator[Tuple[Dict, int]]:
+    """
+    Extract, clean and chunk uploaded files of a session in a process pool,
+    yielding `(file_index entry, chunk count)` as soon as each document is chunked
+    (completion order, not index order).
+
+    - `work` is a list of `(entry, upload path)` (see `plan_session_ingest`);
+      defaults to every uploaded file with fresh entries.
+    - Each file is one streaming task (pages → clean → chunk, bounded memory).
+    - Large PDFs are split into page ranges extracted by separate workers; once all
+      ranges are done, the joined raw file is cleaned + chunked as one stream.
+    - Setting `cancel_event` stops the iteration and cancels tasks not yet started.
+    - Tasks are submitted when this is called (not on first iteration), so callers
+      can do other work while the pool is already busy.
+    """
+    processed_dir = PROCESSED_DIR / session_id
+    processed_dir.mkdir(parents=True, exist_ok=True)
+
+    if work is None:
+        work = _full_session_work(session_id)
+        if not work:
+            logger.error(f"No uploaded files for session {session_id}")
+            return iter(())
+    if not work:
+        return iter(())
+
+    pool = _get_pool(max(1, max_workers))
+
+    # future → ("doc", entry) for chunked documents, ("part", idx) for PDF page ranges
+    pending: Dict = {}
+    parts: Dict[int, list] = {}
+    entries: Dict[int, Dict] = {}
+
+    # 1️⃣ Submit tasks: whole-file streaming ingest, or page-range extraction for large PDFs
+    for entry, file in work:
+        idx = entry["index"]
+        entries[idx] = entry
+        doc_dir = processed_dir / entry["doc_folder"]
+        doc_dir.mkdir(parents=True, exist_ok=True)
+
+        ranges = _plan_page_ranges(file, pages_per_task)
+        if len(ranges) == 1:
+            logger.info(f"📄 Ingesting: {file.name}")
+            pending[pool.submit(_ingest_file_task, session_id, entry, str(file))] = ("doc", idx)
+            continue
+
+        logger.info(f"📄 Extracting {file.name} in {len(ranges)} page ranges")
+        parts[idx] = []
+        for n, (start, end) in enumerate(ranges):
+            part_path = str(doc_dir / f"{entry['stored_raw_file']}.part{n}")
+            future = pool.submit(_extract_range_task, str(file), start, end, part_path)
+            parts[idx].append(future)
+            pending[future] = ("part", idx)
+
+    remaining = {idx: len(futures) for idx, futures in parts.items()}
+
+    # 2️⃣ Drain completions as they happen
+    def _drain() -> Iterator[Tuple[Dict, int]]:
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                for future in pending:
+                    future.cancel()
+                logger.warning(f"🛑 Ingestion cancelled for session {session_id}")
+                return
+
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                kind, idx = pending.pop(future)
+                result = future.result()  # surface worker errors early
+
+                if kind == "doc":
+                    yield result
+                    continue
+
+                # A PDF page range finished → when all are done, join and queue clean + chunk
+                remaining[idx] -= 1
+                if remaining[idx] == 0:
+                    entry = entries[idx]
+                    raw_path = processed_dir / entry["doc_folder"] / entry["stored_raw_file"]
+                    with open(raw_path, "w", encoding="utf-8") as raw_file:
+                        for part in parts[idx]:
+                            part_path = Path(part.result())
+                            with open(part_path, "r", encoding="utf-8") as part_file:
+                                shutil.copyfileobj(part_file, raw_file)
+                            part_path.unlink()
+                    logger.info(f"✅ Saved raw → {raw_path}")
+
+                    pending[pool.submit(_clean_and_chunk_task, session_id, entry)] = ("doc", idx)
+
+    return _drain()
+
+
+def write_file_index(session_id: str, entries: List[Dict]) -> List[Dict]:
+    """Write file_index.json in deterministic `index` order."""
+    meta = sorted(entries, key=lambda e: e["index"])
+    (PROCESSED_DIR / session_id / "file_index.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    logger.info(f"📁 Saved file_index.json ({len(meta)} files)")
+    return meta
+
+
+def ingest_session_documents(
+    session_id: str,
+    max_workers: int = INGEST_WORKERS,
+    pages_per_task: int = PDF_PAGES_PER_TASK,
+) -> Dict:
+    """
+    Extract, clean and chunk every uploaded file of a session (see `iter_ingested_documents`)
+    and merge the results into file_index.json in deterministic `index` order.
+
+    Returns:
+        {"files": [file_index entries], "chunks_per_doc": {doc_folder: chunk count}}
+    """
+    results = list(iter_ingested_documents(session_id, max_workers, pages_per_task))
+    meta = write_file_index(session_id, [entry for entry, _ in results])
+    chunks_per_doc = {entry["doc_folder"]: total for entry, total in results}
+    return {"files": meta, "chunks_per_doc": chunks_per_doc}
@@ -1,93 +1,408 @@
 import hashlib
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, List, Optional
+
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
+from qdrant_client.models import (
+    VectorParams,
+    Distance,
+    PointStruct,
+    PayloadSchemaType,
+    Filter,
+    FieldCondition,
+    MatchAny,
+    MatchValue,
+    FilterSelector,
+    KeywordIndexParams,
+    HnswConfigDiff,
+    Datatype,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    SearchParams,
+    QuantizationSearchParams,
+)
 
-from backend.utils.config import QDRANT_HOST, QDRANT_PORT, EMBEDDING_MODEL
+from backend.utils.config import (
+    QDRANT_HOST,
+    QDRANT_PORT,
+    QDRANT_UPSERT_BATCH_SIZE,
+    QDRANT_UPSERT_PARALLEL,
+    QDRANT_MULTITENANT,
+    QDRANT_SHARED_COLLECTION,
+    QDRANT_COLLECTION_PROFILE,
+    QDRANT_ON_DISK_PAYLOAD,
+    QDRANT_QUANTIZATION_RESCORE,
+    QDRANT_QUANTIZATION_OVERSAMPLING,
+    QDRANT_HNSW_M,
+    QDRANT_HNSW_EF_CONSTRUCT,
+    QDRANT_HNSW_EF,
+    QDRANT_SLIM_PAYLOAD,
+)
 from backend.utils.logger import logger
 
 
 # ✅ Connect to Qdrant (local docker or cloud)
 client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
 
+# Collections known to exist (resolved once per session, not once per point).
+# Names are dropped when a collection is deleted and re-checked at the start of every bulk upsert,
+# so a collection removed by reset or from outside Qdrant is recreated instead of failing the upsert.
+_known_collections: set = set()
+
 
 def string_to_int_id(s: str) -> int:
     """Convert string to deterministic integer ID (Qdrant requirement)"""
     return int(hashlib.sha256(s.encode()).hexdigest(), 16) % (10**12)
 
 
+def string_to_uuid_id(s: str) -> str:
+    """Deterministic UUID point ID (collision-safe across many sessions in one collection)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, s))
+
+
+def point_id_for(chunk_id: str):
+    if QDRANT_MULTITENANT:
+        return string_to_uuid_id(chunk_id)
+    return string_to_int_id(chunk_id)
+
+
 def get_collection_name(session_id: str) -> str:
-    """Each session gets its own vector collection"""
+    """Each session gets its own vector collection (or the shared one in multitenant mode)"""
+    if QDRANT_MULTITENANT:
+        return QDRANT_SHARED_COLLECTION
     return f"session_{session_id}"
 
 
-def create_collection_if_not_exists(session_id: str, vector_dim: int = 384):
+def session_filter(session_id: str, *conditions) -> Optional[Filter]:
+    """
+    Filter restricting a query / delete to one session.
+    In per-session mode the collection already isolates the session, so only
+    the extra `conditions` apply.
+    """
+    must = list(conditions)
+    if QDRANT_MULTITENANT:
+        must.append(FieldCondition(key="session_id", match=MatchValue(value=session_id)))
+    return Filter(must=must) if must else None
+
+
+# ============================================================
+# 🗜️ Collection profiles
+#   datatype  → how original vectors are stored (float32 / float16)
+#   on_disk   → original vectors memory-mapped from disk instead of RAM
+#   quantized → compact int8 / binary copy kept in RAM for the HNSW search,
+#               originals used only to rescore the oversampled candidates
+# ============================================================
+
+COLLECTION_PROFILES: Dict[str, Dict] = {
+    "float32": {"datatype": Datatype.FLOAT32, "on_disk": False, "quantization": None},
+    "float16": {"datatype": Datatype.FLOAT16, "on_disk": False, "quantization": None},
+    "float16_on_disk": {"datatype": Datatype.FLOAT16, "on_disk": True, "quantization": None},
+    "int8": {"datatype": Datatype.FLOAT32, "on_disk": True, "quantization": "int8"},
+    "binary": {"datatype": Datatype.FLOAT32, "on_disk": True, "quantization": "binary"},
+}
+
+
+def _quantization_config(kind: Optional[str]):
+    if kind == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if kind == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def collection_config(vector_dim: int, profile: str = QDRANT_COLLECTION_PROFILE) -> Dict:
+    """`create_collection` kwargs for a profile (see COLLECTION_PROFILES)."""
+    if profile not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown Qdrant collection profile: {profile}")
+    spec = COLLECTION_PROFILES[profile]
+
+    return {
+        "vectors_config": VectorParams(
+            size=vector_dim,
+            distance=Distance.COSINE,
+            datatype=spec["datatype"],
+            on_disk=spec["on_disk"],
+        ),
+        "hnsw_config": HnswConfigDiff(m=QDRANT_HNSW_M, ef_construct=QDRANT_HNSW_EF_CONSTRUCT),
+        "quantization_config": _quantization_config(spec["quantization"]),
+        "on_disk_payload": QDRANT_ON_DISK_PAYLOAD,
+    }
+
+
+def search_params(profile: str = QDRANT_COLLECTION_PROFILE, exact: bool = False) -> SearchParams:
+    """
+    Query-time params: brute force when `exact`, otherwise HNSW with QDRANT_HNSW_EF.
+    Quantized profiles also rescore oversampled candidates.
+    """
+    quantization = None
+    if COLLECTION_PROFILES.get(profile, {}).get("quantization") is not None:
+        quantization = QuantizationSearchParams(
+            rescore=QDRANT_QUANTIZATION_RESCORE,
+            oversampling=QDRANT_QUANTIZATION_OVERSAMPLING,
+        )
+    return SearchParams(
+        exact=exact,
+        hnsw_ef=None if exact else QDRANT_HNSW_EF,
+        quantization=quantization,
+    )
+
+
+def embedding_dimension() -> int:
+    """Output dimension of the loaded embedding model."""
+    from backend.core.doc_processing_unit.model_manager import get_embedding_model
+    return get_embedding_model().get_sentence_embedding_dimension()
+
+
+def create_shared_collection(collection_name: str, vector_dim: int):
+    """
+    Multitenant collection: `session_id` is a tenant keyword index, so Qdrant
+    co-locates each session's points; HNSW graphs are built per tenant
+    (payload_m) instead of one global graph (m=0).
+    """
+    config = collection_config(vector_dim)
+    config["hnsw_config"] = HnswConfigDiff(payload_m=QDRANT_HNSW_M, m=0, ef_construct=QDRANT_HNSW_EF_CONSTRUCT)
+    client.create_collection(collection_name=collection_name, **config)
+    client.create_payload_index(
+        collection_name=collection_name,
+        field_name="session_id",
+        field_schema=KeywordIndexParams(type="keyword", is_tenant=True),
+    )
+    client.create_payload_index(
+        collection_name=collection_name,
+        field_name="doc_id",
+        field_schema=PayloadSchemaType.KEYWORD,
+    )
+
+
+def create_collection_if_not_exists(session_id: str, vector_dim: Optional[int] = None):
     """
-    Create Qdrant collection for a session if not exists.
-    
-    ⚠️ BGE-small embedding dimension = 384
+    Create Qdrant collection for a session if not exists, using the configured
+    QDRANT_COLLECTION_PROFILE. Existing collections keep their original profile.
+
+    `vector_dim` defaults to the loaded embedding model's dimension.
     """
 
     collection_name = get_collection_name(session_id)
 
-    collections = client.get_collections().collections
-    existing = [c.name for c in collections]
+    if collection_name in _known_collections:
+        return
+
+    if vector_dim is None:
+        vector_dim = embedding_dimension()
+
+    if QDRANT_MULTITENANT:
+        if not client.collection_exists(collection_name):
+            logger.info(f"🏢 Creating shared multitenant collection: {collection_name}")
+            create_shared_collection(collection_name, vector_dim)
+        _known_collections.add(collection_name)
+        return
 
-    if collection_name in existing:
+    if client.collection_exists(collection_name):
         logger.info(f"📦 Collection already exists: {collection_name}")
+        _known_collections.add(collection_name)
         return
 
-    logger.info(f"🚀 Creating Qdrant collection: {collection_name}")
+    logger.info(f"🚀 Creating Qdrant collection: {collection_name} (profile={QDRANT_COLLECTION_PROFILE}, dim={vector_dim})")
 
     client.create_collection(
         collection_name=collection_name,
-        vectors_config=VectorParams(
-            size=vector_dim,
-            distance=Distance.COSINE
-        )
+        **collection_config(vector_dim),
+    )
+
+    # ✅ Index doc_id so per-document deletes (incremental processing) are filtered, not scanned
+    client.create_payload_index(
+        collection_name=collection_name,
+        field_name="doc_id",
+        field_schema=PayloadSchemaType.KEYWORD,
     )
+    _known_collections.add(collection_name)
     logger.info(f"🚀 Created Qdrant collection: {collection_name}")
 
 
+# Slim payload: filter keys + locator of the row in <session>/<source_doc_folder>/chunks.jsonl
+PAYLOAD_FIELDS = ("session_id", "doc_id", "source_doc_folder", "chunk_index")
+
+
+def _build_point(record: dict) -> PointStruct:
+    """Convert an embedding record into a Qdrant point."""
+
+    # ✅ Convert chunk string ID → numeric ID for Qdrant
+    point_id = point_id_for(record["chunk_id"])
+
+    if QDRANT_SLIM_PAYLOAD:
+        # ✅ Text + citation fields stay in the local chunk store
+        metadata = record["metadata"]
+        payload = {"session_id": record["session_id"]}
+        payload.update((key, metadata.get(key)) for key in PAYLOAD_FIELDS[1:])
+    else:
+        payload = {
+            "chunk_id": record["chunk_id"],
+            "session_id": record["session_id"],
+            "text": record["text"],          # ✅ store text in Qdrant
+            **record["metadata"]             # ✅ include metadata fields
+        }
+
+    return PointStruct(
+        id=point_id,        # Chunk ID as Qdrant ID
+        vector=record["vector"],      # Embedding vector
+        payload=payload
+    )
+
+
 def upsert_embedding(record: dict):
     """
     Upsert a single embedding into Qdrant.
+    Prefer `upsert_embeddings_bulk` when ingesting many chunks.
+    """
+    upsert_embeddings_bulk([record])
+    logger.info(f"📥 Upserted chunk to Qdrant: {record['chunk_id']}")
+
+
+def upsert_embeddings_bulk(
+    records: Iterable[dict],
+    batch_size: int = QDRANT_UPSERT_BATCH_SIZE,
+    parallel: int = QDRANT_UPSERT_PARALLEL,
+    on_batch_done: Optional[Callable[[int], None]] = None,
+) -> Dict:
     """
+    Upsert many embedding records into Qdrant.
 
-    session_id = record["session_id"]
-    collection_name = get_collection_name(session_id)
+    - Records are grouped per collection into batches of `batch_size` points.
+    - At most `parallel` batch requests are in flight at any time.
+    - Collection existence is checked once per session, not once per point.
+    - `on_batch_done(n_points)` is called after each batch is acknowledged (progress reporting).
 
-    # Ensure collection exists
-    create_collection_if_not_exists(session_id)
+    Returns an ingestion summary:
+        {"points": int, "batches": int, "seconds": float, "points_per_sec": float}
+    """
+    batch_size = max(1, batch_size)
+    parallel = max(1, parallel)
 
-    # ✅ Convert chunk string ID → numeric ID for Qdrant
-    point_id = string_to_int_id(record["chunk_id"])
+    start = time.perf_counter()
+    checked: set = set()     # collections verified during this call
+    pending: Dict[str, List[PointStruct]] = {}
+    in_flight = {}
+    total_points = 0
+    total_batches = 0
+
+    def _collect_done(block_until_below: int):
+        while len(in_flight) >= block_until_below and in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                n_points = in_flight.pop(future)
+                future.result()  # re-raise upsert errors
+                if on_batch_done is not None:
+                    on_batch_done(n_points)
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+
+        def _submit(collection_name: str, points: List[PointStruct]):
+            nonlocal total_batches
+            _collect_done(parallel)
+            future = executor.submit(
+                client.upsert,
+                collection_name=collection_name,
+                points=points,
+                wait=True,
+            )
+            in_flight[future] = len(points)
+            total_batches += 1
+
+        for record in records:
+            session_id = record["session_id"]
+            collection_name = get_collection_name(session_id)
+            if collection_name not in checked:
+                # May have been deleted since we last saw it → ask Qdrant once per call
+                _known_collections.discard(collection_name)
+                create_collection_if_not_exists(session_id, vector_dim=len(record["vector"]))
+                checked.add(collection_name)
+
+            batch = pending.setdefault(collection_name, [])
+            batch.append(_build_point(record))
+            total_points += 1
+
+            if len(batch) >= batch_size:
+                _submit(collection_name, pending.pop(collection_name))
 
-    payload = {
-        "chunk_id": record["chunk_id"],
-        "session_id": record["session_id"],
-        "text": record["text"],          # ✅ store text in Qdrant
-        **record["metadata"]             # ✅ include metadata fields
+        for collection_name, batch in pending.items():
+            if batch:
+                _submit(collection_name, batch)
+
+        _collect_done(1)
+
+    seconds = time.perf_counter() - start
+    summary = {
+        "points": total_points,
+        "batches": total_batches,
+        "seconds": round(seconds, 3),
+        "points_per_sec": round(total_points / seconds, 1) if seconds > 0 else 0.0,
     }
 
-    point = PointStruct(
-        id=point_id,        # Chunk ID as Qdrant ID
-        vector=record["vector"],      # Embedding vector
-        payload=payload
+    logger.info(
+        f"📥 Bulk upserted {total_points} points in {total_batches} batches "
+        f"({summary['points_per_sec']} points/sec)"
     )
+    return summary
+
 
-    client.upsert(
+def delete_document_points(session_id: str, doc_ids: List[str]):
+    """
+    Delete every point belonging to the given documents (payload `doc_id` filter).
+    Used when a file is removed or replaced before re-processing a session.
+    """
+    if not doc_ids:
+        return
+
+    collection_name = get_collection_name(session_id)
+    if collection_name not in _known_collections and not client.collection_exists(collection_name):
+        return
+
+    client.delete(
         collection_name=collection_name,
-        points=[point]
+        points_selector=FilterSelector(
+            filter=session_filter(session_id, FieldCondition(key="doc_id", match=MatchAny(any=list(doc_ids))))
+        ),
+        wait=True,
     )
+    logger.info(f"🗑️ Deleted points of {len(doc_ids)} document(s) from {collection_name}")
+
+
+def delete_session_points(session_id: str):
+    """
+    Remove every vector of a session: drops the per-session collection, or
+    (multitenant mode) deletes the session's points from the shared collection.
+    """
+    if not QDRANT_MULTITENANT:
+        delete_collection(get_collection_name(session_id))
+        return
+
+    collection_name = get_collection_name(session_id)
+    _known_collections.discard(collection_name)   # re-checked on the next upsert
+    try:
+        if collection_name in _known_collections or client.collection_exists(collection_name):
+            client.delete(
+                collection_name=collection_name,
+                points_selector=FilterSelector(filter=session_filter(session_id)),
+                wait=True,
+            )
+            logger.info(f"🗑️ Deleted points of session {session_id} from {collection_name}")
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to delete points of session {session_id}: {e}")
 
-    logger.info(f"📥 Upserted chunk to Qdrant: {record['chunk_id']}")
-    
 
 def delete_collection(collection_name: str):
     """
     Delete a Qdrant collection safely.
     Used when clearing or resetting a user session.
     """
+    _known_collections.discard(collection_name)
     try:
         client.delete_collection(collection_name=collection_name)
         logger.info(f"🗑️ Deleted Qdrant collection: {collection_name}")
@@ -1,16 +1,85 @@
 import re, json
 from pathlib import Path
+from typing import Iterable, Iterator
 from backend.utils.logger import logger
-from backend.utils.config import PROCESSED_DIR
+from backend.utils.config import PROCESSED_DIR, STREAM_BLOCK_CHARS
+from backend.core.doc_processing_unit.text_extractor import iter_txt_blocks, write_text_stream
 
+# Bump when cleaning rules change (invalidates the artifact cache)
+CLEANER_VERSION = "1"
 
-def clean_text(text: str) -> str:
+# Two adjacent ASCII letters/digits: no cleaning rule can match across them
+_SAFE_CUT = re.compile(r'[A-Za-z0-9](?=[A-Za-z0-9])')
+
+
+def _clean_segment(text: str) -> str:
     text = text.replace("-\n", "")
     text = re.sub(r'\n\s*\n+', '\n\n', text)
     text = re.sub(r' +', ' ', text)
     text = re.sub(r'[^\x00-\x7F]+', ' ', text)
     text = re.sub(r'([.!?])\1+', r'\1', text)
-    return text.strip()
+    return text
+
+
+def clean_text(text: str) -> str:
+    return _clean_segment(text).strip()
+
+
+def iter_clean_text(pieces: Iterable[str], window_chars: int = STREAM_BLOCK_CHARS) -> Iterator[str]:
+    """
+    Incrementally clean streamed text (pages, blocks, ...).
+
+    Every rule only matches runs of whitespace / punctuation / non-ASCII, so the
+    buffer is only cut between two ASCII alphanumerics. The joined output is
+    identical to `clean_text` on the full text, while memory stays ~`window_chars`.
+    """
+    buffer = ""
+    started = False
+
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) < window_chars:
+            continue
+
+        cut = None
+        for match in _SAFE_CUT.finditer(buffer, max(0, len(buffer) - window_chars)):
+            cut = match.end()
+        if cut is None:
+            continue
+
+        segment, buffer = _clean_segment(buffer[:cut]), buffer[cut:]
+        if not started:
+            segment = segment.lstrip()
+            started = bool(segment)
+        if segment:
+            yield segment
+
+    tail = _clean_segment(buffer).rstrip()
+    if not started:
+        tail = tail.lstrip()
+    if tail:
+        yield tail
+
+
+def cleaned_file_name(entry: dict) -> str:
+    return entry["stored_raw_file"].replace("raw_", "clean_")
+
+
+def clean_raw_file(folder: Path, entry: dict) -> Path:
+    """Clean one document's raw text file and record the cleaned file name in `entry`."""
+    raw_file = folder / entry["stored_raw_file"]
+
+    logger.info(f"🧹 Cleaning → {raw_file.name}")
+
+    clean_file_name = cleaned_file_name(entry)
+    clean_file = folder / clean_file_name
+
+    write_text_stream(iter_clean_text(iter_txt_blocks(raw_file)), clean_file)
+
+    entry["cleaned_file"] = clean_file_name
+
+    logger.info(f"✅ Saved cleaned → {clean_file}")
+    return clean_file
 
 
 def clean_all_raw_files(session_id: str) -> list:
@@ -25,22 +94,8 @@ def clean_all_raw_files(session_id: str) -> list:
 
     for entry in meta:
         folder = session_dir / entry["doc_folder"]
-        raw_file = folder / entry["stored_raw_file"]
-
-        logger.info(f"🧹 Cleaning → {raw_file.name}")
-
-        text = raw_file.read_text(encoding="utf-8")
-        cleaned_text = clean_text(text)
-
-        clean_file_name = raw_file.name.replace("raw_", "clean_")
-        clean_file = folder / clean_file_name
-
-        clean_file.write_text(cleaned_text, encoding="utf-8")
+        clean_file = clean_raw_file(folder, entry)
         cleaned_paths.append(str(clean_file))
 
-        entry["cleaned_file"] = clean_file_name
-
-        logger.info(f"✅ Saved cleaned → {clean_file}")
-
     (session_dir / "file_index.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
     return cleaned_paths
\ No newline at end of file
@@ -2,112 +2,194 @@ import pdfplumber
 from docx import Document
 from pathlib import Path
 from datetime import datetime
+import hashlib
 import json
 import re
 import uuid
+from typing import Iterable, Iterator
 
-from backend.utils.config import PROCESSED_DIR, UPLOAD_DIR
+from backend.utils.config import PROCESSED_DIR, UPLOAD_DIR, STREAM_BLOCK_CHARS
 from backend.utils.logger import logger
 
+# Bump when extraction output changes (invalidates the artifact cache)
+EXTRACTOR_VERSION = "1"
+
 
 def clean_filename(name: str) -> str:
     return re.sub(r'[^a-zA-Z0-9_\-]', '_', name)
 
 
-def extract_text_from_pdf(file_path: str) -> str:
-    text = ""
+def count_pdf_pages(file_path: str) -> int:
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pdf_pages(file_path: str, start_page: int = 0, end_page: int = None) -> Iterator[str]:
+    """Yield the text of each PDF page in [start_page, end_page), one page at a time."""
     try:
         with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
+            for page in pdf.pages[start_page:end_page]:
                 words = page.extract_words()
                 page_text = " ".join([w["text"] for w in words]) if words else (page.extract_text() or "")
                 page_text = page_text.replace("-\n", "")
                 page_text = " ".join(page_text.split())
-                text += page_text + "\n\n"
-        return text
+                page.close()  # release cached layout objects of this page
+                yield page_text + "\n\n"
     except Exception as e:
         logger.error(f"PDF extraction failed for {file_path}: {e}")
         raise
 
 
-def extract_text_from_docx(file_path: str) -> str:
-    text = ""
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
     try:
         doc = Document(file_path)
         for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
+            yield para.text + "\n"
     except Exception as e:
         logger.error(f"DOCX extraction failed for {file_path}: {e}")
         raise
 
 
-def extract_single_file(file_path: Path) -> str:
+def iter_txt_blocks(file_path: Path, block_size: int = STREAM_BLOCK_CHARS) -> Iterator[str]:
+    with open(file_path, "r", encoding="utf-8") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+def iter_file_text(file_path: Path) -> Iterator[str]:
+    """Stream a file's text as pages / paragraphs / blocks."""
     ext = file_path.suffix.lower()
-    if ext == ".pdf": return extract_text_from_pdf(file_path)
-    if ext in [".docx", ".doc"]: return extract_text_from_docx(file_path)
-    if ext == ".txt": return file_path.read_text(encoding="utf-8")
+    if ext == ".pdf": return iter_pdf_pages(str(file_path))
+    if ext in [".docx", ".doc"]: return iter_docx_paragraphs(str(file_path))
+    if ext == ".txt": return iter_txt_blocks(file_path)
     raise ValueError(f"Unsupported file type: {ext}")
 
 
-def extract_all_files(session_id: str) -> list:
+def extract_text_from_pdf(file_path: str, start_page: int = 0, end_page: int = None) -> str:
+    """Extract text from a PDF, optionally limited to pages [start_page, end_page)."""
+    return "".join(iter_pdf_pages(file_path, start_page, end_page))
+
+
+def extract_text_from_docx(file_path: str) -> str:
+    return "".join(iter_docx_paragraphs(file_path))
+
+
+def extract_single_file(file_path: Path) -> str:
+    return "".join(iter_file_text(file_path))
+
+
+def tee_text_stream(pieces: Iterable[str], path: Path) -> Iterator[str]:
+    """Pass streamed text through while also writing it to `path`."""
+    with open(path, "w", encoding="utf-8") as f:
+        for piece in pieces:
+            f.write(piece)
+            yield piece
+
+
+def write_text_stream(pieces: Iterable[str], path: Path) -> int:
+    """Write streamed text to `path` without holding it in memory. Returns chars written."""
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for piece in pieces:
+            f.write(piece)
+            written += len(piece)
+    return written
+
+
+def load_upload_metadata(session_id: str) -> list:
+    upload_meta_file = PROCESSED_DIR / session_id / "upload_metadata.json"
+    if upload_meta_file.exists():
+        return json.loads(upload_meta_file.read_text(encoding="utf-8"))
+    return []
+
+
+def list_uploaded_files(session_id: str, upload_meta: list = None) -> list:
+    """
+    Uploaded files of a session in a deterministic order:
+    upload order (from upload_metadata.json) first, then by file name.
+    """
     upload_dir = UPLOAD_DIR / session_id
-    processed_dir = PROCESSED_DIR / session_id
+    if not upload_dir.exists():
+        return []
+
+    upload_order = {x["file_name"]: i for i, x in enumerate(upload_meta or [])}
+    files = [f for f in upload_dir.iterdir() if f.is_file()]
+    return sorted(files, key=lambda f: (upload_order.get(f.name, len(upload_order)), f.name))
+
+
+def file_content_hash(file: Path, block_size: int = 1 << 20) -> str:
+    """sha256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_file_entry(idx: int, file: Path, upload_meta: list, content_hash: str = None) -> dict:
+    """Build the file_index.json entry for one uploaded file."""
+    safe_name = clean_filename(file.stem)
+    stat = file.stat()
+
+    # ✅ Find upload time if available
+    upload_time = None
+    if upload_meta:
+        entry = next((x for x in upload_meta if x["file_name"] == file.name), None)
+        if entry:
+            upload_time = entry["uploaded_at"]
+
+    return {
+        "index": idx,
+        "doc_id": str(uuid.uuid4()),
+        "original_name": file.name,
+        "stored_raw_file": f"raw_{idx}_{safe_name}.txt",
+        "doc_folder": safe_name,
+        "file_type": file.suffix.lower(),
+        "original_file_path": str(file),
+        "uploaded_at": upload_time or datetime.now().isoformat(),
+        "content_hash": content_hash or file_content_hash(file),
+        "file_size": stat.st_size,
+        "file_mtime_ns": stat.st_mtime_ns,
+        "processed": False
+    }
+
 
+def extract_all_files(session_id: str) -> list:
+    processed_dir = PROCESSED_DIR / session_id
     processed_dir.mkdir(parents=True, exist_ok=True)
 
-    uploaded_files = list(upload_dir.iterdir())
+    # ✅ Load upload metadata (if available)
+    upload_meta = load_upload_metadata(session_id)
+
+    uploaded_files = list_uploaded_files(session_id, upload_meta)
     if not uploaded_files:
         logger.error(f"No uploaded files for session {session_id}")
         return []
 
-    # ✅ Load upload metadata (if available)
-    upload_meta_file = processed_dir / "upload_metadata.json"
-    upload_meta = []
-    if upload_meta_file.exists():
-        upload_meta = json.loads(upload_meta_file.read_text(encoding="utf-8"))
-
     raw_paths = []
     meta = []
 
     for idx, file in enumerate(uploaded_files, start=1):
-        safe_name = clean_filename(file.stem)
-        doc_dir = processed_dir / safe_name
+        entry = build_file_entry(idx, file, upload_meta)
+        doc_dir = processed_dir / entry["doc_folder"]
         doc_dir.mkdir(parents=True, exist_ok=True)
 
         logger.info(f"📄 Extracting: {file.name}")
 
-        text = extract_single_file(file)
-        raw_file_name = f"raw_{idx}_{safe_name}.txt"
-        raw_path = doc_dir / raw_file_name
-
-        raw_path.write_text(text, encoding="utf-8")
+        raw_path = doc_dir / entry["stored_raw_file"]
+        write_text_stream(iter_file_text(file), raw_path)
         raw_paths.append(str(raw_path))
 
-        # ✅ Find upload time if available
-        upload_time = None
-        if upload_meta:
-            entry = next((x for x in upload_meta if x["file_name"] == file.name), None)
-            if entry:
-                upload_time = entry["uploaded_at"]
-
         # ✅ Build metadata entry
-        meta.append({
-            "index": idx,
-            "doc_id": str(uuid.uuid4()),
-            "original_name": file.name,
-            "stored_raw_file": raw_file_name,
-            "doc_folder": safe_name,
-            "file_type": file.suffix.lower(),
-            "original_file_path": str(file),
-            "uploaded_at": upload_time or datetime.now().isoformat(),
-            "processed": False
-        })
+        meta.append(entry)
 
         logger.info(f"✅ Saved raw → {raw_path}")
 
     meta_file = processed_dir / "file_index.json"
     meta_file.write_text(json.dumps(meta, indent=2), encoding="utf-8")
 
-    logger.info(f"📁 Saved file_index.json")
-    return raw_paths
\ No newline at end of file
+    logger.info("📁 Saved file_index.json")
+    return raw_paths
@@ -0,0 +1,374 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.config import (
+    PROCESSED_DIR,
+    VECTOR_STORE_BACKEND,
+    LOCAL_VECTOR_STORE_MAX_POINTS,
+    LOCAL_VECTOR_STORE_MAX_SESSIONS,
+    QDRANT_MULTITENANT,
+    QDRANT_EXACT_SEARCH_MAX_POINTS,
+    QDRANT_POINT_COUNT_TTL_SEC,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.qdrant_manager import client, get_collection_name, session_filter, search_params
+from backend.core.doc_processing_unit.chunk_store import (
+    count_chunk_rows,
+    has_embedding_matrix,
+    open_embedding_matrix,
+    read_chunk_rows,
+)
+
+
+# ============================================================
+# 🧭 Pluggable vector stores (read side)
+#
+#   Qdrant is always written during ingestion and stays the durable store.
+#   After each /process run the session's size picks the search backend:
+#     • LocalVectorStore  → small sessions: normalized float32 matrix (memmap)
+#                           + NumPy dot product + argpartition top-k, no network
+#     • QdrantVectorStore → everything else
+#   The choice is recorded in <session>/vector_index.json.
+#
+#   search() returns [{"score": float, "payload": dict}] best first.
+# ============================================================
+
+INDEX_META_FILE = "vector_index.json"
+INDEX_MATRIX_FILE = "vector_index.npy"
+
+# Only fields needed to locate the chunk row; everything else is read from the chunk store
+SEARCH_PAYLOAD_FIELDS = ["source_doc_folder", "chunk_index"]
+
+
+def _read_rows(session_id: str, locators: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict]:
+    """Chunk rows for (doc_folder, 0-based position) locators, one seek per row."""
+    session_dir = PROCESSED_DIR / session_id
+    wanted: Dict[str, List[int]] = {}
+    for folder, position in locators:
+        wanted.setdefault(folder, []).append(position)
+
+    rows = {}
+    for folder, positions in wanted.items():
+        try:
+            found = read_chunk_rows(session_dir / folder, positions)
+        except (OSError, TypeError) as e:
+            logger.warning(f"⚠️ Chunk store unavailable for {session_id}/{folder}: {e}")
+            continue
+        rows.update(((folder, position), row) for position, row in found.items())
+    return rows
+
+
+class VectorStore:
+    """Interface every search backend implements."""
+
+    name = "base"
+
+    def search(self, session_id: str, query_vector, top_k: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def count(self, session_id: str) -> int:
+        raise NotImplementedError
+
+    def drop_session(self, session_id: str):
+        """Forget any state held for a session (called on reset)."""
+
+
+class QdrantVectorStore(VectorStore):
+    """
+    Qdrant search. Small sessions (≤ QDRANT_EXACT_SEARCH_MAX_POINTS) use exact
+    search: brute force over a few hundred points beats HNSW and loses no recall.
+    With VECTOR_STORE_BACKEND="auto" small sessions never get here (the local
+    store serves them), so the threshold matters when Qdrant is forced or is
+    the fallback for a session without a local index.
+    The session's point count is cached (TTL + reset on re-processing).
+    """
+
+    name = "qdrant"
+
+    def __init__(self):
+        self._point_counts: Dict[str, tuple] = {}   # session_id -> (count, cached_at)
+
+    def point_count(self, session_id: str) -> int:
+        cached = self._point_counts.get(session_id)
+        if cached is not None and time.time() - cached[1] < QDRANT_POINT_COUNT_TTL_SEC:
+            return cached[0]
+
+        if QDRANT_MULTITENANT:
+            # Shared collection → approximate count of this tenant's points
+            count = client.count(
+                collection_name=get_collection_name(session_id),
+                count_filter=session_filter(session_id),
+                exact=False,
+            ).count
+        else:
+            count = client.get_collection(get_collection_name(session_id)).points_count or 0
+
+        self._point_counts[session_id] = (count, time.time())
+        return count
+
+    def search(self, session_id: str, query_vector, top_k: int) -> List[Dict]:
+        points = self.point_count(session_id)
+        exact = points <= QDRANT_EXACT_SEARCH_MAX_POINTS
+        mode = "exact" if exact else "hnsw"
+
+        response = client.query_points(
+            collection_name=get_collection_name(session_id),
+            query=list(map(float, query_vector)),
+            query_filter=session_filter(session_id),   # tenant filter in multitenant mode
+            search_params=search_params(exact=exact),  # exact / hnsw_ef (+ rescoring when quantized)
+            limit=top_k,
+            with_payload=SEARCH_PAYLOAD_FIELDS,   # locator only, text comes from the chunk store
+            with_vectors=False     # skip returning embeddings
+        )
+
+        metrics.incr(f"retrieval.search_mode.{mode}")
+        metrics.set("retrieval.last_search", {"session_points": points, "mode": mode})
+        return self._hydrate(session_id, response.points)
+
+    @staticmethod
+    def _locator(point) -> Tuple[str, int]:
+        payload = point.payload or {}
+        return payload.get("source_doc_folder"), (payload.get("chunk_index") or 0) - 1
+
+    def _hydrate(self, session_id: str, points) -> List[Dict]:
+        """
+        Replace each hit's locator payload with its full chunk row (one seek per hit).
+        Points without a chunk row (sessions processed before the chunk store existed)
+        fall back to their full Qdrant payload, which still carries the text.
+        """
+        rows = _read_rows(session_id, (self._locator(point) for point in points))
+
+        fallback = {}
+        missing = [point.id for point in points if self._locator(point) not in rows]
+        if missing:
+            logger.warning(f"⚠️ {len(missing)} hit(s) without a chunk row in {session_id} → using Qdrant payloads")
+            metrics.incr("retrieval.payload_fallback", len(missing))
+            fallback = self._payload_rows(session_id, missing)
+
+        hits = []
+        for point in points:
+            row = rows.get(self._locator(point)) or fallback.get(point.id)
+            if row is None or "text" not in row:
+                continue
+            hits.append({"score": point.score, "payload": row})
+        return hits
+
+    @staticmethod
+    def _payload_rows(session_id: str, point_ids: List) -> Dict:
+        """{point id: full payload} for points whose text lives in Qdrant."""
+        records = client.retrieve(
+            collection_name=get_collection_name(session_id),
+            ids=point_ids,
+            with_payload=True,
+            with_vectors=False,
+        )
+        return {record.id: record.payload or {} for record in records}
+
+    def count(self, session_id: str) -> int:
+        return client.count(
+            collection_name=get_collection_name(session_id),
+            count_filter=session_filter(session_id),
+            exact=True,
+        ).count
+
+    def drop_session(self, session_id: str):
+        self._point_counts.pop(session_id, None)
+
+
+class _LocalIndex:
+    """One session's loaded index: memory-mapped matrix + row layout (rows are read per hit)."""
+
+    def __init__(self, matrix: np.ndarray, folders: List[str], starts: np.ndarray, mtime: float):
+        self.matrix = matrix
+        self.folders = folders      # doc folder of each block, in matrix order
+        self.starts = starts        # first matrix row of each block
+        self.mtime = mtime
+
+    def locator(self, row: int) -> Tuple[str, int]:
+        block = int(np.searchsorted(self.starts, row, side="right")) - 1
+        return self.folders[block], row - int(self.starts[block])
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process cosine search for small sessions.
+    Vectors are L2-normalized at build time, so cosine = one matrix-vector product.
+    Loaded indexes are an LRU of at most LOCAL_VECTOR_STORE_MAX_SESSIONS sessions
+    and hold no chunk text: hits are read from the chunk store.
+    """
+
+    name = "local"
+
+    def __init__(self, max_sessions: int = LOCAL_VECTOR_STORE_MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._indexes: "OrderedDict[str, _LocalIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # 🏗️ Build (after ingestion)
+    # --------------------------------------------------------
+
+    @staticmethod
+    def build(session_id: str, doc_dirs: List[Path]) -> List[List]:
+        """
+        Concatenate the per-document matrices into one normalized session matrix.
+        Returns the row layout: [[doc_folder, n_rows], ...] in matrix order.
+        """
+        session_dir = PROCESSED_DIR / session_id
+        blocks = [open_embedding_matrix(doc_dir) for doc_dir in doc_dirs]
+        total = sum(block.shape[0] for block in blocks)
+        dim = blocks[0].shape[1] if blocks else 0
+
+        tmp_path = session_dir / (INDEX_MATRIX_FILE + ".tmp")
+        matrix = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(total, dim))
+        offset = 0
+        for block in blocks:
+            block = np.asarray(block, dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            matrix[offset:offset + len(block)] = block / np.maximum(norms, 1e-12)
+            offset += len(block)
+        matrix.flush()
+        del matrix
+        os.replace(tmp_path, session_dir / INDEX_MATRIX_FILE)
+
+        return [[doc_dir.name, block.shape[0]] for doc_dir, block in zip(doc_dirs, blocks)]
+
+    # --------------------------------------------------------
+    # 🔍 Search
+    # --------------------------------------------------------
+
+    def _load(self, session_id: str) -> _LocalIndex:
+        session_dir = PROCESSED_DIR / session_id
+        matrix_path = session_dir / INDEX_MATRIX_FILE
+
+        with self._lock:
+            mtime = matrix_path.stat().st_mtime
+            index = self._indexes.get(session_id)
+            if index is not None and index.mtime == mtime:
+                self._indexes.move_to_end(session_id)
+                return index
+
+            meta = json.loads((session_dir / INDEX_META_FILE).read_text(encoding="utf-8"))
+            folders = [doc_folder for doc_folder, _ in meta["docs"]]
+            sizes = [n_rows for _, n_rows in meta["docs"]]
+
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.shape[0] != sum(sizes):
+                raise RuntimeError(f"Local vector index out of sync for {session_id}")
+
+            starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64) if sizes else np.zeros(0, np.int64)
+            index = _LocalIndex(matrix, folders, starts, mtime)
+            self._indexes[session_id] = index
+            self._indexes.move_to_end(session_id)
+            while len(self._indexes) > self.max_sessions:
+                self._indexes.popitem(last=False)
+            logger.info(f"🧮 Loaded local vector index for {session_id}: {matrix.shape[0]} vectors")
+            return index
+
+    def search(self, session_id: str, query_vector, top_k: int) -> List[Dict]:
+        index = self._load(session_id)
+        n = index.matrix.shape[0]
+        if n == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        scores = index.matrix @ query
+
+        k = min(top_k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        locators = [index.locator(int(i)) for i in top]
+        rows = _read_rows(session_id, locators)
+        return [
+            {"score": float(scores[i]), "payload": rows[locator]}
+            for i, locator in zip(top, locators)
+            if locator in rows
+        ]
+
+    def count(self, session_id: str) -> int:
+        return self._load(session_id).matrix.shape[0]
+
+    def drop_session(self, session_id: str):
+        with self._lock:
+            self._indexes.pop(session_id, None)
+
+
+# Singleton backends
+qdrant_store = QdrantVectorStore()
+local_store = LocalVectorStore()
+
+_BACKENDS = {store.name: store for store in (qdrant_store, local_store)}
+
+
+# ============================================================
+# 🔀 Per-session backend selection
+# ============================================================
+
+def _read_index_meta(session_id: str) -> Optional[Dict]:
+    meta_file = PROCESSED_DIR / session_id / INDEX_META_FILE
+    if meta_file.exists():
+        return json.loads(meta_file.read_text(encoding="utf-8"))
+    return None
+
+
+def refresh_session_vector_store(session_id: str, doc_folders: List[str]) -> Dict:
+    """
+    Pick the search backend for a session from its size and record it
+    (rebuilding the local index when small). Called after every /process run.
+    """
+    session_dir = PROCESSED_DIR / session_id
+    doc_dirs = [session_dir / folder for folder in doc_folders if has_embedding_matrix(session_dir / folder)]
+    points = sum(count_chunk_rows(doc_dir) for doc_dir in doc_dirs)
+
+    backend = VECTOR_STORE_BACKEND
+    if backend == "auto":
+        backend = "local" if points <= LOCAL_VECTOR_STORE_MAX_POINTS else "qdrant"
+
+    layout = []
+    if backend == "local":
+        layout = LocalVectorStore.build(session_id, doc_dirs)
+    else:
+        (session_dir / INDEX_MATRIX_FILE).unlink(missing_ok=True)
+
+    meta = {"backend": backend, "points": points, "docs": layout}
+    (session_dir / INDEX_META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    drop_session_vector_store(session_id)
+
+    metrics.incr(f"vector_store.sessions.{backend}")
+    logger.info(f"🧭 Session {session_id}: {points} vectors → {backend} vector store")
+    return meta
+
+
+def get_vector_store(session_id: str) -> VectorStore:
+    """Backend recorded for the session (Qdrant when none was recorded)."""
+    meta = _read_index_meta(session_id)
+    if meta is None:
+        return qdrant_store
+    return _BACKENDS.get(meta["backend"], qdrant_store)
+
+
+# Other per-session state derived from the vectors (e.g. the router's centroids)
+_session_drop_hooks: List[Callable[[str], None]] = []
+
+
+def on_session_drop(hook: Callable[[str], None]) -> Callable[[str], None]:
+    """Register `hook(session_id)` to run with `drop_session_vector_store`."""
+    _session_drop_hooks.append(hook)
+    return hook
+
+
+def drop_session_vector_store(session_id: str):
+    for store in _BACKENDS.values():
+        store.drop_session(session_id)
+    for hook in _session_drop_hooks:
+        hook(session_id)
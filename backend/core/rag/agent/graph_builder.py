@@ -6,23 +6,29 @@ This file builds the complete Agentic RAG workflow graph.
 Pipeline:
     START
       ↓
+    answer_cache_node       (near-duplicate question? → stored answer → END)
+      ↓
     assistant_node          (decides: general OR tool_call)
       ├── tool_call ─────→ tool_node  (executes rag_tool)
       │                        ↓
       └── NO_TOOL_REQUIRED → finalize_node (general answer)
+          or direct answer   (ROUTER_MODE="single_call": router already answered,
+                              finalize_node only wraps it — one LLM call)
                                ↓
                               END
 
-The graph always ends in finalize_node, which returns
-state["final_output"] — consumed by FastAPI /query route.
+Every run ends with state["final_output"] set — consumed by the FastAPI
+/query route: by finalize_node, or by answer_cache_node on a cache hit
+(answer_cache → END).
 """
 
-from langgraph.graph import StateGraph, START, END
+from langgraph.graph import StateGraph, END
 
 # --- State model ---
 from backend.core.rag.agent.graph_state import AgentState
 
 # --- Nodes ---
+from backend.core.rag.agent.nodes.answer_cache_node import answer_cache_node
 from backend.core.rag.agent.nodes.assistant_node import assistant_node
 from backend.core.rag.agent.nodes.tool_node import tool_node
 from backend.core.rag.agent.nodes.finalize_node import finalize_node
@@ -45,12 +51,26 @@ def build_agentic_rag_graph():
     workflow = StateGraph(AgentState)
 
     # 2️⃣ Register all nodes
+    workflow.add_node("answer_cache", answer_cache_node)
     workflow.add_node("assistant", assistant_node)
     workflow.add_node("tool", tool_node)               # prebuilt ToolNode executes rag_tool
     workflow.add_node("finalize", finalize_node)
 
     # 3️⃣ Set the entry point
-    workflow.set_entry_point("assistant")
+    workflow.set_entry_point("answer_cache")
+
+    # Cache hit → answer already in final_output, skip both LLM calls
+    def cache_decision(state):
+        return "hit" if state.get("final_output") else "miss"
+
+    workflow.add_conditional_edges(
+        "answer_cache",
+        cache_decision,
+        {
+            "hit": END,
+            "miss": "assistant"
+        }
+    )
 
     # =====================================================================
     # 4️⃣ Conditional routing FROM assistant_node
@@ -23,9 +23,29 @@ class AgentState(MessagesState):
         This will hold the final response object that the FastAPI
         /query endpoint returns to the frontend. It can contain either:
             - a RAG answer (after tool call + generation), or
-            - a general LLM answer (no tool used).
+            - a general LLM answer (no tool used), or
+            - a stored answer served by answer_cache_node (cached=True).
+
+    query_embedding : Optional[List[float]]
+        Embedding of the user query, computed once by answer_cache_node
+        and reused by finalize_node to store the answer.
+
+    index_generation : Optional[int]
+        Session index generation the answer is produced against.
+
+    memory_key : Optional[str]
+        Fingerprint of the conversation memory before this query; cached
+        answers are only replayed after the same conversation.
+
+    stream : Optional[bool]
+        Set by the /query/stream route: finalize_node then emits answer
+        tokens through LangGraph's custom stream as they are generated.
     """
 
     session_id: str
     docs: Optional[List[str]] = None
-    final_output: Optional[Dict[str, Any]] = None
\ No newline at end of file
+    final_output: Optional[Dict[str, Any]] = None
+    query_embedding: Optional[List[float]] = None
+    index_generation: Optional[int] = None
+    memory_key: Optional[str] = None
+    stream: Optional[bool] = None
\ No newline at end of file
@@ -0,0 +1,211 @@
+# backend/core/rag/agent/intent_router.py
+
+import asyncio
+import random
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.config import (
+    PROCESSED_DIR,
+    ROUTER_LOCAL_ENABLED,
+    ROUTER_RAG_MIN_SCORE,
+    ROUTER_GENERAL_MAX_SCORE,
+    ROUTER_CENTROID_MIN_SIM,
+    ROUTER_SHADOW_RATE,
+    RAG_TOP_K,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.chunk_store import list_session_doc_dirs, has_embedding_matrix, open_embedding_matrix
+from backend.core.doc_processing_unit.vector_store import INDEX_META_FILE, on_session_drop
+from backend.core.rag.retriever import format_hits, search_session
+from backend.core.rag.rag_pipeline import cache_retrieval
+
+
+# ============================================================
+# 🚦 Local intent router (runs before the LLM router)
+#
+#   Cheap signals, in order:
+#     1. no processed documents           → general
+#     2. small-talk rules                 → general
+#     3. explicit document references     → rag
+#     4. top hit score of the query       → rag when high
+#        + similarity to the session's chunk centroid
+#                                         → general when both are low
+#   Anything in between is "uncertain" and goes to the LLM router.
+#   The score comes from a full top-k search whose results go into the
+#   retrieval cache, so rag_tool does not search a second time.
+# ============================================================
+
+ROUTE_RAG = "rag"
+ROUTE_GENERAL = "general"
+
+# Whole message is greetings / thanks / bot questions, plus punctuation or emoji.
+# Any other word ("hi, what is the fee?") falls through to the score checks.
+_SMALL_TALK_PHRASE = (
+    r"(?:hi|hii+|hello|hey|yo|hi there|hello there|hey there|thanks|thanks a lot|thank you|"
+    r"thank you so much|thx|ok|okay|cool|great|bye|goodbye|good (?:morning|afternoon|evening|night)|"
+    r"how are you|who are you|what are you|what can you do|what is your name)"
+)
+_SMALL_TALK = re.compile(
+    rf"^\W*{_SMALL_TALK_PHRASE}(?:\W+{_SMALL_TALK_PHRASE})*\W*$",
+    re.IGNORECASE,
+)
+
+# A document noun only counts with a cue that points at the user's files:
+# "this table", "my files", "the uploaded report" — not "what is a hash table?"
+_DOC_NOUN = (
+    r"(?:documents?|docs?|pdfs?|files?|uploads?|reports?|sections?|pages?|tables?|"
+    r"chapters?|appendix|text|paper|policy|contract)"
+)
+_DOC_REFERENCE = re.compile(
+    rf"\b(?:this|these|that|those|my|our|uploaded|attached|provided)\s+(?:uploaded\s+|attached\s+)?{_DOC_NOUN}\b"
+    r"|\bthe\s+(?:uploaded\s+|attached\s+)?(?:documents?|docs?|pdfs?|uploads?|reports?|contract|appendix)\b"
+    r"|\baccording to (?:the|this|that|my|our)\b"
+    r"|\bsummar(?:i[sz]e|y of)\s+(?:the|this|that|these|it|my|our)\b"
+    r"|\b(?:i|we)\s+(?:just\s+)?(?:uploaded|attached|shared)\b",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class RouteDecision:
+    route: Optional[str]                  # "rag" | "general" | None (uncertain → LLM)
+    reason: str
+    signals: Dict[str, float] = field(default_factory=dict)
+
+
+# ------------------------------------------------------------
+# 🧲 Session centroid (mean of normalized chunk vectors)
+# ------------------------------------------------------------
+
+# Sessions whose centroid is kept in memory (least recently used dropped)
+MAX_CACHED_CENTROIDS = 1024
+
+_centroids: "OrderedDict[str, Tuple[int, Optional[np.ndarray]]]" = OrderedDict()
+_centroids_lock = threading.Lock()
+
+
+def session_centroid(session_id: str) -> Optional[np.ndarray]:
+    """Unit-length centroid of a session's chunk embeddings, cached per vector index version."""
+    meta_file = PROCESSED_DIR / session_id / INDEX_META_FILE
+    try:
+        version = meta_file.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    with _centroids_lock:
+        cached = _centroids.get(session_id)
+        if cached is not None and cached[0] == version:
+            _centroids.move_to_end(session_id)
+            return cached[1]
+
+    total, rows = None, 0
+    for doc_dir in list_session_doc_dirs(session_id):
+        if not has_embedding_matrix(doc_dir):
+            continue
+        block = np.asarray(open_embedding_matrix(doc_dir), dtype=np.float32)
+        if block.size == 0:
+            continue
+        block = block / np.maximum(np.linalg.norm(block, axis=1, keepdims=True), 1e-12)
+        total = block.sum(axis=0) if total is None else total + block.sum(axis=0)
+        rows += len(block)
+
+    centroid = None
+    if rows:
+        centroid = total / max(float(np.linalg.norm(total)), 1e-12)
+    with _centroids_lock:
+        _centroids[session_id] = (version, centroid)
+        _centroids.move_to_end(session_id)
+        while len(_centroids) > MAX_CACHED_CENTROIDS:
+            _centroids.popitem(last=False)
+    return centroid
+
+
+@on_session_drop
+def forget_session_centroid(session_id: str):
+    with _centroids_lock:
+        _centroids.pop(session_id, None)
+
+
+def _top_score(session_id: str, query: str, query_vector: List[float]) -> float:
+    """Best hit score of rag_tool's own search (its results are cached for rag_tool)."""
+    hits = search_session(session_id, query_vector, RAG_TOP_K)
+    cache_retrieval(session_id, query, RAG_TOP_K, format_hits(hits))
+    return float(hits[0]["score"]) if hits else 0.0
+
+
+# ------------------------------------------------------------
+# 🧭 Decision
+# ------------------------------------------------------------
+
+def route_locally(session_id: str, query: str, query_vector: Optional[List[float]], has_docs: bool) -> RouteDecision:
+    if not has_docs:
+        return RouteDecision(ROUTE_GENERAL, "no_documents")
+    if _SMALL_TALK.match(query):
+        return RouteDecision(ROUTE_GENERAL, "small_talk")
+    if _DOC_REFERENCE.search(query):
+        return RouteDecision(ROUTE_RAG, "doc_reference")
+    if query_vector is None:
+        return RouteDecision(None, "no_embedding")
+
+    centroid = session_centroid(session_id)
+    if centroid is None:
+        return RouteDecision(ROUTE_GENERAL, "no_vectors")
+
+    vector = np.asarray(query_vector, dtype=np.float32)
+    signals = {
+        "centroid_sim": round(float(centroid @ vector) / max(float(np.linalg.norm(vector)), 1e-12), 4),
+        "top_score": round(_top_score(session_id, query, query_vector), 4),
+    }
+
+    if signals["top_score"] >= ROUTER_RAG_MIN_SCORE:
+        return RouteDecision(ROUTE_RAG, "top_score_high", signals)
+    if signals["top_score"] <= ROUTER_GENERAL_MAX_SCORE and signals["centroid_sim"] < ROUTER_CENTROID_MIN_SIM:
+        return RouteDecision(ROUTE_GENERAL, "off_topic", signals)
+    return RouteDecision(None, "uncertain", signals)
+
+
+async def aroute_locally(session_id: str, query: str, query_vector: Optional[List[float]], has_docs: bool) -> RouteDecision:
+    """`route_locally` off the event loop (centroid + top-k search touch disk / Qdrant)."""
+    if not ROUTER_LOCAL_ENABLED:
+        return RouteDecision(None, "disabled")
+    try:
+        decision = await asyncio.to_thread(route_locally, session_id, query, query_vector, has_docs)
+    except Exception as e:
+        logger.warning(f"⚠️ Local router failed, using LLM router: {e}")
+        decision = RouteDecision(None, "error")
+
+    metrics.incr(f"router.local.{decision.route or 'uncertain'}")
+    metrics.incr(f"router.reason.{decision.reason}")
+    logger.info(f"🚦 Local route → {decision.route or 'LLM'} ({decision.reason}) {decision.signals}")
+    return decision
+
+
+# ------------------------------------------------------------
+# 📏 Agreement tracking (local decision vs. LLM router)
+# ------------------------------------------------------------
+
+def should_shadow() -> bool:
+    """Sample confident local decisions to re-check with the LLM router in the background."""
+    return random.random() < ROUTER_SHADOW_RATE
+
+
+def record_agreement(decision: RouteDecision, llm_route: str):
+    agree = decision.route == llm_route
+    metrics.incr("router.agreement.agree" if agree else "router.agreement.disagree")
+    agreed = metrics.get("router.agreement.agree", 0)
+    total = agreed + metrics.get("router.agreement.disagree", 0)
+    metrics.set("router.agreement.rate", round(agreed / total, 4))
+    if not agree:
+        metrics.incr(f"router.disagree.{decision.reason}")
+
+    logger.info(
+        f"📏 Router agreement: local={decision.route} ({decision.reason}) llm={llm_route} "
+        f"{'✅' if agree else '❌'} {decision.signals}"
+    )
@@ -0,0 +1,56 @@
+# backend/core/rag/agent/nodes/answer_cache_node.py
+
+from typing import Any, Dict
+
+from langchain_core.messages import AIMessage
+
+from backend.core.rag.agent.graph_state import AgentState
+from backend.core.rag.answer_cache import answer_cache, memory_key
+from backend.core.rag.retrieval_cache import get_index_generation
+from backend.core.rag.retriever import aembed_query
+from backend.core.rag.session_memory import add_to_session_memory, get_session_memory
+from backend.utils.logger import logger
+
+
+async def answer_cache_node(state: AgentState) -> Dict[str, Any]:
+    """
+    FIRST NODE in the agent graph (before assistant_node).
+
+    - Embeds the user query once and records it (+ the session's index
+      generation and the fingerprint of the conversation so far) in the
+      state, so finalize_node can store the answer later.
+    - If a near-duplicate question was answered on the same index generation
+      after the same conversation, serves that answer as final_output
+      (cached=True) → graph goes to END without any LLM call.
+    """
+
+    session_id = state["session_id"]
+    user_query = state["messages"][-1].content
+    generation = get_index_generation(session_id)
+    memory = memory_key(get_session_memory(session_id))   # history the answer will see
+
+    try:
+        query_vector = (await aembed_query(user_query)).tolist()
+    except Exception as e:
+        # Cache is an optimization only → continue with the normal path
+        logger.warning(f"⚠️ Answer cache skipped (query embedding failed): {e}")
+        return {"query_embedding": None, "index_generation": generation, "memory_key": memory}
+
+    hit = answer_cache.lookup(session_id, query_vector, generation, memory)
+    if hit is None:
+        return {"query_embedding": query_vector, "index_generation": generation, "memory_key": memory}
+
+    final_output, similarity = hit
+    final_output.update({"query": user_query, "cached": True})
+
+    # Keep the conversation memory consistent with a normal answer
+    add_to_session_memory(session_id, "user", user_query)
+    add_to_session_memory(session_id, "assistant", final_output["response"])
+
+    return {
+        "messages": [AIMessage(content=final_output["response"])],
+        "query_embedding": query_vector,
+        "index_generation": generation,
+        "memory_key": memory,
+        "final_output": final_output,
+    }
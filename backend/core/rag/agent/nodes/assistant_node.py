@@ -1,11 +1,28 @@
 # backend/core/rag/agent/nodes/assistant_node.py
 
+import asyncio
+import uuid
+
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_core.runnables import RunnableConfig
 
 from backend.core.rag.agent.graph_state import AgentState
 from backend.core.rag.agent.rag_tool import rag_tool
-from backend.core.rag.llm_engine import get_llm  # Your Gemini Flash 2.5 wrapper
+from backend.core.rag.agent.intent_router import (
+    ROUTE_RAG,
+    ROUTE_GENERAL,
+    RouteDecision,
+    aroute_locally,
+    should_shadow,
+    record_agreement,
+)
+from backend.core.rag.llm_engine import llm_runtime, llm_slot, message_text  # Your Gemini Flash 2.5 wrapper
+from backend.core.rag.session_memory import get_session_memory
+from backend.core.rag.rag_pipeline import prepare_retrieval
+from backend.core.rag.speculative_retrieval import speculative_retrievals
+from backend.utils.config import RAG_TOP_K, ROUTER_MODE, SPECULATIVE_RETRIEVAL
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
 
 
 # ============================================================
@@ -67,30 +84,46 @@ Another system component will produce the final answer.
 
 
 # ============================================================
-# 🤖 ASSISTANT NODE LOGIC
+# ⚡ SYSTEM PROMPT FOR ROUTER_MODE = "single_call"
+#   Route AND answer: general questions are answered right here,
+#   so they need one LLM round trip instead of two.
 # ============================================================
 
-async def assistant_node(state: AgentState, config: RunnableConfig):
-    """
-    Decides:
-        - Should the query trigger rag_tool?
-        - Or is it a general query?
+ROUTE_AND_ANSWER_SYSTEM_PROMPT = """
+You are a helpful AI assistant for a Document Question Answering System.
 
-    Output is ALWAYS an AIMessage:
-        - AIMessage(tool_calls=[...])   → tool execution path
-        - AIMessage("NO_TOOL_REQUIRED") → normal answering path
-    """
+For every user message, do EXACTLY ONE of the following:
+
+------------------------------------------------------------
+1️⃣ CALL `rag_tool` when the answer needs the uploaded documents:
+------------------------------------------------------------
+    - The query references uploaded files, PDFs, reports, sections, rules, tables, or content found inside documents.
+    - The user says things like "According to the document...", "What does the PDF say about...",
+      "Summarize the uploaded file...".
+    - If the answer needs grounding in the document, ALWAYS call `rag_tool`.
+    - When you call the tool, do NOT write an answer yourself.
+
+------------------------------------------------------------
+2️⃣ OTHERWISE, ANSWER THE USER DIRECTLY:
+------------------------------------------------------------
+    - General knowledge, small-talk, reasoning or personal questions.
+    - Use the conversation history below when it is relevant.
+    - Be helpful, clear and well-structured.
+    - NEVER invent or guess document content — if unsure whether the documents are needed, call `rag_tool`.
+"""
 
-    # 1️⃣ Load base LLM
-    llm = get_llm()  # Your Gemini Flash 2.5 or any model you use
 
-    # 2️⃣ Bind the tool — now LLM can output tool call messages
-    llm_with_tools = llm.bind_tools([rag_tool])
+# ============================================================
+# 🤖 ASSISTANT NODE LOGIC
+# ============================================================
 
-    # 3️⃣ Get latest user message
+_shadow_tasks = set()   # keep background LLM re-checks referenced until done
+
+
+def _build_router_messages(state: AgentState):
     user_msg = state["messages"][-1]
 
-    # 4️⃣ Prepare docs metadata (MUST be merged into system prompt — no extra SystemMessage allowed)
+    # Prepare docs metadata (MUST be merged into system prompt — no extra SystemMessage allowed)
     docs = state.get("docs") or []
     docs_text = (
         f"Uploaded documents in this session: {', '.join(docs)}"
@@ -100,24 +133,147 @@ async def assistant_node(state: AgentState, config: RunnableConfig):
 
     session_text = f"session_id for this conversation: {state['session_id']}"
 
-    # 5️⃣ Build FINAL system prompt given to Gemini
-    SYSTEM_PROMPT = ASSISTANT_SYSTEM_PROMPT + f"\n\nSESSION METADATA:\n" + docs_text + "\n" + session_text
+    # Build FINAL system prompt given to Gemini
+    if ROUTER_MODE == "single_call":
+        memory = get_session_memory(state["session_id"])
+        memory_text = (
+            "\n".join([f"{m['role']}: {m['content']}" for m in memory])
+            if memory else "No prior conversation context is available."
+        )
+        SYSTEM_PROMPT = (
+            ROUTE_AND_ANSWER_SYSTEM_PROMPT
+            + "\n\nSESSION METADATA:\n" + docs_text + "\n" + session_text
+            + "\n\nCONVERSATION HISTORY:\n" + memory_text
+        )
+    else:
+        SYSTEM_PROMPT = ASSISTANT_SYSTEM_PROMPT + "\n\nSESSION METADATA:\n" + docs_text + "\n" + session_text
 
-    # 6️⃣ Build classification prompt
-    messages = [
+    return [
         SystemMessage(content=SYSTEM_PROMPT),
         HumanMessage(content=user_msg.content),
     ]
 
-    # 7️⃣ Run LLM to classify
-    response = await llm_with_tools.ainvoke(messages, config=config)
 
-    # 8️⃣ If model did NOT call tool → classify as general query
-    if not getattr(response, "tool_calls", None):
-        response = AIMessage(content="NO_TOOL_REQUIRED")
+async def _llm_route(state: AgentState, config: RunnableConfig = None) -> AIMessage:
+    """
+    Ask the LLM router: tool call → AIMessage(tool_calls), otherwise NO_TOOL_REQUIRED.
+    In single_call mode a non-tool reply is kept as the final answer (AIMessage(answer)).
+    """
+
+    # Shared LLM with the tool bound (built once per process) — now LLM can output tool call messages
+    llm_with_tools = llm_runtime.with_tools([rag_tool])
+
+    # Run LLM to classify
+    async with llm_slot():
+        response = await llm_with_tools.ainvoke(_build_router_messages(state), config=config)
+
+    if getattr(response, "tool_calls", None):
+        return response
+
+    # single_call: the model already answered the general question → keep it
+    # (content may be a list of blocks → text only, so the one-round-trip path holds)
+    answer = message_text(response)
+    if ROUTER_MODE == "single_call" and answer.strip():
+        return AIMessage(content=answer.strip())
+
+    # If model did NOT call tool → classify as general query
+    return AIMessage(content="NO_TOOL_REQUIRED")
+
+
+def _route_of(message: AIMessage) -> str:
+    return ROUTE_RAG if getattr(message, "tool_calls", None) else ROUTE_GENERAL
+
+
+def _local_route_message(decision: RouteDecision, state: AgentState) -> AIMessage:
+    """Same AIMessage the LLM router would have produced for this route."""
+    if decision.route == ROUTE_GENERAL:
+        return AIMessage(content="NO_TOOL_REQUIRED")
+    return AIMessage(
+        content="",
+        tool_calls=[{
+            "name": rag_tool.name,
+            "args": {"session_id": state["session_id"], "query": state["messages"][-1].content},
+            "id": f"local_{uuid.uuid4().hex}",
+        }],
+    )
+
+
+def _settle_speculation(state: AgentState, response: AIMessage):
+    """Keep the speculative retrieval only if the router called rag_tool for the same query."""
+    session_id, query = state["session_id"], state["messages"][-1].content
+    for call in getattr(response, "tool_calls", None) or []:
+        args = call.get("args", {})
+        same = (
+            speculative_retrievals.key_for(args.get("session_id", ""), args.get("query", ""), args.get("top_k", RAG_TOP_K))
+            == speculative_retrievals.key_for(session_id, query, RAG_TOP_K)
+        )
+        if call.get("name") == rag_tool.name and same:
+            return
+    speculative_retrievals.discard(session_id, query, RAG_TOP_K)
+
+
+async def _shadow_check(decision: RouteDecision, state: AgentState):
+    try:
+        record_agreement(decision, _route_of(await _llm_route(state)))
+    except Exception as e:
+        logger.warning(f"⚠️ Router shadow check failed: {e}")
+
+
+async def assistant_node(state: AgentState, config: RunnableConfig):
+    """
+    Decides:
+        - Should the query trigger rag_tool?
+        - Or is it a general query?
+
+    The local intent router answers confident cases without an LLM call;
+    only uncertain queries reach the Gemini router.
+
+    Output is ALWAYS an AIMessage:
+        - AIMessage(tool_calls=[...])   → tool execution path
+        - AIMessage("NO_TOOL_REQUIRED") → normal answering path
+        - AIMessage(<answer>)           → direct answer (ROUTER_MODE="single_call")
+    """
+
+    # 1️⃣ Cheap local routing (keywords, docs present, hit score, centroid similarity)
+    decision = await aroute_locally(
+        state["session_id"],
+        state["messages"][-1].content,
+        state.get("query_embedding"),
+        bool(state.get("docs")),
+    )
+
+    if decision.route is not None:
+        response = _local_route_message(decision, state)
+
+        # Sampled background re-check → agreement rate for threshold tuning
+        if should_shadow():
+            task = asyncio.create_task(_shadow_check(decision, state))
+            _shadow_tasks.add(task)
+            task.add_done_callback(_shadow_tasks.discard)
+    else:
+        # 2️⃣ Uncertain → LLM router (its choice + our signals are logged for tuning)
+        speculate = SPECULATIVE_RETRIEVAL and bool(state.get("docs"))
+        if speculate:
+            # Embed + search concurrently with the router round trip
+            session_id, query = state["session_id"], state["messages"][-1].content
+            speculative_retrievals.start(
+                session_id, query, RAG_TOP_K,
+                lambda: prepare_retrieval(session_id, query, RAG_TOP_K),
+            )
+
+        try:
+            response = await _llm_route(state, config)
+        except BaseException:
+            if speculate:
+                speculative_retrievals.discard(state["session_id"], state["messages"][-1].content, RAG_TOP_K)
+            raise
+        if speculate:
+            _settle_speculation(state, response)
+        metrics.incr(f"router.llm.{_route_of(response)}")
+        logger.info(f"🤖 LLM route → {_route_of(response)} ({decision.reason}) {decision.signals}")
 
-    # 9️⃣ Add decision result to state
+    # 3️⃣ Add decision result to state
     updated_messages = state["messages"] + [response]
 
     # Return updated state to LangGraph
-    return {**state, "messages": updated_messages}
\ No newline at end of file
+    return {**state, "messages": updated_messages}
@@ -1,14 +1,42 @@
 # backend/core/rag/agent/nodes/finalize_node.py
 
 import json
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.config import get_stream_writer
 
 from backend.core.rag.agent.graph_state import AgentState
-from backend.core.rag.llm_engine import generate_general_answer
+from backend.core.rag.llm_engine import agenerate_general_answer
 from backend.core.rag.rag_pipeline import run_rag_generation
 from backend.core.rag.session_memory import add_to_session_memory, get_session_memory
+from backend.core.rag.answer_cache import answer_cache
+from backend.utils.config import LLM_MODEL
+
+
+def _remember_answer(state: AgentState, final_output: Dict[str, Any]):
+    """
+    Store the answer for near-duplicate questions (see answer_cache_node).
+    Only successful document-grounded answers: general answers depend on the
+    conversation so far ("tell me more"), and errors must not be replayed.
+    """
+    if final_output.get("error") or not final_output.get("used_chunks"):
+        return
+    answer_cache.store(
+        state["session_id"],
+        state.get("query_embedding"),
+        state.get("index_generation") or 0,
+        final_output,
+        state.get("memory_key") or "",
+    )
+
+
+def _token_sink(state: AgentState) -> Optional[Callable[[str], None]]:
+    """Answer tokens → graph custom stream (only for /query/stream requests)."""
+    if not state.get("stream"):
+        return None
+    writer = get_stream_writer()
+    return lambda token: writer({"event": "token", "data": token})
 
 
 async def finalize_node(state: AgentState) -> AgentState:
@@ -22,10 +50,15 @@ async def finalize_node(state: AgentState) -> AgentState:
        - we:
            * save user query to session memory
            * load memory context
-           * call generate_general_answer(...)
+           * call agenerate_general_answer(...)
            * save assistant reply to memory
            * store final_output in state
 
+    1b) DIRECT ANSWER (ROUTER_MODE="single_call"):
+       - assistant_node's LLM answered the general question itself
+       - last message is AIMessage(<answer>) without tool calls
+       - we only update memory and wrap it as final_output (no 2nd LLM call)
+
     2) RAG TOOL USED:
        - assistant_node emitted a tool_call
        - tool_node executed rag_tool and appended a ToolMessage
@@ -34,13 +67,17 @@ async def finalize_node(state: AgentState) -> AgentState:
            * extract {query, chunks, citations} from ToolMessage.content
            * call run_rag_generation(...) which internally:
                - combines memory + chunks
-               - calls generate_rag_answer(...)
+               - calls agenerate_rag_answer(...)
                - updates memory for assistant
            * store final_output in state
+
+    When state["stream"] is set, every answer is also emitted token by token
+    as {"event": "token", "data": ...} on the graph's custom stream.
     """
 
     last_msg = state["messages"][-1]
     session_id = state["session_id"]
+    on_token = _token_sink(state)
 
     # ============================================================
     # 1️⃣ CASE: NO TOOL → GENERAL ANSWER
@@ -68,9 +105,10 @@ async def finalize_node(state: AgentState) -> AgentState:
         )
 
         # (C) Generate general answer using LLM
-        llm_result = generate_general_answer(
+        llm_result = await agenerate_general_answer(
             query=user_query,
             memory_text=memory_text,
+            on_token=on_token,
         )
 
         # (D) Save assistant response to memory
@@ -84,11 +122,38 @@ async def finalize_node(state: AgentState) -> AgentState:
             "used_chunks": 0,
             "citations": [],
             "formatted_citations": "No citations available.",
+            "error": llm_result.get("error", False),
         }
 
         # Optionally also append the final assistant reply to messages
         state["messages"].append(AIMessage(content=llm_result["response"]))
 
+        _remember_answer(state, final_output)
+        return {**state, "final_output": final_output}
+
+    # ============================================================
+    # 1️⃣b CASE: ROUTER ALREADY ANSWERED (single_call mode)
+    # ============================================================
+    if isinstance(last_msg, AIMessage) and not last_msg.tool_calls and last_msg.content:
+        user_query = state["messages"][-2].content
+
+        add_to_session_memory(session_id, "user", user_query)
+        add_to_session_memory(session_id, "assistant", last_msg.content)
+
+        # Nothing left to generate → the whole answer is one token event
+        if on_token is not None:
+            on_token(last_msg.content)
+
+        final_output = {
+            "query": user_query,
+            "response": last_msg.content,
+            "model": LLM_MODEL,
+            "used_chunks": 0,
+            "citations": [],
+            "formatted_citations": "No citations available.",
+        }
+
+        _remember_answer(state, final_output)
         return {**state, "final_output": final_output}
 
     # ============================================================
@@ -132,18 +197,20 @@ async def finalize_node(state: AgentState) -> AgentState:
             query_from_tool = state["messages"][-3].content
 
         # Now run the second stage of RAG:
-        # combine memory + chunks, call generate_rag_answer, update memory, format citations
+        # combine memory + chunks, call agenerate_rag_answer, update memory, format citations
         rag_output = await run_rag_generation(
             session_id=session_id,
             query=query_from_tool,
             chunks=chunks,
             citations=citations,
+            on_token=on_token,
         )
 
         # Optionally append final RAG answer as AIMessage
         state["messages"].append(AIMessage(content=rag_output["response"]))
 
         # Store final_output for FastAPI /query route to return
+        _remember_answer(state, rag_output)
         return {**state, "final_output": rag_output}
 
     # ============================================================
@@ -1,11 +1,12 @@
 # backend/core/rag/agent/rag_tool.py
 
 from langchain_core.tools import tool
+from backend.utils.config import RAG_TOP_K
 from backend.core.rag.rag_pipeline import run_rag_retrieval
 
 
 @tool
-async def rag_tool(session_id: str, query: str, top_k: int = 5):
+async def rag_tool(session_id: str, query: str, top_k: int = RAG_TOP_K):
     """
     DOCUMENT RETRIEVAL TOOL — Call this tool whenever the user's query
     requires information contained inside the uploaded documents.
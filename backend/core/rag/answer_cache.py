@@ -0,0 +1,311 @@
+import copy
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+from backend.utils.config import (
+    PROCESSED_DIR,
+    EMBEDDING_MODEL,
+    LLM_MODEL,
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_SIMILARITY,
+    ANSWER_CACHE_MAX_PER_SESSION,
+    ANSWER_STORE_ENABLED,
+    ANSWER_STORE_MAX_ENTRIES,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.rag.citation_handler import BASE_UPLOAD_URL, format_citations_for_display
+from backend.core.rag.retrieval_cache import normalize_query
+
+
+# ============================================================
+# 💡 Per-session semantic answer cache
+#
+#   Each session keeps its recent document-grounded answers next to the
+#   (normalized) embedding of the question that produced them. A new question whose
+#   cosine similarity to a stored one is ≥ `threshold` gets that answer
+#   back — provided the session's index generation is the one the answer
+#   was produced against and the conversation history is identical
+#   (RAG answers see the memory window, so "and for EU customers?" only
+#   means the same thing after the same turns). Paraphrased repeats then
+#   skip both LLM calls. General answers and error answers are never stored.
+# ============================================================
+
+class _SessionAnswers:
+    """Answers of one session: row i of `vectors` ↔ `answers[i]` ↔ `memory_keys[i]`."""
+
+    def __init__(self):
+        self.vectors: Optional[np.ndarray] = None
+        self.answers: List[Dict[str, Any]] = []
+        self.memory_keys: List[str] = []
+        self.generation = 0
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+def memory_key(memory: List[Dict[str, str]]) -> str:
+    """Fingerprint of a conversation window ("" when empty)."""
+    if not memory:
+        return ""
+    return hashlib.sha256(json.dumps(memory, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SemanticAnswerCache:
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_SIMILARITY,
+        max_per_session: int = ANSWER_CACHE_MAX_PER_SESSION,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+    ):
+        self.threshold = threshold
+        self.max_per_session = max_per_session
+        self.enabled = enabled
+        self._sessions: Dict[str, _SessionAnswers] = {}
+        self._lock = threading.Lock()
+
+    def lookup(
+        self, session_id: str, query_vector, generation: int, memory: str = ""
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Best stored answer produced with the same `memory` key, as (final_output copy, similarity), or None."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry.generation != generation:
+                # Index changed since these answers were produced
+                del self._sessions[session_id]
+                entry = None
+
+            best, similarity = None, 0.0
+            if entry is not None and memory in entry.memory_keys:
+                scores = entry.vectors @ _unit(query_vector)
+                scores[np.asarray(entry.memory_keys) != memory] = -1.0   # other conversation context
+                i = int(np.argmax(scores))
+                similarity = float(scores[i])
+                if similarity >= self.threshold:
+                    best = copy.deepcopy(entry.answers[i])
+
+        metrics.incr("answer_cache.hits" if best is not None else "answer_cache.misses")
+        metrics.set("answer_cache.last_similarity", round(similarity, 4))
+        if best is None:
+            return None
+        logger.info(f"💡 Answer cache hit for {session_id} (similarity={similarity:.3f})")
+        return best, similarity
+
+    def store(self, session_id: str, query_vector, generation: int, final_output: Dict[str, Any], memory: str = ""):
+        """
+        Remember a successful document-grounded answer together with the `memory`
+        key of the history it was generated with (general / error answers are skipped).
+        """
+        if not self.enabled or query_vector is None:
+            return
+        if final_output.get("error") or not final_output.get("used_chunks"):
+            return
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry.generation != generation:
+                entry = _SessionAnswers()
+                entry.generation = generation
+                self._sessions[session_id] = entry
+
+            row = _unit(query_vector)[None, :]
+            entry.vectors = row if entry.vectors is None else np.vstack([entry.vectors, row])
+            entry.answers.append(copy.deepcopy(final_output))
+            entry.memory_keys.append(memory)
+
+            # Oldest answers go first
+            if len(entry.answers) > self.max_per_session:
+                entry.vectors = entry.vectors[-self.max_per_session:]
+                entry.answers = entry.answers[-self.max_per_session:]
+                entry.memory_keys = entry.memory_keys[-self.max_per_session:]
+
+    def clear_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+# ============================================================
+# 🌐 Cross-session answer store
+#
+#   key = sha256(corpus fingerprint + normalized query + LLM model)
+#   corpus fingerprint = sorted content hashes of the session's processed
+#   documents (+ embedding model), so every session holding the same files
+#   shares answers. Citations are stored against content hashes and
+#   re-targeted to the asking session's files on the way out.
+#   Only answers generated without conversation history are shared, and
+#   only sessions without history are served from the store.
+#   Bounded by ANSWER_STORE_MAX_ENTRIES with LFU eviction.
+# ============================================================
+
+# Sessions whose corpus fingerprint is kept in memory (least recently used dropped)
+MAX_CACHED_CORPORA = 1024
+
+
+def _file_index_path(session_id: str):
+    return PROCESSED_DIR / session_id / "file_index.json"
+
+
+def _file_index_version(session_id: str) -> Optional[int]:
+    try:
+        return _file_index_path(session_id).stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_file_index(session_id: str) -> List[Dict]:
+    try:
+        return json.loads(_file_index_path(session_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+class SharedAnswerStore:
+    def __init__(self, max_entries: int = ANSWER_STORE_MAX_ENTRIES, enabled: bool = ANSWER_STORE_ENABLED):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: Dict[str, Dict[str, Any]] = {}     # key -> {"answer", "hits", "seq"}
+        self._corpora: "OrderedDict[str, Tuple[Optional[int], Optional[str], Dict[str, Dict]]]" = OrderedDict()
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # 🧬 Corpus fingerprint (cached per file_index.json version)
+    # --------------------------------------------------------
+
+    def _corpus(self, session_id: str) -> Tuple[Optional[str], Dict[str, Dict]]:
+        """(fingerprint, {content_hash: file entry}); fingerprint is None until every document is processed."""
+        mtime_ns = _file_index_version(session_id)   # one stat; the JSON is parsed only when it changed
+        with self._lock:
+            cached = self._corpora.get(session_id)
+            if cached is not None and cached[0] == mtime_ns:
+                self._corpora.move_to_end(session_id)
+                return cached[1], cached[2]
+
+        entries = _load_file_index(session_id) if mtime_ns is not None else []
+
+        by_hash = {e["content_hash"]: e for e in entries if e.get("content_hash")}
+        fingerprint = None
+        if entries and len(by_hash) == len(entries) and all(e.get("processed") for e in entries):
+            digest = hashlib.sha256(EMBEDDING_MODEL.encode())
+            for content_hash in sorted(by_hash):
+                digest.update(content_hash.encode())
+            fingerprint = digest.hexdigest()
+
+        with self._lock:
+            self._corpora[session_id] = (mtime_ns, fingerprint, by_hash)
+            self._corpora.move_to_end(session_id)
+            while len(self._corpora) > MAX_CACHED_CORPORA:
+                self._corpora.popitem(last=False)
+        return fingerprint, by_hash
+
+    def forget_session(self, session_id: str):
+        """Drop the session's cached corpus fingerprint (its shared answers stay for other sessions)."""
+        with self._lock:
+            self._corpora.pop(session_id, None)
+
+    @staticmethod
+    def _key(fingerprint: str, query: str) -> str:
+        return hashlib.sha256(f"{fingerprint}\x00{normalize_query(query)}\x00{LLM_MODEL}".encode()).hexdigest()
+
+    # --------------------------------------------------------
+    # 🔍 Lookup / store
+    # --------------------------------------------------------
+
+    def lookup(self, session_id: str, query: str) -> Optional[Dict[str, Any]]:
+        """final_output for `query`, with citations pointing at this session's files, or None."""
+        if not self.enabled:
+            return None
+        fingerprint, by_hash = self._corpus(session_id)
+        if fingerprint is None:
+            return None
+
+        key = self._key(fingerprint, query)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                item["hits"] += 1
+                answer = copy.deepcopy(item["answer"])
+
+        metrics.incr("answer_store.hits" if item is not None else "answer_store.misses")
+        if item is None:
+            return None
+
+        citations = []
+        for citation in answer.pop("citations"):
+            entry = by_hash.get(citation.pop("content_hash", None), {})
+            file_name = entry.get("original_name", citation.get("file_name"))
+            citations.append({
+                **citation,
+                "file_name": file_name,
+                "file_path": entry.get("original_file_path", citation.get("file_path")),
+                "public_url": f"{BASE_UPLOAD_URL}/{session_id}/{quote(file_name)}" if file_name else None,
+            })
+
+        logger.info(f"🌐 Shared answer store hit for {session_id} (corpus {fingerprint[:12]})")
+        return {
+            **answer,
+            "query": query,
+            "citations": citations,
+            "formatted_citations": format_citations_for_display(citations),
+            "cached": True,
+        }
+
+    def store(self, session_id: str, query: str, final_output: Dict[str, Any]):
+        """
+        Share a document-grounded answer with every session holding the same corpus.
+        Answers generated with conversation history are session-specific and stay private.
+        """
+        if (
+            not self.enabled
+            or final_output.get("cached")
+            or final_output.get("error")
+            or final_output.get("history")
+            or not final_output.get("used_chunks")
+        ):
+            return
+        fingerprint, by_hash = self._corpus(session_id)
+        if fingerprint is None:
+            return
+
+        name_to_hash = {e.get("original_name"): h for h, e in by_hash.items()}
+        citations = []
+        for citation in final_output.get("citations", []):
+            citation = {k: v for k, v in citation.items() if k != "public_url"}
+            citation["content_hash"] = name_to_hash.get(citation.get("file_name"))
+            citations.append(citation)
+
+        answer = {
+            "response": final_output["response"],
+            "model": final_output["model"],
+            "used_chunks": final_output["used_chunks"],
+            "citations": citations,
+        }
+
+        key = self._key(fingerprint, query)
+        with self._lock:
+            self._seq += 1
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # LFU: fewest hits first, oldest among equals
+                victim = min(self._entries, key=lambda k: (self._entries[k]["hits"], self._entries[k]["seq"]))
+                del self._entries[victim]
+                metrics.incr("answer_store.evictions")
+            self._entries[key] = {"answer": answer, "hits": 0, "seq": self._seq}
+            size = len(self._entries)
+
+        metrics.set("answer_store.entries", size)
+
+
+# Singleton instances
+answer_cache = SemanticAnswerCache()
+shared_answer_store = SharedAnswerStore()
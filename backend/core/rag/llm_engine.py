@@ -1,8 +1,12 @@
 # backend/core/rag/llm_engine.py
 
 import os
+import asyncio
+import threading
+import weakref
 import langchain
-from typing import List, Dict, Generator, Optional
+from contextlib import asynccontextmanager
+from typing import Any, Callable, List, Dict, Optional, Sequence, Tuple
 
 # 🩹 Compatibility patch for LangChain integrations (fix missing attrs)
 for attr, default in {
@@ -15,10 +19,17 @@ for attr, default in {
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+from langchain_core.runnables import Runnable, RunnableSequence
 
 from backend.utils.logger import logger
-from backend.utils.config import GEMINI_API_KEY
+from backend.utils.metrics import metrics
+from backend.utils.config import (
+    GEMINI_API_KEY,
+    LLM_MODEL,
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT_SEC,
+    LLM_MAX_ATTEMPTS,
+)
 
 
 # ✅ Ensure Gemini API key is visible to the SDK
@@ -30,21 +41,19 @@ os.environ["GOOGLE_API_KEY"] = GEMINI_API_KEY
 # ======================================================
 
 def get_llm(
-    model_name: str = "gemini-2.5-flash",
+    model_name: str = LLM_MODEL,
     temperature: float = 0.4,
 ) -> ChatGoogleGenerativeAI:
     """
-    Return a base Gemini chat model instance.
+    Return the shared Gemini chat model for (model, temperature).
 
     This is used by:
       - assistant_node (for tool vs general routing)
       - any other component that needs a "bare" LLM
+
+    The instance is cached process-wide (see `llm_runtime`) — don't mutate it.
     """
-    return ChatGoogleGenerativeAI(
-        model=model_name,
-        google_api_key=GEMINI_API_KEY,
-        temperature=temperature,
-    )
+    return llm_runtime.client(model_name, temperature)
 
 
 # ======================================================
@@ -106,21 +115,186 @@ MODE: {mode}
 
 
 # ======================================================
-# 🧵 INTERNAL HELPER: build chain
+# 🏊 LLM RUNTIME (process-wide clients + compiled chains)
+#   Building a ChatGoogleGenerativeAI sets up a new Gemini API client
+#   (auth, connection pool); bind_tools converts tool schemas; the answer
+#   prompt is parsed per build. All of it is done once per key and reused,
+#   so every request shares the same client and its open connections.
+#
+#   Retry / backoff: configured in ONE place, the client's `max_retries`
+#   (LLM_MAX_ATTEMPTS) + `timeout` — the integration retries rate-limit
+#   and transient server errors with exponential backoff itself. Calls
+#   never pass their own retry options on top.
 # ======================================================
 
+
+class LLMRuntime:
+    def __init__(self):
+        self._clients: Dict[Tuple[str, float], ChatGoogleGenerativeAI] = {}
+        self._chains: Dict[Tuple[str, float], RunnableSequence] = {}
+        self._tool_models: Dict[Tuple[str, float, Tuple[str, ...]], Runnable] = {}
+        self._lock = threading.Lock()
+
+    def client(self, model_name: str = LLM_MODEL, temperature: float = 0.4) -> ChatGoogleGenerativeAI:
+        key = (model_name, temperature)
+        llm = self._clients.get(key)
+        if llm is None:
+            with self._lock:
+                llm = self._clients.get(key)
+                if llm is None:
+                    llm = self._clients[key] = ChatGoogleGenerativeAI(
+                        model=model_name,
+                        google_api_key=GEMINI_API_KEY,
+                        temperature=temperature,
+                        timeout=LLM_TIMEOUT_SEC,
+                        max_retries=LLM_MAX_ATTEMPTS,
+                    )
+                    metrics.incr("llm_runtime.clients_built")
+                    logger.info(f"🏊 LLM client ready: {model_name} (temperature={temperature})")
+        return llm
+
+    def answer_chain(self, model_name: str = LLM_MODEL, temperature: float = 0.4) -> RunnableSequence:
+        """Answer prompt → LLM, compiled once per (model, temperature)."""
+        key = (model_name, temperature)
+        chain = self._chains.get(key)
+        if chain is None:
+            llm = self.client(model_name, temperature)
+            with self._lock:
+                chain = self._chains.setdefault(key, RunnableSequence(build_answer_prompt() | llm))
+        return chain
+
+    def with_tools(self, tools: Sequence[Any], model_name: str = LLM_MODEL, temperature: float = 0.4) -> Runnable:
+        """LLM with `tools` bound (schemas converted once per tool set)."""
+        key = (model_name, temperature, tuple(getattr(t, "name", str(t)) for t in tools))
+        bound = self._tool_models.get(key)
+        if bound is None:
+            bound = self.client(model_name, temperature).bind_tools(list(tools))
+            with self._lock:
+                bound = self._tool_models.setdefault(key, bound)
+        return bound
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+            self._chains.clear()
+            self._tool_models.clear()
+
+
+# Singleton instance
+llm_runtime = LLMRuntime()
+
+
 def _build_chain(
-    model_name: str = "gemini-2.5-flash",
+    model_name: str = LLM_MODEL,
     temperature: float = 0.4,
 ) -> RunnableSequence:
     """
-    Internal helper to build a PromptTemplate → LLM runnable chain.
+    Internal helper returning the cached PromptTemplate → LLM runnable chain.
     Used by both general + RAG answer functions (streaming & non-streaming).
     """
-    llm = get_llm(model_name=model_name, temperature=temperature)
-    prompt = build_answer_prompt()
-    # PromptTemplate | ChatGoogleGenerativeAI => RunnableSequence
-    return RunnableSequence(prompt | llm)
+    return llm_runtime.answer_chain(model_name, temperature)
+
+
+# ======================================================
+# 🚦 CONCURRENCY LIMIT (async path)
+#   One semaphore per event loop: at most LLM_MAX_CONCURRENCY Gemini
+#   calls in flight per process; extra requests wait without blocking.
+# ======================================================
+
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+@asynccontextmanager
+async def llm_slot():
+    """Hold one of the process-wide LLM call slots (use around every async LLM call)."""
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    async with semaphore:
+        yield
+
+
+# ======================================================
+# 🧾 PROMPT INPUTS (shared by sync + async variants)
+# ======================================================
+
+def _general_inputs(query: str, memory_text: Optional[str]) -> Dict:
+    return {
+        "mode": "general",
+        "context": memory_text or "No prior conversation context is available.",
+        "question": query,
+    }
+
+
+def _rag_inputs(query: str, context_chunks: List[str]) -> Dict:
+    if context_chunks:
+        # You can tune how many chunks to join here if needed.
+        context_text = "\n\n".join(context_chunks)
+    else:
+        # RAG path but no context: model should be honest about that.
+        context_text = (
+            "No document context was retrieved for this query. "
+            "Answer based on your general knowledge but say that "
+            "no supporting document passage was found."
+        )
+    return {"mode": "rag", "context": context_text, "question": query}
+
+
+def message_text(message) -> str:
+    """
+    Text of an LLM message or stream chunk. Gemini may return `content` as a
+    list of content blocks instead of a string; only text blocks are joined.
+    """
+    content = getattr(message, "content", message)
+    if isinstance(content, str):
+        return content
+
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get("type", "text") == "text":
+            parts.append(block.get("text", ""))
+    return "".join(parts)
+
+
+def _answer(query: str, result, used_chunks: int, model_name: str) -> Dict:
+    return {
+        "query": query,
+        "response": message_text(result) if hasattr(result, "content") else str(result),
+        "used_chunks": used_chunks,
+        "model": model_name,
+    }
+
+
+def _error_answer(query: str, error: Exception, used_chunks: int, model_name: str) -> Dict:
+    return {
+        "query": query,
+        "response": f"⚠ Error generating response: {str(error)}",
+        "used_chunks": used_chunks,
+        "model": model_name,
+        "error": True,      # never cached or shared (see answer_cache)
+    }
+
+
+async def _arun_chain(chain: RunnableSequence, inputs: Dict, on_token: Optional[Callable[[str], None]]):
+    """
+    ainvoke the chain inside an LLM slot. With `on_token`, stream it instead
+    (chain.astream) and hand every text delta to `on_token` as it arrives;
+    the joined text is returned so callers build the same answer dict.
+    """
+    async with llm_slot():
+        if on_token is None:
+            return await chain.ainvoke(inputs)
+
+        parts = []
+        async for chunk in chain.astream(inputs):
+            text = message_text(chunk)
+            if text:
+                parts.append(text)
+                on_token(text)
+        return "".join(parts)
 
 
 # ======================================================
@@ -131,7 +305,7 @@ def _build_chain(
 def generate_general_answer(
     query: str,
     memory_text: Optional[str] = None,
-    model_name: str = "gemini-2.5-flash",
+    model_name: str = LLM_MODEL,
 ) -> Dict:
     """
     Generate a GENERAL (non-RAG) answer.
@@ -140,37 +314,42 @@ def generate_general_answer(
       already formatted as a single string
       (e.g. "user: ...\\nassistant: ...\\n...").
     - No document chunks are used.
+    - Blocking: async callers should use `agenerate_general_answer`.
     """
     try:
         logger.info(f"🤖 [GENERAL] Generating answer for query: '{query}'")
 
-        context_text = memory_text or "No prior conversation context is available."
-
         chain = _build_chain(model_name=model_name)
+        result = chain.invoke(_general_inputs(query, memory_text))
 
-        result = chain.invoke(
-            {
-                "mode": "general",
-                "context": context_text,
-                "question": query,
-            }
-        )
+        return _answer(query, result, 0, model_name)   # no document chunks in general mode
+
+    except Exception as e:
+        logger.exception(f"❌ [GENERAL] Error generating answer: {e}")
+        return _error_answer(query, e, 0, model_name)
 
-        return {
-            "query": query,
-            "response": getattr(result, "content", str(result)),
-            "used_chunks": 0,        # no document chunks in general mode
-            "model": model_name,
-        }
+
+async def agenerate_general_answer(
+    query: str,
+    memory_text: Optional[str] = None,
+    model_name: str = LLM_MODEL,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict:
+    """
+    Async `generate_general_answer` (chain.ainvoke, bounded by `llm_slot`).
+    Pass `on_token` to receive the answer incrementally (chain.astream).
+    """
+    try:
+        logger.info(f"🤖 [GENERAL] Generating answer for query: '{query}'")
+
+        chain = _build_chain(model_name=model_name)
+        result = await _arun_chain(chain, _general_inputs(query, memory_text), on_token)
+
+        return _answer(query, result, 0, model_name)
 
     except Exception as e:
         logger.exception(f"❌ [GENERAL] Error generating answer: {e}")
-        return {
-            "query": query,
-            "response": f"⚠ Error generating response: {str(e)}",
-            "used_chunks": 0,
-            "model": model_name,
-        }
+        return _error_answer(query, e, 0, model_name)
 
 
 # ======================================================
@@ -181,7 +360,7 @@ def generate_general_answer(
 def generate_rag_answer(
     query: str,
     context_chunks: List[str],
-    model_name: str = "gemini-2.5-flash",
+    model_name: str = LLM_MODEL,
 ) -> Dict:
     """
     Generate a DOCUMENT-GROUNDED (RAG) answer.
@@ -189,6 +368,7 @@ def generate_rag_answer(
     - `context_chunks` should be a list of text chunks
        (document snippets + optionally conversation history)
        that you’ve already prepared in rag_pipeline.py.
+    - Blocking: async callers should use `agenerate_rag_answer`.
     """
     try:
         logger.info(
@@ -196,39 +376,37 @@ def generate_rag_answer(
             f"with {len(context_chunks)} context chunks"
         )
 
-        if context_chunks:
-            # You can tune how many chunks to join here if needed.
-            context_text = "\n\n".join(context_chunks)
-        else:
-            # RAG path but no context: model should be honest about that.
-            context_text = (
-                "No document context was retrieved for this query. "
-                "Answer based on your general knowledge but say that "
-                "no supporting document passage was found."
-            )
-
         chain = _build_chain(model_name=model_name)
+        result = chain.invoke(_rag_inputs(query, context_chunks))
+
+        return _answer(query, result, len(context_chunks), model_name)
 
-        result = chain.invoke(
-            {
-                "mode": "rag",
-                "context": context_text,
-                "question": query,
-            }
+    except Exception as e:
+        logger.exception(f"❌ [RAG] Error generating RAG answer: {e}")
+        return _error_answer(query, e, len(context_chunks), model_name)
+
+
+async def agenerate_rag_answer(
+    query: str,
+    context_chunks: List[str],
+    model_name: str = LLM_MODEL,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict:
+    """
+    Async `generate_rag_answer` (chain.ainvoke, bounded by `llm_slot`).
+    Pass `on_token` to receive the answer incrementally (chain.astream).
+    """
+    try:
+        logger.info(
+            f"🤖 [RAG] Generating answer for query: '{query}' "
+            f"with {len(context_chunks)} context chunks"
         )
 
-        return {
-            "query": query,
-            "response": getattr(result, "content", str(result)),
-            "used_chunks": len(context_chunks),
-            "model": model_name,
-        }
+        chain = _build_chain(model_name=model_name)
+        result = await _arun_chain(chain, _rag_inputs(query, context_chunks), on_token)
+
+        return _answer(query, result, len(context_chunks), model_name)
 
     except Exception as e:
         logger.exception(f"❌ [RAG] Error generating RAG answer: {e}")
-        return {
-            "query": query,
-            "response": f"⚠ Error generating response: {str(e)}",
-            "used_chunks": len(context_chunks),
-            "model": model_name,
-        }
\ No newline at end of file
+        return _error_answer(query, e, len(context_chunks), model_name)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils.config import QUERY_EMBED_MAX_WAIT_MS, QUERY_EMBED_MAX_BATCH
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.embedding_cache import embedding_cache
+
+
+def encode_queries(model, texts: List[str]) -> np.ndarray:
+    """Plain (unbucketed) encode for short query texts."""
+    return model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+
+
+class QueryEmbeddingService:
+    """
+    Async query embedder with cross-request micro-batching.
+
+    Concurrent `embed()` calls are queued; a collector task waits up to
+    `max_wait_ms` after the first queued query (or until `max_batch` queries
+    are waiting), then encodes the whole batch in ONE model call on a
+    dedicated single-thread executor and resolves every caller's future.
+    The event loop never runs `model.encode` itself.
+    """
+
+    def __init__(self, model, max_wait_ms: float = QUERY_EMBED_MAX_WAIT_MS, max_batch: int = QUERY_EMBED_MAX_BATCH):
+        self.model = model
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-embed")
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_collector(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embedding of one query text (float32)."""
+        self._ensure_collector()
+        future = self._loop.create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            # Requests that queued while the previous batch was encoding join immediately
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            texts = [text for text, _ in batch]
+
+            start = time.perf_counter()
+            try:
+                vectors = await loop.run_in_executor(
+                    self._executor,
+                    lambda: embedding_cache.encode(self.model, texts, encode_fn=encode_queries, scope="query"),
+                )
+            except Exception as e:
+                logger.error(f"❌ Query embedding batch failed ({len(texts)} queries): {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+            metrics.incr("query_embedder.batches")
+            metrics.incr("query_embedder.queries", len(batch))
+            metrics.set("query_embedder.last_batch", {
+                "size": len(batch),
+                "encode_ms": round((time.perf_counter() - start) * 1000, 2),
+            })
+
+    def shutdown(self):
+        if self._collector is not None:
+            self._collector.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
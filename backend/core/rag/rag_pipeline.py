@@ -1,12 +1,15 @@
 # backend/core/rag/rag_pipeline.py
 
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
+from backend.utils.config import RAG_TOP_K
 from backend.utils.logger import logger
 
 # Import core RAG components
-from backend.core.rag.retriever import retrieve_top_k_chunks
+from backend.core.rag.retriever import aretrieve_top_k_chunks
 from backend.core.rag.citation_handler import prepare_context_and_citations, format_citations_for_display
-from backend.core.rag.llm_engine import generate_rag_answer
+from backend.core.rag.llm_engine import agenerate_rag_answer
+from backend.core.rag.retrieval_cache import retrieval_cache
+from backend.core.rag.speculative_retrieval import speculative_retrievals
 
 # Memory
 from backend.core.rag.session_memory import add_to_session_memory, get_session_memory
@@ -15,7 +18,7 @@ from backend.core.rag.session_memory import add_to_session_memory, get_session_m
 # =======================================================================
 # 1️⃣ RETRIEVAL-ONLY FUNCTION (⚡ Used by rag_tool inside LangGraph)
 # =======================================================================
-async def run_rag_retrieval(session_id: str, query: str, top_k: int = 5) -> Dict[str, Any]:
+async def run_rag_retrieval(session_id: str, query: str, top_k: int = RAG_TOP_K) -> Dict[str, Any]:
     """
     Retrieve semantically relevant document chunks for a given query.
     This function is used ONLY by the rag_tool, and it MUST NOT generate
@@ -23,7 +26,9 @@ async def run_rag_retrieval(session_id: str, query: str, top_k: int = 5) -> Dict
 
     Workflow:
         - Save the user query in conversation memory
-        - Retrieve top-K relevant chunks from Qdrant
+        - Reuse a speculative retrieval started while the router was deciding
+        - Otherwise serve repeats from the retrieval cache (same session index, query, top_k)
+          or retrieve top-K relevant chunks from Qdrant
         - Prepare clean chunks + structured citations
         - Return ONLY data (NO LLM generation)
     """
@@ -33,10 +38,53 @@ async def run_rag_retrieval(session_id: str, query: str, top_k: int = 5) -> Dict
     # Add user message to sliding window memory
     add_to_session_memory(session_id, "user", query)
 
-    # Step 1: Retrieve chunks from Qdrant
-    retrieved = retrieve_top_k_chunks(session_id, query, top_k)
+    # Step 0: Retrieval already started speculatively while the router was deciding
+    # (always claimed first so the task is never orphaned; it checked the cache itself)
+    speculative = speculative_retrievals.take(session_id, query, top_k)
+    if speculative is not None:
+        try:
+            prepared = await speculative_retrievals.result(speculative)
+            logger.info(f"🏎️ Using speculative retrieval ({len(prepared['chunks'])} chunks)")
+            return {"query": query, **prepared}
+        except Exception as e:
+            logger.warning(f"⚠️ Speculative retrieval unusable, retrieving again: {e!r}")
 
-    # Step 2: Process raw results into:
+    prepared = await prepare_retrieval(session_id, query, top_k)
+
+    # Tool-safe response (NO LLM answer here)
+    return {
+        "query": query,
+        "chunks": prepared["chunks"],         # clean context for LLM
+        "citations": prepared["citations"]    # raw structured citations
+    }
+
+
+async def prepare_retrieval(session_id: str, query: str, top_k: int = RAG_TOP_K) -> Dict[str, Any]:
+    """
+    Embed + search + build context/citations (no memory side effects), so it
+    can also run speculatively before the router has decided.
+    """
+
+    # Step 0: Repeated question on an unchanged index → no embedding, no search
+    cached = retrieval_cache.get(session_id, query, top_k)
+    if cached is not None:
+        logger.info(f"♻️ Retrieval cache hit ({len(cached['chunks'])} chunks)")
+        return cached
+
+    # Step 1: Retrieve chunks from Qdrant (query embedding is micro-batched, off the event loop)
+    retrieved = await aretrieve_top_k_chunks(session_id, query, top_k)
+
+    # Step 2: Build context + citations and cache them
+    return cache_retrieval(session_id, query, top_k, retrieved)
+
+
+def cache_retrieval(session_id: str, query: str, top_k: int, retrieved: List[Dict]) -> Dict[str, Any]:
+    """
+    Retrieval results → {"chunks", "citations"}, stored in the retrieval cache.
+    Also used by the local router, whose search then serves rag_tool.
+    """
+
+    # Process raw results into:
     #   - context_chunks → for LLM
     #   - citations → metadata for frontend
     processed = prepare_context_and_citations(retrieved)
@@ -46,18 +94,23 @@ async def run_rag_retrieval(session_id: str, query: str, top_k: int = 5) -> Dict
 
     logger.info(f"📄 Retrieved {len(chunks)} relevant context chunks.")
 
-    # Tool-safe response (NO LLM answer here)
-    return {
-        "query": query,
-        "chunks": chunks,         # clean context for LLM
-        "citations": citations    # raw structured citations
-    }
+    # Empty results may be transient (index being rebuilt, search error) → not cached
+    if chunks:
+        retrieval_cache.put(session_id, query, top_k, {"chunks": chunks, "citations": citations})
+
+    return {"chunks": chunks, "citations": citations}
 
 
 # =======================================================================
 # 2️⃣ LLM GENERATION FUNCTION (⚡ Used after rag_tool is called)
 # =======================================================================
-async def run_rag_generation(session_id: str, query: str, chunks: List[str], citations: List[Dict]) -> Dict[str, Any]:
+async def run_rag_generation(
+    session_id: str,
+    query: str,
+    chunks: List[str],
+    citations: List[Dict],
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
     """
     Generate the final answer for a RAG query *after* retrieval is done.
     This is used by assistant_node only when the LLM decides to call rag_tool.
@@ -65,7 +118,7 @@ async def run_rag_generation(session_id: str, query: str, chunks: List[str], cit
     Workflow:
         - Load conversation memory
         - Combine memory + retrieved chunks
-        - Generate final LLM answer
+        - Generate final LLM answer (streamed to `on_token` when given)
         - Save LLM answer to memory
         - Format citations for frontend display
     """
@@ -97,7 +150,7 @@ async def run_rag_generation(session_id: str, query: str, chunks: List[str], cit
     master_context.extend(chunks)
 
     # Produce the final contextual LLM answer
-    llm_result = generate_rag_answer(query, master_context)
+    llm_result = await agenerate_rag_answer(query, master_context, on_token=on_token)
 
     # Save the assistant's reply to session memory
     add_to_session_memory(session_id, "assistant", llm_result["response"])
@@ -111,5 +164,7 @@ async def run_rag_generation(session_id: str, query: str, chunks: List[str], cit
         "model": llm_result["model"],
         "used_chunks": len(chunks),
         "citations": citations,
-        "formatted_citations": formatted_citations
+        "formatted_citations": formatted_citations,
+        "error": llm_result.get("error", False),
+        "history": bool(memory_text),   # answer depends on this session's conversation
     }
\ No newline at end of file
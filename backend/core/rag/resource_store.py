@@ -5,6 +5,7 @@ class ResourceStore:
     """
     embedding_model = None
     qdrant_client = None
+    query_embedder = None   # QueryEmbeddingService (micro-batched async query encoding)
 
 # Singleton instance
 resource_store = ResourceStore()
\ No newline at end of file
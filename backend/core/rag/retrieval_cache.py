@@ -0,0 +1,122 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from backend.utils.config import (
+    RETRIEVAL_CACHE_ENABLED,
+    RETRIEVAL_CACHE_MAX_ENTRIES,
+    RETRIEVAL_CACHE_TTL_SEC,
+)
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.doc_processing_unit.embedding_cache import normalize_text
+
+
+# ============================================================
+# 🔢 Per-session index generation
+#
+#   Bumped whenever a session's index changes (/process finished,
+#   /reset_session). Anything cached against an older generation is stale.
+# ============================================================
+
+_generations: Dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def get_index_generation(session_id: str) -> int:
+    with _generations_lock:
+        return _generations.get(session_id, 0)
+
+
+def bump_index_generation(session_id: str) -> int:
+    with _generations_lock:
+        generation = _generations.get(session_id, 0) + 1
+        _generations[session_id] = generation
+    retrieval_cache.invalidate_session(session_id)
+    logger.info(f"🔢 Index generation for {session_id} → {generation}")
+    return generation
+
+
+def normalize_query(query: str) -> str:
+    return normalize_text(query).casefold()
+
+
+# ============================================================
+# ♻️ Retrieval result cache (LRU + TTL)
+#
+#   key   = (session_id, index generation, normalized query, top_k)
+#   value = {"chunks", "citations"} as returned by run_rag_retrieval
+# ============================================================
+
+class RetrievalCache:
+    """Bounded in-process LRU cache of retrieval results with a TTL per entry."""
+
+    def __init__(
+        self,
+        max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES,
+        ttl_sec: float = RETRIEVAL_CACHE_TTL_SEC,
+        enabled: bool = RETRIEVAL_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(session_id: str, query: str, top_k: int) -> Tuple:
+        return (session_id, get_index_generation(session_id), normalize_query(query), top_k)
+
+    def get(self, session_id: str, query: str, top_k: int) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        key = self.key_for(session_id, query, top_k)
+
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and time.monotonic() - item[0] > self.ttl_sec:
+                del self._entries[key]
+                item = None
+            if item is not None:
+                self._entries.move_to_end(key)
+
+        self._record(hit=item is not None)
+        return copy.deepcopy(item[1]) if item is not None else None
+
+    def put(self, session_id: str, query: str, top_k: int, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+        key = self.key_for(session_id, query, top_k)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.incr("retrieval_cache.evictions")
+            size = len(self._entries)
+
+        metrics.set("retrieval_cache.entries", size)
+
+    def invalidate_session(self, session_id: str):
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == session_id]
+            for key in stale:
+                del self._entries[key]
+            size = len(self._entries)
+
+        metrics.set("retrieval_cache.entries", size)
+        if stale:
+            logger.info(f"♻️ Dropped {len(stale)} cached retrievals for {session_id}")
+
+    def _record(self, hit: bool):
+        metrics.incr("retrieval_cache.hits" if hit else "retrieval_cache.misses")
+        hits = metrics.get("retrieval_cache.hits", 0)
+        total = hits + metrics.get("retrieval_cache.misses", 0)
+        metrics.set("retrieval_cache.hit_rate", round(hits / total, 4))
+
+
+# Singleton instance
+retrieval_cache = RetrievalCache()
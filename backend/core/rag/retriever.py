@@ -1,9 +1,18 @@
+import asyncio
 from typing import List, Dict
+
+import numpy as np
+
 from backend.utils.logger import logger
 from backend.core.rag.resource_store import resource_store
+from backend.core.rag.query_embedder import encode_queries
+from backend.core.doc_processing_unit.embedding_cache import embedding_cache
+from backend.core.doc_processing_unit.vector_store import get_vector_store, qdrant_store
+from backend.utils.metrics import metrics
+from backend.utils.config import RAG_TOP_K
 
 
-def retrieve_top_k_chunks(session_id: str, query: str, top_k: int = 5) -> List[Dict]:
+def retrieve_top_k_chunks(session_id: str, query: str, top_k: int = RAG_TOP_K) -> List[Dict]:
     """
     Retrieve top K most relevant text chunks from Qdrant for this session.
     Returns structured output ready for citation handling and LLM context building.
@@ -11,37 +20,83 @@ def retrieve_top_k_chunks(session_id: str, query: str, top_k: int = 5) -> List[D
 
     logger.info(f"🔍 Retrieving for session={session_id} | top_k={top_k}")
 
-    # 🧠 Access global model/client (FastAPI OR tool)
-    client = resource_store.qdrant_client
+    # 🧠 Access global model (FastAPI OR tool)
     model = resource_store.embedding_model
 
-    # ✅ Convert query → embedding vector
-    query_vector = model.encode(query).tolist()
-    collection_name = f"session_{session_id}"
-    logger.info(f"📦 Searching collection: {collection_name}")
+    # ✅ Convert query → embedding vector (repeated queries skip the model)
+    query_vector = embedding_cache.encode(model, [query], encode_fn=encode_queries, scope="query")[0].tolist()
+
+    return _search(session_id, query, query_vector, top_k)
+
+
+async def aembed_query(query: str) -> np.ndarray:
+    """
+    Query embedding without blocking the event loop: micro-batched through
+    `resource_store.query_embedder`, or the embedding cache in a worker thread.
+    """
+    embedder = resource_store.query_embedder
+    if embedder is not None:
+        return await embedder.embed(query)
+
+    model = resource_store.embedding_model
+    vectors = await asyncio.to_thread(embedding_cache.encode, model, [query], encode_queries, "query")
+    return vectors[0]
+
+
+async def aretrieve_top_k_chunks(session_id: str, query: str, top_k: int = RAG_TOP_K) -> List[Dict]:
+    """
+    Async variant of `retrieve_top_k_chunks` for the agent path.
+    The query is embedded by `aembed_query` and the Qdrant call runs in a
+    worker thread, so the event loop never blocks.
+    """
+    logger.info(f"🔍 Retrieving for session={session_id} | top_k={top_k}")
+
+    query_vector = (await aembed_query(query)).tolist()
+    return await asyncio.to_thread(_search, session_id, query, query_vector, top_k)
 
+
+def _search(session_id: str, query: str, query_vector: List[float], top_k: int) -> List[Dict]:
     # ✅ Perform semantic search with error handling
     try:
-        response = client.query_points(
-            collection_name=collection_name,
-            query=query_vector,
-            limit=top_k,
-            with_payload=True,     # include metadata + text
-            with_vectors=False     # skip returning embeddings
-        )
+        hits = search_session(session_id, query_vector, top_k)
     except Exception as e:
         logger.error(f"⚠️ Retrieval failed for session {session_id}: {e}")
         return []
 
+    results = format_hits(hits)
+    logger.info(f"✅ Retrieved {len(results)} chunks for query → '{query}'")
+    return results
+
+
+def search_session(session_id: str, query_vector: List[float], top_k: int) -> List[Dict]:
+    """Raw hits from the session's vector store (Qdrant when the local index is unusable). Raises on failure."""
+    store = get_vector_store(session_id)
+    logger.info(f"📦 Searching session {session_id} ({store.name} vector store)")
+
+    try:
+        hits = store.search(session_id, query_vector, top_k)
+    except Exception as e:
+        if store is qdrant_store:
+            raise
+        # Local index missing or being rebuilt → Qdrant always holds the session
+        logger.warning(f"⚠️ {store.name} vector store unavailable for {session_id}, using Qdrant: {e}")
+        store = qdrant_store
+        hits = store.search(session_id, query_vector, top_k)
+    metrics.incr(f"retrieval.backend.{store.name}")
+    return hits
+
+
+def format_hits(hits: List[Dict]) -> List[Dict]:
+    """Vector store hits → retrieval results (text + citation info)."""
     # ✅ Format results (citation-friendly)
     results = []
-    for idx, hit in enumerate(response.points, start=1):
-        payload = hit.payload or {}
+    for idx, hit in enumerate(hits, start=1):
+        payload = hit["payload"]
 
         # 🧾 Build citation info (used by citation_handler.py)
         citation_info = {
             "rank": idx,
-            "score": round(hit.score, 4),
+            "score": round(hit["score"], 4),
             "chunk_id": payload.get("chunk_id"),
             "session_id": payload.get("session_id"),
             "file_name": payload.get("original_file_name"),
@@ -55,8 +110,6 @@ def retrieve_top_k_chunks(session_id: str, query: str, top_k: int = 5) -> List[D
         results.append({
             "citation": citation_info,
             "text": payload.get("text", "").strip(),
-            "metadata": payload  # keep full metadata (optional, may help in debug/future use)
+            "metadata": {k: v for k, v in payload.items() if k != "text"}  # row fields (debug/future use), text not duplicated
         })
-
-    logger.info(f"✅ Retrieved {len(results)} chunks for query → '{query}'")
     return results
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.utils.logger import logger
+from backend.utils.metrics import metrics
+from backend.core.rag.retrieval_cache import normalize_query
+
+
+# ============================================================
+# 🏎️ Speculative retrieval registry
+#
+#   assistant_node starts retrieval for the user's message while the
+#   router LLM is still deciding. The running task is parked here under
+#   (session_id, normalized query, top_k):
+#     • rag_tool asks for the same key → takes the task, awaits its result
+#     • router decides otherwise       → assistant_node discards it
+#   Untaken tasks are cancelled after STALE_AFTER_SEC as a safety net.
+# ============================================================
+
+STALE_AFTER_SEC = 60.0
+
+_Key = Tuple[str, str, int]
+
+
+class SpeculativeRetrievals:
+    def __init__(self):
+        self._tasks: Dict[_Key, Tuple[asyncio.Task, float]] = {}
+
+    @staticmethod
+    def key_for(session_id: str, query: str, top_k: int) -> _Key:
+        return (session_id, normalize_query(query), top_k)
+
+    def start(self, session_id: str, query: str, top_k: int, fn: Callable[[], Awaitable[Dict[str, Any]]]):
+        self._prune()
+        key = self.key_for(session_id, query, top_k)
+        if key in self._tasks:
+            return
+        self._tasks[key] = (asyncio.get_running_loop().create_task(fn()), time.perf_counter())
+        metrics.incr("speculative.started")
+        logger.info(f"🏎️ Speculative retrieval started for session={session_id}")
+
+    def take(self, session_id: str, query: str, top_k: int) -> Optional[Tuple[asyncio.Task, float]]:
+        """Claim a running speculative task (task, start time), or None."""
+        return self._tasks.pop(self.key_for(session_id, query, top_k), None)
+
+    def discard(self, session_id: str, query: str, top_k: int):
+        item = self._tasks.pop(self.key_for(session_id, query, top_k), None)
+        if item is not None:
+            item[0].cancel()
+            metrics.incr("speculative.discarded")
+
+    async def result(self, item: Tuple[asyncio.Task, float]) -> Dict[str, Any]:
+        """Await a taken task and record how much retrieval time it hid."""
+        task, started = item
+        ready = task.done()
+        waited = time.perf_counter()
+        value = await task
+        now = time.perf_counter()
+
+        metrics.incr("speculative.used")
+        metrics.set("speculative.last", {
+            "ready_when_needed": ready,
+            "head_start_ms": round((waited - started) * 1000, 2),
+            "wait_ms": round((now - waited) * 1000, 2),
+        })
+        return value
+
+    def _prune(self):
+        now = time.perf_counter()
+        for key, (task, started) in list(self._tasks.items()):
+            if now - started > STALE_AFTER_SEC:
+                self._tasks.pop(key, None)
+                task.cancel()
+                metrics.incr("speculative.expired")
+
+
+# Singleton instance
+speculative_retrievals = SpeculativeRetrievals()
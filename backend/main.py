@@ -10,13 +10,18 @@ from backend.api.routes.process import router as process_router
 from backend.api.routes.list_docs import router as list_docs_router
 from backend.api.routes.reset_session import router as reset_router
 from backend.api.routes.query import router as query_router
+from backend.api.routes.metrics import router as metrics_router
 
 # from backend.api.routes.test_tool import router as test_tool_router
 
 # ✅ Core
 from backend.core.doc_processing_unit.model_manager import get_embedding_model
 from backend.core.doc_processing_unit.qdrant_manager import client as qdrant_client
+from backend.core.doc_processing_unit.parallel_ingest import shutdown_ingest_pool
+from backend.core.doc_processing_unit.job_manager import job_manager
+from backend.core.doc_processing_unit.embedding_cache import embedding_cache
 from backend.core.rag.resource_store import resource_store
+from backend.core.rag.query_embedder import QueryEmbeddingService
 from backend.utils.logger import logger
 
 UPLOAD_DIR = "backend/data/uploads"
@@ -37,6 +42,7 @@ async def lifespan(app: FastAPI):
     # 🔥 NEW: Copy references for tools (LangGraph)
     resource_store.embedding_model = app.state.embedding_model
     resource_store.qdrant_client = app.state.qdrant_client
+    resource_store.query_embedder = QueryEmbeddingService(app.state.embedding_model)
 
     logger.info("✅ Startup complete — model loaded and Qdrant connected.")
     yield
@@ -50,6 +56,17 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️ Error closing Qdrant client: {e}")
 
+    if resource_store.query_embedder is not None:
+        resource_store.query_embedder.shutdown()
+
+    job_manager.shutdown()
+    logger.info("🧵 Background processing jobs cancelled.")
+
+    shutdown_ingest_pool()
+    logger.info("🏭 Ingestion worker pool stopped.")
+
+    embedding_cache.close()
+
     logger.info("👋 Shutdown complete.")
 
 
@@ -117,6 +134,7 @@ app.include_router(process_router, prefix="/api", tags=["Process"])
 app.include_router(list_docs_router, prefix="/api", tags=["Documents List"])
 app.include_router(reset_router, prefix="/api", tags=["Reset Session"])
 app.include_router(query_router, prefix="/api", tags=["Query"])
+app.include_router(metrics_router, prefix="/api", tags=["Metrics"])
 # app.include_router(test_tool_router, prefix="/api", tags=["Tool TEST"])
 
 # ============================================================
@@ -33,4 +33,5 @@ class QueryResponse(BaseModel):
     model: str
     used_chunks: int
     citations: List[Citation]
-    formatted_citations: str
\ No newline at end of file
+    formatted_citations: str
+    cached: bool = Field(False, description="Served from the semantic answer cache (no LLM call)")
\ No newline at end of file
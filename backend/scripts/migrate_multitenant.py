@@ -0,0 +1,123 @@
+"""
+Move per-session Qdrant collections (`session_<id>`) into the shared
+multitenant collection (QDRANT_SHARED_COLLECTION).
+
+Usage:
+    python -m backend.scripts.migrate_multitenant [--dry-run] [--keep-source] [--batch-size 256]
+
+Points are re-keyed with UUID ids (collision-safe in one collection); payloads
+are copied unchanged. A source collection is deleted only after the shared
+collection holds at least as many points for that session.
+Afterwards set QDRANT_MULTITENANT=true and restart the backend.
+"""
+
+import argparse
+
+from qdrant_client.models import PointStruct, Filter, FieldCondition, MatchValue
+
+from backend.utils.config import QDRANT_SHARED_COLLECTION
+from backend.utils.logger import logger
+from backend.core.doc_processing_unit.qdrant_manager import (
+    client,
+    string_to_uuid_id,
+    create_shared_collection,
+)
+
+SESSION_PREFIX = "session_"
+
+
+def _ensure_shared_collection(vector_dim: int):
+    if client.collection_exists(QDRANT_SHARED_COLLECTION):
+        return
+    logger.info(f"🏢 Creating shared multitenant collection: {QDRANT_SHARED_COLLECTION}")
+    create_shared_collection(QDRANT_SHARED_COLLECTION, vector_dim)
+
+
+def _count_session(session_id: str) -> int:
+    return client.count(
+        collection_name=QDRANT_SHARED_COLLECTION,
+        count_filter=Filter(must=[FieldCondition(key="session_id", match=MatchValue(value=session_id))]),
+        exact=True,
+    ).count
+
+
+def migrate_collection(source: str, batch_size: int, keep_source: bool) -> int:
+    """Copy one per-session collection into the shared collection. Returns points copied."""
+    session_id = source[len(SESSION_PREFIX):]
+    expected = client.count(collection_name=source, exact=True).count
+
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if not points:
+            break
+
+        batch = []
+        for point in points:
+            payload = dict(point.payload or {})
+            payload["session_id"] = session_id
+            chunk_id = payload.get("chunk_id")
+            if chunk_id is None and payload.get("source_doc_folder"):
+                # Slim payloads carry the chunk locator instead of the id
+                chunk_id = f"{session_id}_{payload['source_doc_folder']}_chunk_{payload.get('chunk_index')}"
+            chunk_id = chunk_id or f"{source}:{point.id}"
+            batch.append(PointStruct(id=string_to_uuid_id(chunk_id), vector=point.vector, payload=payload))
+
+        client.upsert(collection_name=QDRANT_SHARED_COLLECTION, points=batch, wait=True)
+        copied += len(batch)
+
+        if offset is None:
+            break
+
+    migrated = _count_session(session_id)
+    if migrated < expected:
+        logger.error(f"❌ {source}: only {migrated}/{expected} points in {QDRANT_SHARED_COLLECTION}, keeping source")
+        return copied
+
+    logger.info(f"✅ {source}: {copied} points → {QDRANT_SHARED_COLLECTION}")
+    if not keep_source:
+        client.delete_collection(collection_name=source)
+        logger.info(f"🗑️ Deleted source collection: {source}")
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate per-session Qdrant collections into one multitenant collection.")
+    parser.add_argument("--dry-run", action="store_true", help="List collections that would be migrated")
+    parser.add_argument("--keep-source", action="store_true", help="Do not delete per-session collections")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per scroll / upsert batch")
+    args = parser.parse_args()
+
+    sources = sorted(
+        c.name for c in client.get_collections().collections
+        if c.name.startswith(SESSION_PREFIX) and c.name != QDRANT_SHARED_COLLECTION
+    )
+    logger.info(f"🔎 Found {len(sources)} per-session collections")
+
+    if args.dry_run or not sources:
+        for name in sources:
+            logger.info(f"  • {name}: {client.count(collection_name=name, exact=True).count} points")
+        return
+
+    vector_dim = client.get_collection(sources[0]).config.params.vectors.size
+    _ensure_shared_collection(vector_dim)
+
+    total = 0
+    for source in sources:
+        try:
+            total += migrate_collection(source, args.batch_size, args.keep_source)
+        except Exception as e:
+            logger.error(f"❌ Failed to migrate {source}: {e}")
+
+    logger.info(f"🎯 Migration finished: {total} points from {len(sources)} collections")
+
+
+if __name__ == "__main__":
+    main()
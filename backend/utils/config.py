@@ -27,6 +27,13 @@ QDRANT_PORT: int = int(os.getenv("QDRANT_PORT", 6333))
 # Embedding Model
 EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "BAAI/bge-small-en-v1.5")
 
+# LLM
+LLM_MODEL: str = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 16))   # in-flight LLM calls per process
+LLM_TIMEOUT_SEC: float = float(os.getenv("LLM_TIMEOUT_SEC", 60))
+# Attempts per call incl. the first (SDK retries 408 / 429 / 5xx with exponential backoff + jitter)
+LLM_MAX_ATTEMPTS: int = int(os.getenv("LLM_MAX_ATTEMPTS", 4))
+
 # LLM Keys
 GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
 GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
@@ -37,6 +44,158 @@ GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", 1000))
 CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", 100))
 
+# ==============================
+# 🏭 Parallel Ingestion Config
+# ==============================
+# Worker processes for extract → clean → chunk
+INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", min(4, os.cpu_count() or 1)))
+# PDFs with more pages than this are split into page ranges across workers
+PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", 50))
+
+# ==============================
+# 🌊 Streaming Ingestion Config
+# ==============================
+# Size of text blocks read from disk while cleaning / chunking
+STREAM_BLOCK_CHARS: int = int(os.getenv("STREAM_BLOCK_CHARS", 64 * 1024))
+# Text buffered before the chunker emits chunks (must be well above CHUNK_SIZE)
+CHUNK_WINDOW_CHARS: int = int(os.getenv("CHUNK_WINDOW_CHARS", 256 * 1024))
+# Chunks encoded + upserted per window by embed_chunks
+EMBED_WINDOW_CHUNKS: int = int(os.getenv("EMBED_WINDOW_CHUNKS", 256))
+# Bounded queues between ingestion stages (in items: chunk windows / point batches)
+PIPELINE_CHUNK_QUEUE_SIZE: int = int(os.getenv("PIPELINE_CHUNK_QUEUE_SIZE", 4))
+PIPELINE_POINT_QUEUE_SIZE: int = int(os.getenv("PIPELINE_POINT_QUEUE_SIZE", 4))
+
+# ==============================
+# 🗃️ Artifact Cache (shared across sessions)
+# ==============================
+# Extracted text, chunks and embeddings keyed by file content + pipeline config
+ARTIFACT_CACHE_ENABLED: bool = os.getenv("ARTIFACT_CACHE_ENABLED", "true").lower() == "true"
+ARTIFACT_CACHE_DIR: Path = Path(os.getenv("ARTIFACT_CACHE_DIR", str(DATA_DIR / "artifact_cache")))
+# Least recently used entries are evicted above this size
+ARTIFACT_CACHE_MAX_BYTES: int = int(os.getenv("ARTIFACT_CACHE_MAX_BYTES", 2 * 1024**3))
+
+# ==============================
+# 🧵 Background Processing Jobs
+# ==============================
+# Processing jobs that may run at the same time (each job also uses the ingest pool)
+PROCESS_JOB_WORKERS: int = int(os.getenv("PROCESS_JOB_WORKERS", 2))
+# Finished jobs kept for the progress API
+PROCESS_JOB_HISTORY: int = int(os.getenv("PROCESS_JOB_HISTORY", 100))
+
+# ==============================
+# 🗄️ Chunk Store Config
+# ==============================
+# dtype of the per-document embedding matrix on disk ("float32" or "float16")
+EMBEDDING_STORE_DTYPE: str = os.getenv("EMBEDDING_STORE_DTYPE", "float32")
+
+# ==============================
+# 🧠 Embedding Batch Config
+# ==============================
+# Max tokens (batch_size × longest sequence) encoded in a single forward pass
+EMBED_BATCH_TOKEN_BUDGET: int = int(os.getenv("EMBED_BATCH_TOKEN_BUDGET", 32768))
+EMBED_MAX_BATCH_SIZE: int = int(os.getenv("EMBED_MAX_BATCH_SIZE", 128))
+# Width (in tokens) of each length bucket
+EMBED_BUCKET_WIDTH: int = int(os.getenv("EMBED_BUCKET_WIDTH", 32))
+
+# ==============================
+# 🧊 Embedding Cache (per chunk / query text)
+# ==============================
+EMBED_CACHE_ENABLED: bool = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+EMBED_CACHE_PATH: Path = Path(os.getenv("EMBED_CACHE_PATH", str(DATA_DIR / "embedding_cache.sqlite3")))
+# Least recently used vectors are evicted above this many entries (float16, ~0.8 KB each at 384 dims)
+EMBED_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", 200_000))
+
+# ==============================
+# ⚡ Query Embedding Micro-batching
+# ==============================
+# How long the first query of a batch waits for others to join
+QUERY_EMBED_MAX_WAIT_MS: float = float(os.getenv("QUERY_EMBED_MAX_WAIT_MS", 5))
+QUERY_EMBED_MAX_BATCH: int = int(os.getenv("QUERY_EMBED_MAX_BATCH", 32))
+
+# ==============================
+# ♻️ Retrieval Result Cache
+# ==============================
+# Chunks retrieved per RAG query (rag_tool's default top_k). The local router searches
+# with the same k, so a query it routes to RAG is served from this cache.
+RAG_TOP_K: int = int(os.getenv("RAG_TOP_K", 5))
+RETRIEVAL_CACHE_ENABLED: bool = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+RETRIEVAL_CACHE_MAX_ENTRIES: int = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", 1024))
+RETRIEVAL_CACHE_TTL_SEC: int = int(os.getenv("RETRIEVAL_CACHE_TTL_SEC", 600))
+
+# ==============================
+# 💡 Semantic Answer Cache
+# ==============================
+ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY: float = float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.92))   # cosine threshold
+ANSWER_CACHE_MAX_PER_SESSION: int = int(os.getenv("ANSWER_CACHE_MAX_PER_SESSION", 64))
+
+# ==============================
+# 🌐 Shared Answer Store (cross-session, same document set)
+# ==============================
+ANSWER_STORE_ENABLED: bool = os.getenv("ANSWER_STORE_ENABLED", "true").lower() == "true"
+ANSWER_STORE_MAX_ENTRIES: int = int(os.getenv("ANSWER_STORE_MAX_ENTRIES", 2048))
+
+# ==============================
+# 🚦 Local Intent Router
+# ==============================
+ROUTER_LOCAL_ENABLED: bool = os.getenv("ROUTER_LOCAL_ENABLED", "true").lower() == "true"
+ROUTER_RAG_MIN_SCORE: float = float(os.getenv("ROUTER_RAG_MIN_SCORE", 0.62))          # top hit ≥ → rag
+ROUTER_GENERAL_MAX_SCORE: float = float(os.getenv("ROUTER_GENERAL_MAX_SCORE", 0.40))  # top hit ≤ …
+ROUTER_CENTROID_MIN_SIM: float = float(os.getenv("ROUTER_CENTROID_MIN_SIM", 0.35))    # … and centroid < → general
+ROUTER_SHADOW_RATE: float = float(os.getenv("ROUTER_SHADOW_RATE", 0.05))              # confident decisions re-checked by LLM
+# two_step    → LLM router only routes; finalize_node makes a 2nd call for general answers
+# single_call → LLM router answers general questions itself (with session memory)
+ROUTER_MODE: str = os.getenv("ROUTER_MODE", "two_step")
+# Start retrieval while the LLM router runs; rag_tool reuses it when the router picks it
+SPECULATIVE_RETRIEVAL: bool = os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+
+# ==============================
+# 🧭 Vector Store Backend
+# ==============================
+# "auto" → in-process NumPy index for small sessions, Qdrant above the threshold
+VECTOR_STORE_BACKEND: str = os.getenv("VECTOR_STORE_BACKEND", "auto")
+LOCAL_VECTOR_STORE_MAX_POINTS: int = int(os.getenv("LOCAL_VECTOR_STORE_MAX_POINTS", 20000))
+# Loaded local indexes kept in memory (least recently searched sessions are dropped first)
+LOCAL_VECTOR_STORE_MAX_SESSIONS: int = int(os.getenv("LOCAL_VECTOR_STORE_MAX_SESSIONS", 64))
+
+# ==============================
+# 🏢 Qdrant Multitenancy
+# ==============================
+# true → all sessions share one collection, isolated by a tenant-indexed `session_id` payload
+QDRANT_MULTITENANT: bool = os.getenv("QDRANT_MULTITENANT", "false").lower() == "true"
+QDRANT_SHARED_COLLECTION: str = os.getenv("QDRANT_SHARED_COLLECTION", "rag_chunks")
+
+# ==============================
+# 🗜️ Qdrant Collection Profile
+# ==============================
+# float32 | float16 | int8 | binary | float16_on_disk  (applied when a collection is created)
+QDRANT_COLLECTION_PROFILE: str = os.getenv("QDRANT_COLLECTION_PROFILE", "float32")
+QDRANT_ON_DISK_PAYLOAD: bool = os.getenv("QDRANT_ON_DISK_PAYLOAD", "false").lower() == "true"
+# Quantized profiles: re-rank oversampled candidates with the original vectors
+QDRANT_QUANTIZATION_RESCORE: bool = os.getenv("QDRANT_QUANTIZATION_RESCORE", "true").lower() == "true"
+QDRANT_QUANTIZATION_OVERSAMPLING: float = float(os.getenv("QDRANT_QUANTIZATION_OVERSAMPLING", 2.0))
+
+# ==============================
+# 🔎 Qdrant Search Tuning
+# ==============================
+# Sessions with at most this many points use exact (brute-force) search when Qdrant serves them.
+# In "auto" backend mode sessions ≤ LOCAL_VECTOR_STORE_MAX_POINTS already use the local (exact)
+# store, so this applies with VECTOR_STORE_BACKEND=qdrant and when Qdrant is the fallback
+# for a session without a usable local index.
+QDRANT_EXACT_SEARCH_MAX_POINTS: int = int(os.getenv("QDRANT_EXACT_SEARCH_MAX_POINTS", 1000))
+QDRANT_HNSW_M: int = int(os.getenv("QDRANT_HNSW_M", 16))                        # graph degree (at creation)
+QDRANT_HNSW_EF_CONSTRUCT: int = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", 100))  # build beam (at creation)
+QDRANT_HNSW_EF: int = int(os.getenv("QDRANT_HNSW_EF", 128))                      # search beam (per query)
+QDRANT_POINT_COUNT_TTL_SEC: int = int(os.getenv("QDRANT_POINT_COUNT_TTL_SEC", 300))
+
+# ==============================
+# 📦 Qdrant Ingestion Config
+# ==============================
+QDRANT_UPSERT_BATCH_SIZE: int = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", 256))
+QDRANT_UPSERT_PARALLEL: int = int(os.getenv("QDRANT_UPSERT_PARALLEL", 4))
+# Store only ids + locator fields in Qdrant payloads; text/citation fields come from chunks.jsonl
+QDRANT_SLIM_PAYLOAD: bool = os.getenv("QDRANT_SLIM_PAYLOAD", "true").lower() == "true"
+
 # ==============================
 # ✅ App Config
 # ==============================
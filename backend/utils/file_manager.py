@@ -5,7 +5,8 @@ from fastapi import UploadFile
 
 from backend.utils.config import UPLOAD_DIR, PROCESSED_DIR
 from backend.utils.logger import logger
-from backend.core.doc_processing_unit.qdrant_manager import delete_collection, get_collection_name
+from backend.core.doc_processing_unit.qdrant_manager import delete_session_points
+from backend.core.doc_processing_unit.vector_store import drop_session_vector_store
 
 
 # ============================================================
@@ -73,7 +74,7 @@ def clear_session_data(session_id: str):
     """
     Completely remove session data:
     - Deletes uploaded + processed folders
-    - Deletes corresponding Qdrant vector collection
+    - Deletes the session's vectors (its collection, or a filtered delete in multitenant mode)
     """
     logger.warning(f"🧹 Clearing session data for: {session_id}")
 
@@ -86,11 +87,14 @@ def clear_session_data(session_id: str):
             shutil.rmtree(folder)
             logger.info(f"🗑️ Removed folder: {folder}")
 
-    # Remove Qdrant collection
+    # Forget in-process vector index
+    drop_session_vector_store(session_id)
+
+    # Remove Qdrant vectors
     try:
-        delete_collection(get_collection_name(session_id))
-        logger.info(f"🗑️ Deleted Qdrant collection for session: {session_id}")
+        delete_session_points(session_id)
+        logger.info(f"🗑️ Deleted Qdrant vectors for session: {session_id}")
     except Exception as e:
-        logger.error(f"⚠️ Failed to delete Qdrant collection for {session_id}: {e}")
+        logger.error(f"⚠️ Failed to delete Qdrant vectors for {session_id}: {e}")
 
     return {"status": "cleared", "session_id": session_id}
@@ -0,0 +1,42 @@
+import threading
+from typing import Any, Dict
+
+
+class MetricsRegistry:
+    """
+    Tiny thread-safe in-process metrics store.
+    - counters: monotonically increasing numbers (e.g. cache hits)
+    - gauges:   last reported value (numbers or small JSON-able dicts)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, Any] = {}
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set(self, name: str, value: Any):
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            if name in self._counters:
+                return self._counters[name]
+            return self._gauges.get(name, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+__all__ = ["metrics"]
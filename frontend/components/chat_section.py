@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.api_client import send_query
+from utils.api_client import stream_query
 from components.citation_box import render_citation_box
 
 
@@ -30,6 +30,8 @@ def render_chat_section():
         else:
             with st.chat_message("assistant"):
                 st.write(chat["content"])
+                if chat.get("cached"):
+                    st.caption("⚡ Served from answer cache")
 
                 # Show citations (raw dicts only)
                 if chat.get("citations"):
@@ -48,13 +50,42 @@ def render_chat_section():
         })
 
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = send_query(session_id, user_input)
-
-            answer = response.get("response", "❌ Error generating response.")
-            citations = response.get("citations", [])   # RAW citation dict list
-
-            st.write(answer)
+            # Tokens are rendered as they arrive; other events fill `result`
+            result = {}
+
+            def answer_tokens():
+                events = stream_query(session_id, user_input)
+                first_token = None
+                with st.spinner("Thinking..."):
+                    # route / citations arrive before the first token
+                    for event, data in events:
+                        if event == "token":
+                            first_token = data
+                            break
+                        result[event] = data
+
+                if first_token is not None:
+                    yield first_token
+                for event, data in events:
+                    if event == "token":
+                        yield data
+                    else:
+                        result[event] = data
+
+            streamed = st.write_stream(answer_tokens())
+
+            final = result.get("done", {})
+            if "error" in result:
+                answer = f"❌ Error generating response: {result['error'].get('detail', '')}"
+                st.write(answer)
+            else:
+                answer = final.get("response") or streamed or "❌ Error generating response."
+
+            citations = final.get("citations", result.get("citations", []))   # RAW citation dict list
+            cached = final.get("cached", False)          # served from answer cache
+
+            if cached:
+                st.caption("⚡ Served from answer cache")
 
             # Render citation cards
             if citations:
@@ -64,7 +95,8 @@ def render_chat_section():
         st.session_state.chat_history.append({
             "role": "assistant",
             "content": answer,
-            "citations": citations  # Save RAW dicts, not strings
+            "citations": citations,  # Save RAW dicts, not strings
+            "cached": cached
         })
 
         st.rerun()
\ No newline at end of file
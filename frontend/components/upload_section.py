@@ -1,5 +1,54 @@
+import time
+
 import streamlit as st
-from utils.api_client import upload_file, process_file, list_documents
+from utils.api_client import upload_file, process_file, list_documents, get_process_job, cancel_process_job
+
+
+POLL_INTERVAL_SEC = 1.0
+
+
+def _job_fraction(progress: dict) -> float:
+    """Rough overall progress: half for extract/chunk, half for embed + upsert."""
+    files_total = progress.get("files_total") or 0
+    chunks_total = progress.get("chunks_total") or 0
+    extracted = progress.get("files_extracted", 0) / files_total if files_total else 0.0
+    indexed = progress.get("points_upserted", 0) / chunks_total if chunks_total else 0.0
+    return min(1.0, 0.5 * extracted + 0.5 * indexed)
+
+
+def _render_process_job(job_id: str):
+    """Poll a background processing job until it finishes, with a cancel button."""
+    if st.button("🛑 Cancel Processing", key="cancel_process_btn"):
+        cancel_process_job(job_id)
+
+    bar = st.progress(0.0, text="Queued...")
+    while True:
+        job = get_process_job(job_id)
+        status = job.get("status")
+        progress = job.get("progress", {})
+
+        bar.progress(
+            _job_fraction(progress),
+            text=(
+                f"{job.get('stage', status)} — "
+                f"files {progress.get('files_extracted', 0)}/{progress.get('files_total', 0)}, "
+                f"chunks {progress.get('points_upserted', 0)}/{progress.get('chunks_total', 0)}"
+            ),
+        )
+
+        if status in ("queued", "running"):
+            time.sleep(POLL_INTERVAL_SEC)
+            continue
+
+        st.session_state.pop("process_job_id", None)
+        if status == "completed":
+            bar.progress(1.0, text="Done")
+            st.success("🎉 Processing complete! Ready to chat.")
+        elif status == "cancelled":
+            st.warning("🛑 Processing cancelled.")
+        else:
+            st.error(f"❌ Processing failed: {job.get('error') or job}")
+        return
 
 
 # ============================================================
@@ -55,17 +104,18 @@ def render_upload_section():
             st.error("⚠ Upload a file first to start a session.")
             return
 
-        with st.spinner("Processing document..."):
-            response = process_file(session_id)
-
-        status = str(response.get("status", "")).lower()
+        # Backend returns immediately with a job id; progress is polled below
+        response = process_file(session_id)
 
-        # Backend returns:  "status": "✅ Processing complete"
-        if "complete" in status or "success" in status:
-            st.success("🎉 Processing complete! Ready to chat.")
+        if response.get("job_id"):
+            st.session_state.process_job_id = response["job_id"]
         else:
             st.error(f"❌ Processing failed: {response}")
 
+    job_id = st.session_state.get("process_job_id")
+    if job_id:
+        _render_process_job(job_id)
+
     st.write("---")
     st.subheader("📚 Uploaded Documents")
 
@@ -1,5 +1,6 @@
+import json
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
 from utils.config import BACKEND_URL
 
 
@@ -46,6 +47,24 @@ def process_file(session_id: str) -> Dict[str, Any]:
     return _safe_json(resp)
 
 
+# =====================================
+# Processing job progress (GET /api/process/jobs/{job_id})
+# =====================================
+def get_process_job(job_id: str) -> Dict[str, Any]:
+    url = f"{BACKEND_URL}/api/process/jobs/{job_id}"
+    resp = requests.get(url)
+    return _safe_json(resp)
+
+
+# =====================================
+# Cancel processing job (DELETE /api/process/jobs/{job_id})
+# =====================================
+def cancel_process_job(job_id: str) -> Dict[str, Any]:
+    url = f"{BACKEND_URL}/api/process/jobs/{job_id}"
+    resp = requests.delete(url)
+    return _safe_json(resp)
+
+
 # =====================================
 # Send query to RAG pipeline (POST /api/query)
 # =====================================
@@ -60,6 +79,44 @@ def send_query(session_id: str, query: str, top_k: int = 5) -> Dict[str, Any]:
     return _safe_json(resp)
 
 
+# =====================================
+# Stream query answer (POST /api/query/stream, Server-Sent Events)
+# =====================================
+def stream_query(session_id: str, query: str, top_k: int = 5) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield (event, data) pairs as the backend sends them:
+    route → citations → token (many) → done, or error.
+    """
+    url = f"{BACKEND_URL}/api/query/stream"
+    payload = {
+        "session_id": session_id,
+        "query": query,
+        "top_k": top_k
+    }
+
+    try:
+        with requests.post(url, json=payload, stream=True) as resp:
+            if resp.status_code != 200:
+                yield "error", _safe_json(resp)
+                return
+
+            event, data_lines = "message", []
+            for line in resp.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line == "":
+                    # Blank line closes one event
+                    if data_lines:
+                        yield event, json.loads("\n".join(data_lines))
+                    event, data_lines = "message", []
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+    except requests.RequestException as e:
+        yield "error", {"detail": str(e)}
+
+
 # =====================================
 # Reset session (DELETE /api/reset_session?session_id=...)
 # =====================================
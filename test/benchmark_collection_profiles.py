@@ -0,0 +1,122 @@
+# test/benchmark_collection_profiles.py
+#
+# Benchmark Qdrant collection profiles (float32 / float16 / on-disk / int8 / binary).
+# For each profile: upsert N random unit vectors into a throwaway collection, then
+# report estimated RAM per 1M chunks, p50/p99 search latency and recall@10
+# against exact float32 search.
+#
+# Needs a running Qdrant (QDRANT_URL). Temporary collections are deleted afterwards.
+
+import os
+import sys
+import time
+import statistics
+
+import numpy as np
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from qdrant_client.models import PointStruct
+
+from backend.core.doc_processing_unit.qdrant_manager import (
+    client,
+    COLLECTION_PROFILES,
+    collection_config,
+    search_params,
+)
+
+N_POINTS = 20000
+DIM = 384            # BGE-small
+N_QUERIES = 200
+TOP_K = 10
+BATCH = 512
+
+# Bytes per dimension of the vectors Qdrant must keep in RAM to search
+_RAM_BYTES_PER_DIM = {"int8": 1.0, "binary": 1 / 8}
+_DTYPE_BYTES = {"float32": 4, "float16": 2}
+
+
+def ram_per_million(profile: str) -> float:
+    """Estimated vector RAM (MiB) per 1M chunks; HNSW graph and payloads excluded."""
+    spec = COLLECTION_PROFILES[profile]
+    if spec["quantization"]:
+        bytes_per_dim = _RAM_BYTES_PER_DIM[spec["quantization"]]
+    elif spec["on_disk"]:
+        bytes_per_dim = 0.0   # page cache only
+    else:
+        bytes_per_dim = _DTYPE_BYTES[spec["datatype"].value]
+    return DIM * bytes_per_dim * 1_000_000 / (1024 ** 2)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def load(collection: str, profile: str, vectors: np.ndarray):
+    client.create_collection(collection_name=collection, **collection_config(DIM, profile))
+    for start in range(0, len(vectors), BATCH):
+        client.upsert(
+            collection_name=collection,
+            points=[
+                PointStruct(id=start + i, vector=v.tolist(), payload={"chunk_index": start + i})
+                for i, v in enumerate(vectors[start:start + BATCH])
+            ],
+            wait=True,
+        )
+
+
+def search(collection: str, query: np.ndarray, params) -> list:
+    response = client.query_points(
+        collection_name=collection,
+        query=query.tolist(),
+        search_params=params,
+        limit=TOP_K,
+        with_payload=False,
+    )
+    return [hit.id for hit in response.points]
+
+
+def main():
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((N_POINTS, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(N_POINTS, N_QUERIES, replace=False)] + 0.05 * rng.standard_normal((N_QUERIES, DIM)).astype(np.float32)
+
+    # Ground truth: exact cosine top-k in NumPy
+    truth = [set(np.argsort(-(vectors @ q))[:TOP_K].tolist()) for q in queries]
+
+    print(f"📊 {N_POINTS} points, dim={DIM}, {N_QUERIES} queries, top_k={TOP_K}\n")
+    print(f"{'profile':<16} | {'RAM/1M chunks':>13} | {'p50':>8} | {'p99':>8} | {'recall@10':>9}")
+    print("-" * 68)
+
+    for profile in COLLECTION_PROFILES:
+        collection = f"bench_profile_{profile}"
+        if client.collection_exists(collection):
+            client.delete_collection(collection)
+
+        try:
+            load(collection, profile, vectors)
+            params = search_params(profile)
+
+            latencies, recalls = [], []
+            for q, expected in zip(queries, truth):
+                start = time.perf_counter()
+                ids = search(collection, q, params)
+                latencies.append((time.perf_counter() - start) * 1000)
+                recalls.append(len(expected.intersection(ids)) / TOP_K)
+
+            print(
+                f"{profile:<16} | {ram_per_million(profile):10.0f} MiB | "
+                f"{statistics.median(latencies):5.2f} ms | {percentile(latencies, 99):5.2f} ms | "
+                f"{statistics.mean(recalls):9.3f}"
+            )
+        finally:
+            client.delete_collection(collection)
+
+    print("\n🎯 Benchmark completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# test/benchmark_llm_setup.py
+#
+# Per-hop LLM setup overhead (no model call is made):
+#   before → what every request used to do: new ChatGoogleGenerativeAI,
+#            bind_tools([rag_tool]) for the router, new PromptTemplate +
+#            RunnableSequence for the answer
+#   after  → the same objects from llm_runtime (built once, then reused)
+# Constructing the client needs GEMINI_API_KEY to be set, but no network.
+
+import os
+import sys
+import time
+import statistics
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from langchain_core.runnables import RunnableSequence
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from backend.utils.config import GEMINI_API_KEY, LLM_MODEL
+from backend.core.rag.agent.rag_tool import rag_tool
+from backend.core.rag.llm_engine import build_answer_prompt, llm_runtime
+
+HOPS = 200
+
+
+def setup_before():
+    router = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GEMINI_API_KEY, temperature=0.4)
+    router.bind_tools([rag_tool])
+    answer = ChatGoogleGenerativeAI(model=LLM_MODEL, google_api_key=GEMINI_API_KEY, temperature=0.4)
+    RunnableSequence(build_answer_prompt() | answer)
+
+
+def setup_after():
+    llm_runtime.with_tools([rag_tool])
+    llm_runtime.answer_chain()
+
+
+def measure(label, fn):
+    timings = []
+    for _ in range(HOPS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(
+        f"{label:<7} | p50={statistics.median(timings):8.3f} ms "
+        f"| mean={statistics.mean(timings):8.3f} ms | first={timings[0]:8.3f} ms"
+    )
+    return statistics.median(timings)
+
+
+def main():
+    print(f"🏊 LLM setup per request-hop ({HOPS} hops, model={LLM_MODEL})\n")
+    before = measure("before", setup_before)
+    after = measure("after", setup_after)
+    print(f"\n⚡ Setup overhead per hop: {before:.3f} ms → {after:.3f} ms ({before / max(after, 1e-6):.0f}x less)")
+    print("🎯 Benchmark completed.")
+
+
+if __name__ == "__main__":
+    main()
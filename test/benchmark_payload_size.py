@@ -0,0 +1,54 @@
+# test/benchmark_payload_size.py
+#
+# Payload footprint of a processed session: full payload (text + every metadata
+# field) vs. the slim payload now stored in Qdrant, and the bytes returned per
+# top-k query (with_payload=True vs. SEARCH_PAYLOAD_FIELDS).
+# Sizes are JSON bytes, extrapolated to 1M chunks.
+
+import os
+import sys
+import json
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.core.doc_processing_unit.chunk_store import list_session_doc_dirs, iter_chunk_table
+from backend.core.doc_processing_unit.qdrant_manager import PAYLOAD_FIELDS
+from backend.core.doc_processing_unit.vector_store import SEARCH_PAYLOAD_FIELDS
+
+# ⚠️ Update session ID before running (must be processed already)
+SESSION_ID = "427c6e4e-174b-4456-b803-062dd11e4823"
+TOP_K = 5
+
+
+def json_size(obj) -> int:
+    return len(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+
+def main():
+    full, slim, response = [], [], []
+    for doc_dir in list_session_doc_dirs(SESSION_ID):
+        for row in iter_chunk_table(doc_dir):
+            full.append(json_size(row))
+            slim.append(json_size({key: row.get(key) for key in PAYLOAD_FIELDS}))
+            response.append(json_size({key: row.get(key) for key in SEARCH_PAYLOAD_FIELDS}))
+
+    if not full:
+        print(f"⚠️ No chunks found for session {SESSION_ID}")
+        return
+
+    n = len(full)
+    avg_full, avg_slim, avg_resp = sum(full) / n, sum(slim) / n, sum(response) / n
+    mib = 1_000_000 / (1024 ** 2)
+
+    print(f"📊 Session {SESSION_ID}: {n} chunks\n")
+    print(f"{'':<22} | {'bytes/point':>11} | {'MiB / 1M chunks':>15}")
+    print("-" * 56)
+    print(f"{'full payload':<22} | {avg_full:11.0f} | {avg_full * mib:15.0f}")
+    print(f"{'slim payload':<22} | {avg_slim:11.0f} | {avg_slim * mib:15.0f}")
+    print(f"\n📦 Payload bytes per top-{TOP_K} query: {avg_full * TOP_K:.0f} → {avg_resp * TOP_K:.0f}")
+    print(f"📉 Stored payload reduced by {100 * (1 - avg_slim / avg_full):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
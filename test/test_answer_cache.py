@@ -0,0 +1,75 @@
+# test/test_answer_cache.py
+#
+# Per-session semantic answer cache (no Qdrant / LLM needed):
+#   • a repeated question after the same conversation is served from the cache
+#   • the same follow-up after a different conversation is not
+#   • error and general answers are never stored
+
+import os
+import sys
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.core.rag.answer_cache import SemanticAnswerCache, memory_key
+
+QUERY = [1.0, 0.0, 0.0]
+PARAPHRASE = [0.99, 0.05, 0.0]
+
+US_TURNS = [
+    {"role": "user", "content": "what is the refund window for US customers?"},
+    {"role": "assistant", "content": "30 days."},
+]
+EU_TURNS = [
+    {"role": "user", "content": "what is the refund window for EU customers?"},
+    {"role": "assistant", "content": "14 days."},
+]
+
+
+def rag_answer(response):
+    return {"response": response, "used_chunks": 3, "citations": [], "error": False}
+
+
+def test_same_conversation_hits():
+    cache = SemanticAnswerCache(threshold=0.92, enabled=True)
+    cache.store("s", QUERY, 1, rag_answer("30 days"), memory_key(US_TURNS))
+
+    hit = cache.lookup("s", PARAPHRASE, 1, memory_key(US_TURNS))
+    assert hit is not None and hit[0]["response"] == "30 days", hit
+
+
+def test_follow_up_after_other_conversation_misses():
+    cache = SemanticAnswerCache(threshold=0.92, enabled=True)
+    cache.store("s", QUERY, 1, rag_answer("30 days"), memory_key(US_TURNS))
+
+    assert cache.lookup("s", QUERY, 1, memory_key(EU_TURNS)) is None
+    assert cache.lookup("s", QUERY, 1, memory_key([])) is None
+
+
+def test_best_match_within_same_conversation():
+    cache = SemanticAnswerCache(threshold=0.92, enabled=True)
+    cache.store("s", QUERY, 1, rag_answer("US answer"), memory_key(US_TURNS))
+    cache.store("s", QUERY, 1, rag_answer("EU answer"), memory_key(EU_TURNS))
+
+    hit = cache.lookup("s", QUERY, 1, memory_key(EU_TURNS))
+    assert hit is not None and hit[0]["response"] == "EU answer", hit
+
+
+def test_error_and_general_answers_not_stored():
+    cache = SemanticAnswerCache(threshold=0.92, enabled=True)
+    cache.store("s", QUERY, 1, {**rag_answer("quota exceeded"), "error": True})
+    cache.store("s", QUERY, 1, {**rag_answer("hello"), "used_chunks": 0})
+
+    assert cache.lookup("s", QUERY, 1) is None
+
+
+if __name__ == "__main__":
+    for test in (
+        test_same_conversation_hits,
+        test_follow_up_after_other_conversation_misses,
+        test_best_match_within_same_conversation,
+        test_error_and_general_answers_not_stored,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎯 Answer cache tests passed.")
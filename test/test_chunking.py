@@ -5,7 +5,7 @@ from pathlib import Path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from backend.core.doc_processing_unit.chunking import chunk_session_documents
-from backend.utils.config import PROCESSED_DIR
+from backend.core.doc_processing_unit.chunk_store import list_session_doc_dirs, read_chunk_table, CHUNK_TABLE_FILE
 
 # ⚠️ Use your active session ID
 session_id = "9d343441-b56b-4e3b-a823-6e66bb775f0a"
@@ -20,36 +20,19 @@ print(f"\n✅ Total chunks generated: {len(chunks)}")
 print("\n📌 Sample chunk metadata:")
 print(json.dumps(chunks[:2], indent=2))
 
-session_dir = PROCESSED_DIR / session_id
-
-# ✅ Find chunk folders
-chunk_folders = []
-for doc_folder in session_dir.iterdir():
-    if doc_folder.is_dir():
-        for cf in doc_folder.glob("chunks_*"):
-            if cf.is_dir():
-                chunk_folders.append(cf)
-
-print(f"\n📁 Total chunk folders: {len(chunk_folders)}")
-for cf in chunk_folders:
-    print(f" - {cf.name} (in {cf.parent.name})")
-
-# ✅ Validate chunk subfolder contents
-sample_chunk_folder = None
-for cf in chunk_folders:
-    first_chunk = cf / "chunk_1"
-    if first_chunk.exists():
-        sample_chunk_folder = first_chunk
-        break
-
-if sample_chunk_folder:
-    print(f"\n🔍 Checking sample chunk folder: {sample_chunk_folder}")
-    expected_files = {"text.txt", "meta.json"}
-    found_files = {f.name for f in sample_chunk_folder.iterdir() if f.is_file()}
-    missing = expected_files - found_files
-    if missing:
-        print(f"❌ Missing: {missing}")
-    else:
-        print("✅ Both text.txt and meta.json found!")
+# ✅ Validate per-document chunk tables
+doc_dirs = list_session_doc_dirs(session_id)
+
+print(f"\n📁 Total chunk tables: {len(doc_dirs)}")
+for doc_dir in doc_dirs:
+    rows = read_chunk_table(doc_dir)
+    print(f" - {CHUNK_TABLE_FILE} in {doc_dir.name}: {len(rows)} chunks")
+
+    if rows:
+        missing = {"chunk_id", "text", "chunk_index"} - set(rows[0])
+        if missing:
+            print(f"❌ Missing fields in first row: {missing}")
+        else:
+            print("✅ First row has chunk_id, text and chunk_index!")
 
 print("\n🎯 Chunking test completed.\n")
\ No newline at end of file
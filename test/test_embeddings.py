@@ -1,13 +1,12 @@
 import os
 import sys
-import json
 from pathlib import Path
 
 # Add project root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from backend.core.doc_processing_unit.embedding_engine import embed_chunks
-from backend.utils.config import PROCESSED_DIR
+from backend.core.doc_processing_unit.chunk_store import list_session_doc_dirs, has_embedding_matrix, open_embedding_matrix
 from backend.core.doc_processing_unit.qdrant_manager import client, get_collection_name
 
 # ⚠️ Update session ID before running
@@ -16,23 +15,22 @@ session_id = "9d343441-b56b-4e3b-a823-6e66bb775f0a"
 print(f"🧠 Running embedding generation test for session: {session_id}\n")
 
 # Run embedding
-embeddings = embed_chunks(session_id)
+result = embed_chunks(session_id)
 
 # ✅ Local verification
-print(f"\n✅ Total embeddings generated locally: {len(embeddings)}")
-
-if embeddings:
-    print("\n📌 Sample embedding metadata:")
-    print(json.dumps(embeddings[0]["metadata"], indent=2))
-
-# ✅ Folder structure check
-session_dir = PROCESSED_DIR / session_id
-print("\n📁 Checking 'embeddings' folder structure:")
-for root, dirs, files in os.walk(session_dir):
-    if "embeddings" in root:
-        print(f"📂 {root}")
-        for f in files[:3]:  # Show first few embedding files
-            print("  -", f)
+print(f"\n✅ Total embeddings generated locally: {result['total_embeddings']}")
+
+upsert = result["upsert"]
+print(f"📦 Upserted {upsert['points']} points in {upsert['batches']} batches ({upsert['points_per_sec']} points/sec)")
+
+# ✅ Embedding matrix check
+print("\n📁 Checking per-document embedding matrices:")
+for doc_dir in list_session_doc_dirs(session_id):
+    if has_embedding_matrix(doc_dir):
+        matrix = open_embedding_matrix(doc_dir)
+        print(f"📂 {doc_dir.name}: shape={matrix.shape} dtype={matrix.dtype}")
+    else:
+        print(f"❌ {doc_dir.name}: no embedding matrix")
 
 # ✅ Verify upserts in Qdrant
 try:
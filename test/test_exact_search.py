@@ -0,0 +1,73 @@
+# test/test_exact_search.py
+#
+# Reaches both branches of QdrantVectorStore.search with Qdrant forced as the
+# backend (VECTOR_STORE_BACKEND=qdrant — in "auto" mode small sessions are
+# served by the local store and never hit the exact-search path):
+#   • a session with ≤ QDRANT_EXACT_SEARCH_MAX_POINTS points → exact search
+#   • the same session with the threshold below its size      → HNSW search
+# Needs a running Qdrant; uses a throwaway session / collection.
+
+import os
+import sys
+import uuid
+
+import numpy as np
+
+os.environ["VECTOR_STORE_BACKEND"] = "qdrant"
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import backend.core.doc_processing_unit.vector_store as vector_store
+from backend.core.doc_processing_unit.qdrant_manager import (
+    create_collection_if_not_exists,
+    delete_session_points,
+    upsert_embeddings_bulk,
+)
+from backend.utils.metrics import metrics
+
+SESSION_ID = f"exact-search-test-{uuid.uuid4().hex[:8]}"
+DIM = 16
+POINTS = 50
+
+
+def main():
+    assert vector_store.VECTOR_STORE_BACKEND == "qdrant"
+    assert POINTS <= vector_store.QDRANT_EXACT_SEARCH_MAX_POINTS, "raise QDRANT_EXACT_SEARCH_MAX_POINTS for this test"
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((POINTS, DIM)).astype(np.float32)
+    create_collection_if_not_exists(SESSION_ID, DIM)
+    upsert_embeddings_bulk(
+        {
+            "chunk_id": f"{SESSION_ID}_{i}",
+            "session_id": SESSION_ID,
+            "text": f"chunk {i}",
+            "vector": vector.tolist(),
+            "metadata": {"doc_id": "doc", "source_doc_folder": "doc", "chunk_index": i + 1},
+        }
+        for i, vector in enumerate(vectors)
+    )
+
+    store = vector_store.get_vector_store(SESSION_ID)
+    try:
+        store.search(SESSION_ID, vectors[0], 3)
+        last = metrics.get("retrieval.last_search")
+        print(f"🔎 {last}")
+        assert last == {"session_points": POINTS, "mode": "exact"}, last
+
+        # Same session above the threshold → HNSW
+        vector_store.QDRANT_EXACT_SEARCH_MAX_POINTS = POINTS - 1
+        store.drop_session(SESSION_ID)
+        store.search(SESSION_ID, vectors[0], 3)
+        last = metrics.get("retrieval.last_search")
+        print(f"🔎 {last}")
+        assert last == {"session_points": POINTS, "mode": "hnsw"}, last
+    finally:
+        delete_session_points(SESSION_ID)
+
+    print("\n🎯 Exact / HNSW search selection test passed.")
+
+
+if __name__ == "__main__":
+    main()
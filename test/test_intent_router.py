@@ -0,0 +1,85 @@
+# test/test_intent_router.py
+#
+# Rule-based part of the local intent router (no Qdrant / LLM needed):
+#   • small talk only when the whole message is small talk
+#   • document references only with a cue pointing at the user's files
+# Messages that match neither fall through (no embedding here → "no_embedding").
+
+import os
+import sys
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.core.rag.agent.intent_router import ROUTE_GENERAL, ROUTE_RAG, route_locally
+
+SMALL_TALK = [
+    "hi",
+    "Hello!",
+    "thanks a lot 🙏",
+    "ok, thanks!",
+    "how are you?",
+    "good morning :)",
+]
+
+# Real questions that start like small talk → must reach the score checks
+NOT_SMALL_TALK = [
+    "hi what is the fee?",
+    "thanks, and the penalty?",
+    "great, who signed it?",
+    "who are you contracting with?",
+]
+
+DOC_REFERENCES = [
+    "summarize the uploaded document",
+    "what does this table show?",
+    "according to the report, what was revenue?",
+    "what is in my files about refunds?",
+    "explain the file I just uploaded",
+]
+
+NOT_DOC_REFERENCES = [
+    "what is a hash table?",
+    "how many pages does a typical novel have?",
+    "how do I open a file in python?",
+]
+
+
+def decide(query):
+    return route_locally("test_session", query, None, has_docs=True)
+
+
+def test_small_talk_goes_general():
+    for query in SMALL_TALK:
+        decision = decide(query)
+        assert (decision.route, decision.reason) == (ROUTE_GENERAL, "small_talk"), (query, decision)
+
+
+def test_questions_after_greeting_fall_through():
+    for query in NOT_SMALL_TALK:
+        decision = decide(query)
+        assert decision.reason == "no_embedding", (query, decision)
+
+
+def test_document_references_go_rag():
+    for query in DOC_REFERENCES:
+        decision = decide(query)
+        assert (decision.route, decision.reason) == (ROUTE_RAG, "doc_reference"), (query, decision)
+
+
+def test_generic_nouns_fall_through():
+    for query in NOT_DOC_REFERENCES:
+        decision = decide(query)
+        assert decision.reason == "no_embedding", (query, decision)
+
+
+if __name__ == "__main__":
+    for test in (
+        test_small_talk_goes_general,
+        test_questions_after_greeting_fall_through,
+        test_document_references_go_rag,
+        test_generic_nouns_fall_through,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎯 Intent router rule tests passed.")
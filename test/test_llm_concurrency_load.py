@@ -0,0 +1,56 @@
+# test/test_llm_concurrency_load.py
+#
+# Load test: N concurrent general answers from async code.
+#   blocking → generate_general_answer (chain.invoke) inside coroutines: the
+#              event loop is frozen per call, so N requests run one after another
+#   async    → agenerate_general_answer (chain.ainvoke + llm_slot): N requests
+#              overlap and finish in roughly the time of one
+# Needs GEMINI_API_KEY.
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.core.rag.llm_engine import generate_general_answer, agenerate_general_answer
+
+CONCURRENCY = 8
+QUERIES = [f"In one sentence, what is an interesting fact about the number {i}?" for i in range(CONCURRENCY)]
+
+
+async def blocking_call(query):
+    """Old behaviour: sync Gemini call from an async handler."""
+    return generate_general_answer(query)
+
+
+async def run(label, fn):
+    latencies = []
+
+    async def one(query):
+        start = time.perf_counter()
+        await fn(query)
+        latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in QUERIES))
+    wall = time.perf_counter() - wall_start
+
+    print(
+        f"{label:<9} | wall={wall:6.2f} s | p50={statistics.median(latencies):6.2f} s "
+        f"| max={max(latencies):6.2f} s | wall / single ≈ {wall / min(latencies):4.1f}x"
+    )
+
+
+async def main():
+    print(f"🚦 {CONCURRENCY} concurrent general-answer requests\n")
+    await run("blocking", blocking_call)
+    await run("async", agenerate_general_answer)
+    print("\n🎯 Load test completed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,35 +1,39 @@
-import os, json
+import os
 from pathlib import Path
 import sys
 
 # Add backend path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from backend.core.doc_processing_unit.qdrant_manager import upsert_embedding, create_collection_if_not_exists, get_collection_name
-from backend.utils.config import PROCESSED_DIR
+from backend.core.doc_processing_unit.qdrant_manager import upsert_embedding, upsert_embeddings_bulk, create_collection_if_not_exists, get_collection_name
+from backend.core.doc_processing_unit.chunk_store import list_session_doc_dirs, read_chunk_table, has_embedding_matrix, open_embedding_matrix
 from backend.utils.logger import logger
 
 session_id = "session id"
 
 print(f"\n🔥 Testing Qdrant upsert for REAL embeddings: {session_id}\n")
 
-session_dir = PROCESSED_DIR / session_id
-
 # find any doc folder
-doc_folders = [d for d in session_dir.iterdir() if d.is_dir()]
+doc_folders = list_session_doc_dirs(session_id)
 
 if not doc_folders:
     raise Exception("❌ No document folders found! Run extract/clean/chunk/embed pipeline first.")
 
 embeddings = []
 
-# Load first few embedding files
+# Load embedding records from the first document's chunk table + matrix
 for doc in doc_folders:
-    embed_dir = doc / "embeddings"
-    if embed_dir.exists():
-        for f in sorted(embed_dir.glob("chunk_*.json")):
-            record = json.loads(f.read_text())
-            embeddings.append(record)
+    if has_embedding_matrix(doc):
+        matrix = open_embedding_matrix(doc)
+        for row, vector in zip(read_chunk_table(doc), matrix):
+            text = row.pop("text")
+            embeddings.append({
+                "chunk_id": row["chunk_id"],
+                "session_id": row["session_id"],
+                "text": text,
+                "vector": vector.astype("float32").tolist(),
+                "metadata": row
+            })
         break
 
 if not embeddings:
@@ -44,5 +48,9 @@ for i, rec in enumerate(embeddings[:3]):   # only 3 for test
     upsert_embedding(rec)
     print(f"📌 Upserted: {rec['chunk_id']}")
 
+# ✅ Bulk upsert the rest in batches
+summary = upsert_embeddings_bulk(embeddings[3:], batch_size=64)
+print(f"📦 Bulk upserted {summary['points']} points in {summary['batches']} batches ({summary['points_per_sec']} points/sec)")
+
 print("\n🎯 REAL Qdrant test completed successfully!")
 print(f"📦 Collection: {get_collection_name(session_id)}")
\ No newline at end of file
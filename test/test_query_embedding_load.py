@@ -0,0 +1,78 @@
+# test/test_query_embedding_load.py
+#
+# Load test: N concurrent retrievals, per-query encode (old path) vs.
+# micro-batched QueryEmbeddingService. Reports p50/p99 latency and CPU per query.
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+# Add project root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.core.doc_processing_unit.model_manager import get_embedding_model
+from backend.core.doc_processing_unit.qdrant_manager import client as qdrant_client
+from backend.core.doc_processing_unit.embedding_cache import embedding_cache
+from backend.core.rag.resource_store import resource_store
+from backend.core.rag.query_embedder import QueryEmbeddingService
+from backend.core.rag.retriever import aretrieve_top_k_chunks, _search
+
+# ⚠️ Update session ID before running (must be processed already)
+SESSION_ID = "427c6e4e-174b-4456-b803-062dd11e4823"
+CONCURRENCY = 50
+TOP_K = 5
+
+QUERIES = [f"What does the document say about topic {i}?" for i in range(CONCURRENCY)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def per_query_encode(query):
+    """Old behaviour: model.encode on the event loop, one query at a time."""
+    vector = resource_store.embedding_model.encode(query).tolist()
+    return await asyncio.to_thread(_search, SESSION_ID, query, vector, TOP_K)
+
+
+async def run(label, fn):
+    latencies = []
+
+    async def one(query):
+        start = time.perf_counter()
+        await fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in QUERIES))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    print(
+        f"{label:<14} | p50={statistics.median(latencies):7.1f} ms | p99={percentile(latencies, 99):7.1f} ms "
+        f"| wall={wall:6.2f} s | cpu/query={cpu / len(QUERIES) * 1000:6.1f} ms"
+    )
+
+
+async def main():
+    resource_store.embedding_model = get_embedding_model()
+    resource_store.qdrant_client = qdrant_client
+    resource_store.query_embedder = QueryEmbeddingService(resource_store.embedding_model)
+
+    # Cold numbers only: keep the embedding cache out of the comparison
+    embedding_cache.enabled = False
+
+    print(f"🚦 {CONCURRENCY} concurrent retrievals on session {SESSION_ID}\n")
+    await run("per-query", per_query_encode)
+    await run("micro-batched", lambda q: aretrieve_top_k_chunks(SESSION_ID, q, TOP_K))
+
+    resource_store.query_embedder.shutdown()
+    print("\n🎯 Load test completed.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())